@@ -3,7 +3,24 @@ Admin configuration for backend app.
 """
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User
+from django.db.models import Q
+from django.db.models.functions import Upper
+from django.utils.text import smart_split, unescape_string_literal
+from .models import AuthEvent, User
+from .pagination import EstimatedCountPaginator
+
+# Sorts after any string sharing a prefix, turning "starts with" into a range scan
+PREFIX_UPPER_BOUND = '\U0010ffff'
+
+
+def _search_words(term):
+    """Whitespace-separated words; quoted phrases stay together (as in ModelAdmin)."""
+    words = []
+    for bit in smart_split(term):
+        if bit.startswith(('"', "'")) and bit[0] == bit[-1]:
+            bit = unescape_string_literal(bit)
+        words.append(bit)
+    return words
 
 
 @admin.register(User)
@@ -12,9 +29,19 @@ class UserAdmin(BaseUserAdmin):
 
     list_display = ['email', 'username', 'first_name', 'last_name', 'is_staff', 'email_verified', 'created_at']
     list_filter = ['is_staff', 'is_superuser', 'is_active', 'email_verified', 'two_factor_enabled']
-    search_fields = ['email', 'username', 'first_name', 'last_name']
     ordering = ['-created_at']
 
+    # Prefix search by default; a leading "=" switches to exact email/username match.
+    # Terms are compared against UPPER(column) with = or a range so the expression
+    # indexes on the users table are used, unlike icontains.
+    search_fields = ['email', 'username', 'first_name', 'last_name']
+    exact_search_fields = ['email', 'username']
+    search_help_text = 'Prefix match on email, username or name. Start with "=" for an exact email/username match.'
+
+    # Avoid COUNT(*) over the whole table on every page
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
     fieldsets = (
         (None, {'fields': ('username', 'email', 'password')}),
         ('Personal Info', {'fields': ('first_name', 'last_name', 'phone_number')}),
@@ -33,3 +60,44 @@ class UserAdmin(BaseUserAdmin):
             'fields': ('email', 'username', 'password1', 'password2'),
         }),
     )
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        exact = term.startswith('=')
+        # Like the stock admin, every word must match some field
+        words = _search_words(term.lstrip('='))
+        if not words:
+            return queryset, False
+
+        fields = self.exact_search_fields if exact else self.get_search_fields(request)
+        queryset = queryset.alias(**{f'{field}_upper': Upper(field) for field in fields})
+        query = Q()
+        for word in words:
+            word = word.upper()
+            matches = Q()
+            for field in fields:
+                if exact:
+                    matches |= Q(**{f'{field}_upper': word})
+                else:
+                    matches |= Q(**{f'{field}_upper__gte': word, f'{field}_upper__lt': word + PREFIX_UPPER_BOUND})
+            query &= matches
+        return queryset.filter(query), False
+
+
+@admin.register(AuthEvent)
+class AuthEventAdmin(admin.ModelAdmin):
+    """Read-only view of the auth audit trail."""
+
+    list_display = ['created_at', 'event', 'identifier', 'ip_address']
+    list_filter = ['event']
+    search_fields = ['=identifier']
+    raw_id_fields = ['user']
+    date_hierarchy = 'created_at'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,201 @@
+"""
+backend/audit.py
+
+Buffered authentication audit log.
+
+Views call ``audit_log.record(...)``, which only appends to an in-process
+buffer. A background thread writes the buffer with one ``bulk_create`` when
+it reaches AUTH_AUDIT_BATCH_SIZE events or every AUTH_AUDIT_FLUSH_INTERVAL
+seconds, together with the users' ``last_login`` values, coalesced to the
+latest login per user. Requests therefore never wait on audit or
+``last_login`` writes. The buffer is flushed once more at interpreter exit.
+
+Users can be deleted while their events are still buffered. Each flush
+first drops such user references (the events keep their identifier, as
+``on_delete=SET_NULL`` would), so one stale row cannot fail every later
+flush.
+
+With AUTH_AUDIT_BACKGROUND = False (tests, management commands) no thread
+is started and the buffer is written inline once it is full, or by an
+explicit ``flush()``.
+"""
+
+import atexit
+import logging
+import os
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from backend.models import AuthEvent, User
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_FLUSH_INTERVAL = 2.0
+# Failed flushes are retried while the backlog stays under this many batches
+MAX_BACKLOG_BATCHES = 10
+
+_CHUNK_SIZE = 500
+
+
+class AuditLog:
+    """In-process buffer of auth events and pending last_login updates."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._events = []
+        self._last_login = {}
+        self._thread = None
+        self._pid = None
+        self._atexit_registered = False
+
+    @property
+    def batch_size(self) -> int:
+        return getattr(settings, "AUTH_AUDIT_BATCH_SIZE", DEFAULT_BATCH_SIZE)
+
+    @property
+    def flush_interval(self) -> float:
+        return getattr(settings, "AUTH_AUDIT_FLUSH_INTERVAL", DEFAULT_FLUSH_INTERVAL)
+
+    @property
+    def background(self) -> bool:
+        return getattr(settings, "AUTH_AUDIT_BACKGROUND", True)
+
+    def record(self, event: str, user=None, identifier: str = "", request=None):
+        """Buffer an event; a successful login also schedules ``last_login``."""
+        now = timezone.now()
+        entry = AuthEvent(
+            user_id=user.pk if user else None,
+            event=event,
+            identifier=(identifier or getattr(user, "email", "") or "")[:254],
+            ip_address=_client_ip(request),
+            user_agent=_user_agent(request),
+            created_at=now,
+        )
+        with self._lock:
+            self._events.append(entry)
+            if event == AuthEvent.LOGIN and user is not None:
+                self._last_login[user.pk] = now
+            full = len(self._events) >= self.batch_size
+
+        if self.background:
+            self._ensure_worker()
+            if full:
+                self._wake.set()
+        elif full:
+            self.flush()
+
+    def discard(self):
+        """Drop buffered events without writing them."""
+        with self._lock:
+            self._events.clear()
+            self._last_login.clear()
+
+    def pending(self) -> int:
+        """Events waiting to be written."""
+        with self._lock:
+            return len(self._events)
+
+    def flush(self) -> int:
+        """Write everything buffered so far; returns the number of events written."""
+        with self._flush_lock:
+            with self._lock:
+                events, self._events = self._events, []
+                logins, self._last_login = self._last_login, {}
+            if not events and not logins:
+                return 0
+
+            try:
+                events, logins = _existing_users_only(events, logins)
+                with transaction.atomic():
+                    AuthEvent.objects.bulk_create(events, batch_size=_CHUNK_SIZE)
+                    User.objects.bulk_update(
+                        [User(pk=pk, last_login=at) for pk, at in logins.items()],
+                        ["last_login"],
+                        batch_size=_CHUNK_SIZE,
+                    )
+            except Exception:
+                self._requeue(events, logins)
+                return 0
+            return len(events)
+
+    def close(self):
+        """Stop the worker and write whatever is left."""
+        self._stopping.set()
+        self._wake.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout=max(self.flush_interval, 1.0) * 5)
+        self._thread = None
+        self.flush()
+
+    def _requeue(self, events: list, logins: dict):
+        with self._lock:
+            backlog = len(self._events) + len(events)
+            if backlog > self.batch_size * MAX_BACKLOG_BATCHES:
+                logger.exception(f"Auth audit flush failed; dropped {len(events)} events")
+                return
+            logger.exception(f"Auth audit flush failed; will retry {len(events)} events")
+            self._events[:0] = events
+            # Logins recorded since the failed flush are newer
+            for pk, at in logins.items():
+                self._last_login.setdefault(pk, at)
+
+    def _ensure_worker(self):
+        # A forked worker inherits the buffer object but not the thread
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._stopping.clear()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="auth-audit-flusher", daemon=True)
+            self._thread.start()
+            if not self._atexit_registered:
+                atexit.register(self.close)
+                self._atexit_registered = True
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            close_old_connections()
+            self.flush()
+        close_old_connections()
+
+
+def _existing_users_only(events: list, logins: dict) -> tuple:
+    """Null the user of events whose user no longer exists and drop their logins."""
+    referenced = list({event.user_id for event in events if event.user_id is not None} | set(logins))
+    existing = set()
+    for start in range(0, len(referenced), _CHUNK_SIZE):
+        existing.update(
+            User.objects.filter(pk__in=referenced[start:start + _CHUNK_SIZE]).values_list("pk", flat=True)
+        )
+    for event in events:
+        if event.user_id not in existing:
+            event.user_id = None
+    return events, {pk: at for pk, at in logins.items() if pk in existing}
+
+
+def _client_ip(request):
+    if request is None:
+        return None
+    return request.META.get("REMOTE_ADDR") or None
+
+
+def _user_agent(request) -> str:
+    if request is None:
+        return ""
+    return request.META.get("HTTP_USER_AGENT", "")[:255]
+
+
+# Instantiate globally for easy import
+audit_log = AuditLog()
@@ -0,0 +1,278 @@
+"""
+backend/backfill.py
+
+Resumable historical backfill for newly linked Items.
+
+``enqueue_backfill`` only inserts a ``BackfillJob`` row, so the token
+exchange view returns immediately. A worker (``manage.py run_backfills``)
+claims jobs and imports history in ``chunk_days`` date ranges from newest to
+oldest. Each chunk is upserted and the job checkpoint advanced in the same
+transaction, so after a crash or deploy the next worker resumes from the
+last completed chunk and re-running a chunk is harmless. Every claim stamps
+the job with a new token and the worker's writes are conditional on it, so a
+slow worker whose job was reclaimed stops at its next checkpoint instead of
+writing over the new owner's progress. Budget totals are
+adjusted in the same transaction from each chunk's inserted and changed rows,
+so imported spend can raise budget alerts. A failed job is
+queued again with exponential backoff until BACKFILL_MAX_ATTEMPTS.
+
+Each job keeps the access token of its own Item, since linking another Item
+replaces the token stored on the user. The copy is blanked once the job
+completes or finally fails.
+"""
+
+import logging
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from backend.balances import reconstruct_history, record_snapshots
+from backend.budgets import TransactionDelta, apply_sync_deltas
+from backend.merchants import merchant_normalizer
+from backend.plaid_client import plaid_client
+from backend.reconciliation import reconcile_transactions
+from finance.models import Account, BackfillJob, CashForecast, Transaction
+
+logger = logging.getLogger(__name__)
+
+
+class ClaimLost(Exception):
+    """The job was reclaimed by another worker while this one was running it."""
+
+DEFAULT_MONTHS = 24
+DEFAULT_CHUNK_DAYS = 30
+DEFAULT_STALE_SECONDS = 300
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_RETRY_SECONDS = 60
+MAX_RETRY_SECONDS = 60 * 60
+
+# Keep IN (...) lookups under SQLite's bound parameter limit
+_CHUNK_SIZE = 500
+
+_TRANSACTION_UPDATE_FIELDS = [
+    "account", "date", "authorized_at", "amount", "name", "merchant_name",
+    "category", "pending", "pending_transaction_id", "duplicate_of", "updated_at",
+]
+
+
+def enqueue_backfill(user, item_id: str, months: int = None, today: date = None,
+                     access_token: str = None) -> BackfillJob:
+    """
+    Queue a history import for an Item; does no Plaid calls itself.
+    ``access_token`` defaults to the token currently stored on the user.
+    """
+    months = months or getattr(settings, "BACKFILL_MONTHS", DEFAULT_MONTHS)
+    chunk_days = getattr(settings, "BACKFILL_CHUNK_DAYS", DEFAULT_CHUNK_DAYS)
+    end_date = today or timezone.localdate()
+    start_date = end_date - timedelta(days=round(months * 365.25 / 12))
+    total_days = (end_date - start_date).days + 1
+    return BackfillJob.objects.create(
+        user=user,
+        item_id=item_id,
+        access_token=access_token or user.plaid_access_token or "",
+        start_date=start_date,
+        end_date=end_date,
+        chunk_days=chunk_days,
+        cursor_date=end_date,
+        chunks_total=-(-total_days // chunk_days),
+    )
+
+
+def claim_next_job(now: datetime = None):
+    """
+    Claim a queued job, or a running one whose worker stopped heartbeating.
+    The conditional UPDATE makes the claim safe with several workers.
+    """
+    now = now or timezone.now()
+    stale_before = now - timedelta(seconds=getattr(settings, "BACKFILL_STALE_SECONDS", DEFAULT_STALE_SECONDS))
+    candidates = BackfillJob.objects.filter(
+        Q(status=BackfillJob.STATUS_QUEUED, available_at__isnull=True)
+        | Q(status=BackfillJob.STATUS_QUEUED, available_at__lte=now)
+        | Q(status=BackfillJob.STATUS_RUNNING, heartbeat_at__lt=stale_before)
+    ).values_list("id", "status", "heartbeat_at")[:10]
+
+    for job_id, status, heartbeat_at in candidates:
+        claimed = BackfillJob.objects.filter(id=job_id, status=status, heartbeat_at=heartbeat_at).update(
+            status=BackfillJob.STATUS_RUNNING,
+            heartbeat_at=now,
+            claim_token=uuid.uuid4(),
+            attempts=F("attempts") + 1,
+            updated_at=now,
+        )
+        if claimed:
+            return BackfillJob.objects.select_related("user").get(id=job_id)
+    return None
+
+
+def run_job(job: BackfillJob):
+    """Import the remaining chunks of a claimed job."""
+    user = job.user
+    owned = BackfillJob.objects.filter(id=job.id, claim_token=job.claim_token)
+    access_token = job.access_token
+    max_attempts = getattr(settings, "BACKFILL_MAX_ATTEMPTS", DEFAULT_MAX_ATTEMPTS)
+
+    try:
+        accounts = _sync_accounts(user, job.item_id, access_token)
+        while job.cursor_date >= job.start_date:
+            chunk_end = job.cursor_date
+            chunk_start = max(job.start_date, chunk_end - timedelta(days=job.chunk_days - 1))
+            started = time.perf_counter()
+            response = plaid_client.get_transactions(access_token, chunk_start, chunk_end)
+            with transaction.atomic():
+                synced = _store_chunk(user, accounts, response["transactions"])
+                _checkpoint(job, owned, chunk_start - timedelta(days=1), synced)
+            logger.info(
+                f"Backfill {job.id}: {chunk_start}..{chunk_end} {synced} transactions "
+                f"in {time.perf_counter() - started:.2f}s ({job.chunks_done}/{job.chunks_total})"
+            )
+    except ClaimLost:
+        logger.warning(f"Backfill {job.id} was reclaimed by another worker; stopping at {job.cursor_date}")
+        return
+    except Exception as e:
+        logger.exception(f"Backfill {job.id} failed at {job.cursor_date}")
+        now = timezone.now()
+        status = BackfillJob.STATUS_FAILED if job.attempts >= max_attempts else BackfillJob.STATUS_QUEUED
+        retry_seconds = getattr(settings, "BACKFILL_RETRY_SECONDS", DEFAULT_RETRY_SECONDS)
+        delay = min(retry_seconds * 2 ** max(job.attempts - 1, 0), MAX_RETRY_SECONDS)
+        owned.update(
+            status=status, last_error=str(e)[:1000], heartbeat_at=None,
+            available_at=now + timedelta(seconds=delay), updated_at=now,
+            access_token=job.access_token if status == BackfillJob.STATUS_QUEUED else "",
+        )
+        return
+
+    now = timezone.now()
+    with transaction.atomic():
+        completed = owned.update(
+            status=BackfillJob.STATUS_COMPLETED, completed_at=now, last_error="", updated_at=now,
+            access_token="",
+        )
+        if not completed:
+            logger.warning(f"Backfill {job.id} was reclaimed by another worker before completing")
+            return
+        type(user).objects.filter(id=user.id).update(last_plaid_sync=now)
+        # The stored forecast predates the sync; get_forecast recomputes it
+        CashForecast.objects.filter(user=user).delete()
+        reconstruct_history(
+            Account.objects.filter(user=user, item_id=job.item_id), job.start_date, job.end_date,
+        )
+
+
+def run_pending(max_jobs: int = None) -> int:
+    """Process claimable jobs until none are left; returns jobs processed."""
+    processed = 0
+    while max_jobs is None or processed < max_jobs:
+        job = claim_next_job()
+        if job is None:
+            break
+        run_job(job)
+        processed += 1
+    return processed
+
+
+def _sync_accounts(user, item_id: str, access_token: str) -> dict:
+    """Upsert the Item's accounts and snapshot their balances; returns {plaid account_id: Account pk}."""
+    response = plaid_client.get_accounts(access_token)
+    Account.objects.bulk_create(
+        [
+            Account(
+                user=user,
+                item_id=item_id,
+                account_id=account["account_id"],
+                name=account["name"],
+                type=account["type"],
+                subtype=account.get("subtype") or "",
+                current_balance=_decimal(account["balances"].get("current")),
+                available_balance=_decimal(account["balances"].get("available")),
+            )
+            for account in response["accounts"]
+        ],
+        update_conflicts=True,
+        unique_fields=["account_id"],
+        update_fields=["item_id", "name", "type", "subtype", "current_balance", "available_balance", "updated_at"],
+    )
+    accounts = list(Account.objects.filter(user=user, item_id=item_id))
+    record_snapshots(accounts)
+    return {account.account_id: account.id for account in accounts}
+
+
+def _store_chunk(user, accounts: dict, transactions: list) -> int:
+    """
+    Upsert one chunk of transactions and fold the change into budget totals;
+    returns how many were written.
+    """
+    merchant_normalizer.normalize_transactions(transactions)
+    transactions = [txn for txn in transactions if txn["account_id"] in accounts]
+    reconcile_transactions(user, transactions)
+    rows = [
+        Transaction(
+            user=user,
+            account_id=accounts[txn["account_id"]],
+            transaction_id=txn["transaction_id"],
+            date=txn["date"],
+            authorized_at=txn.get("authorized_datetime"),
+            amount=_decimal(txn["amount"]),
+            name=txn["name"][:255],
+            merchant_name=txn["merchant_name"],
+            category=txn.get("category") or "",
+            pending=txn.get("pending", False),
+            pending_transaction_id=txn.get("pending_transaction_id"),
+            duplicate_of=txn["duplicate_of"],
+        )
+        for txn in transactions
+    ]
+    # A stored row is replaced: take its old values out, then add the new ones
+    deltas = [TransactionDelta.from_transaction(row, sign=-1) for row in _stored_rows(rows)]
+    deltas += [TransactionDelta.from_transaction(row) for row in rows]
+    Transaction.objects.bulk_create(
+        rows,
+        batch_size=_CHUNK_SIZE,
+        update_conflicts=True,
+        unique_fields=["transaction_id"],
+        update_fields=_TRANSACTION_UPDATE_FIELDS,
+    )
+    apply_sync_deltas(deltas)
+    return len(rows)
+
+
+def _stored_rows(rows: list) -> list:
+    """The stored versions of ``rows``, with the fields budget deltas need."""
+    ids = [row.transaction_id for row in rows]
+    stored = []
+    for start in range(0, len(ids), _CHUNK_SIZE):
+        stored += Transaction.objects.filter(transaction_id__in=ids[start:start + _CHUNK_SIZE]).only(
+            "user_id", "category", "date", "amount", "pending", "duplicate_of",
+        )
+    return stored
+
+
+def _checkpoint(job: BackfillJob, owned, cursor_date: date, synced: int):
+    """
+    Persist progress after a chunk and refresh the heartbeat. ``owned`` is
+    the job filtered on this worker's claim token; raises ClaimLost (rolling
+    back the chunk) when another worker has claimed the job since.
+    """
+    now = timezone.now()
+    updated = owned.update(
+        cursor_date=cursor_date,
+        chunks_done=job.chunks_done + 1,
+        transactions_synced=job.transactions_synced + synced,
+        heartbeat_at=now,
+        updated_at=now,
+    )
+    if not updated:
+        raise ClaimLost(job.id)
+    job.cursor_date = cursor_date
+    job.chunks_done += 1
+    job.transactions_synced += synced
+    job.heartbeat_at = now
+
+
+def _decimal(value):
+    return None if value is None else Decimal(str(value))
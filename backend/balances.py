@@ -0,0 +1,243 @@
+"""
+backend/balances.py
+
+Balance history for net-worth and balance-trend charts.
+
+Snapshots are kept in three tiers of ``BalanceSnapshot``: daily, weekly and
+monthly closing balances. Every sync upserts the current balance into all
+three (the weekly and monthly rows are simply overwritten until the period
+ends), so each tier is complete on its own and ``balance_series`` reads a
+single tier: a five-year chart reads about 60 monthly rows per account
+instead of 1,800 daily ones.
+
+``compact_snapshots`` bounds the table: daily rows older than
+BALANCE_DAILY_RETENTION_DAYS and weekly rows older than
+BALANCE_WEEKLY_RETENTION_DAYS are downsampled into the coarser tiers
+(filling any gaps there) and deleted. Monthly rows are kept.
+"""
+
+import logging
+from datetime import date, timedelta
+from decimal import Decimal
+from itertools import groupby
+from operator import itemgetter
+
+from django.conf import settings
+from django.db.models import Sum
+from django.utils import timezone
+
+from backend.periods import period_start
+from finance.models import BalanceSnapshot, Transaction
+
+logger = logging.getLogger(__name__)
+
+DAILY = BalanceSnapshot.RESOLUTION_DAILY
+WEEKLY = BalanceSnapshot.RESOLUTION_WEEKLY
+MONTHLY = BalanceSnapshot.RESOLUTION_MONTHLY
+
+DEFAULT_DAILY_RETENTION_DAYS = 90
+DEFAULT_WEEKLY_RETENTION_DAYS = 730
+
+# Balances on these account types are owed, so they count against net worth
+LIABILITY_TYPES = ("credit", "loan")
+
+_CHUNK_SIZE = 500
+
+
+def daily_retention() -> int:
+    return getattr(settings, "BALANCE_DAILY_RETENTION_DAYS", DEFAULT_DAILY_RETENTION_DAYS)
+
+
+def weekly_retention() -> int:
+    return getattr(settings, "BALANCE_WEEKLY_RETENTION_DAYS", DEFAULT_WEEKLY_RETENTION_DAYS)
+
+
+def bucket(resolution: str, day: date) -> date:
+    """Date a snapshot for ``day`` is stored under in the given tier."""
+    return day if resolution == DAILY else period_start(resolution, day)
+
+
+def record_snapshots(accounts, day: date = None) -> int:
+    """
+    Upsert the accounts' current balances as the closing balance of ``day``
+    (default today) in every tier. Returns rows written.
+    """
+    day = day or timezone.localdate()
+    rows = [
+        BalanceSnapshot(
+            account_id=account.id,
+            resolution=resolution,
+            date=bucket(resolution, day),
+            current_balance=account.current_balance,
+            available_balance=account.available_balance,
+        )
+        for account in accounts
+        for resolution in (DAILY, WEEKLY, MONTHLY)
+    ]
+    BalanceSnapshot.objects.bulk_create(
+        rows,
+        batch_size=_CHUNK_SIZE,
+        update_conflicts=True,
+        unique_fields=["account", "resolution", "date"],
+        update_fields=["current_balance", "available_balance", "updated_at"],
+    )
+    return len(rows)
+
+
+def reconstruct_history(accounts, start: date, end: date) -> int:
+    """
+    Derive past closing balances from each account's current balance and
+    its posted transactions between ``start`` and ``end`` (the day the
+    current balance was observed). Rows already recorded by a sync win.
+    Returns rows written.
+    """
+    accounts = [account for account in accounts if account.current_balance is not None]
+    if not accounts:
+        return 0
+    days = (end - start).days + 1
+    daily_net = {account.id: [0] * days for account in accounts}
+    totals = (
+        Transaction.objects.filter(
+            account_id__in=list(daily_net), date__range=(start, end),
+            pending=False, duplicate_of__isnull=True,
+        )
+        .values("account_id", "date").annotate(total=Sum("amount")).order_by()
+    )
+    for row in totals:
+        daily_net[row["account_id"]][(row["date"] - start).days] = int(row["total"] * 100)
+
+    dates = [start + timedelta(days=offset) for offset in range(days)]
+    daily_from = end - timedelta(days=daily_retention())
+    weekly_from = end - timedelta(days=weekly_retention())
+    rows = []
+    for account in accounts:
+        net = daily_net[account.id]
+        # Closing balance of day d = today's balance with every later day undone.
+        # Positive amounts are outflows: they lowered an asset and raised a liability.
+        sign = -1 if account.type in LIABILITY_TYPES else 1
+        balance = int(account.current_balance * 100)
+        closing = [0] * days
+        for offset in range(days - 1, -1, -1):
+            closing[offset] = balance
+            balance += sign * net[offset]
+
+        last_in_bucket = {}
+        for offset, day in enumerate(dates):
+            if day >= daily_from:
+                last_in_bucket[(DAILY, day)] = offset
+            if day >= weekly_from:
+                last_in_bucket[(WEEKLY, bucket(WEEKLY, day))] = offset
+            last_in_bucket[(MONTHLY, bucket(MONTHLY, day))] = offset
+        rows += [
+            BalanceSnapshot(
+                account_id=account.id,
+                resolution=resolution,
+                date=snapshot_date,
+                current_balance=Decimal(closing[offset]).scaleb(-2),
+            )
+            for (resolution, snapshot_date), offset in last_in_bucket.items()
+        ]
+
+    BalanceSnapshot.objects.bulk_create(rows, batch_size=_CHUNK_SIZE, ignore_conflicts=True)
+    return len(rows)
+
+
+def compact_snapshots(today: date = None) -> dict:
+    """
+    Downsample and delete snapshots past their tier's retention. Cutoffs
+    are aligned to whole weeks and months, so no period is left half
+    compacted. Returns the number of rows deleted per tier.
+    """
+    today = today or timezone.localdate()
+    daily_cutoff = period_start("weekly", today - timedelta(days=daily_retention()))
+    weekly_cutoff = period_start("monthly", today - timedelta(days=weekly_retention()))
+
+    _downsample(DAILY, (WEEKLY, MONTHLY), before=daily_cutoff)
+    deleted_daily, _ = BalanceSnapshot.objects.filter(resolution=DAILY, date__lt=daily_cutoff).delete()
+    _downsample(WEEKLY, (MONTHLY,), before=weekly_cutoff)
+    deleted_weekly, _ = BalanceSnapshot.objects.filter(resolution=WEEKLY, date__lt=weekly_cutoff).delete()
+
+    logger.info(f"Compacted balance snapshots: {deleted_daily} daily, {deleted_weekly} weekly rows removed")
+    return {DAILY: deleted_daily, WEEKLY: deleted_weekly}
+
+
+def pick_resolution(start: date, today: date = None) -> str:
+    """The finest tier whose retention still reaches back to ``start``."""
+    age = ((today or timezone.localdate()) - start).days
+    if age <= daily_retention():
+        return DAILY
+    if age <= weekly_retention():
+        return WEEKLY
+    return MONTHLY
+
+
+def balance_series(user, start: date, end: date, resolution: str = None, account_ids=None) -> list:
+    """
+    Chart-ready net balance of the user's accounts over time:
+    ``[{"date": ..., "balance": ...}, ...]`` from a single tier. Accounts
+    without a snapshot in some period carry their previous balance forward;
+    liabilities are subtracted.
+    """
+    resolution = resolution or pick_resolution(start)
+    if resolution not in (DAILY, WEEKLY, MONTHLY):
+        raise ValueError(f"Unknown resolution: {resolution}")
+
+    snapshots = BalanceSnapshot.objects.filter(
+        account__user=user,
+        resolution=resolution,
+        date__range=(bucket(resolution, start), end),
+    )
+    if account_ids is not None:
+        snapshots = snapshots.filter(account_id__in=account_ids)
+    rows = snapshots.order_by("date").values_list("date", "account_id", "current_balance", "account__type")
+
+    latest = {}
+    series = []
+    for snapshot_date, group in groupby(rows, key=itemgetter(0)):
+        for _, account_id, balance, account_type in group:
+            value = balance or Decimal(0)
+            latest[account_id] = -value if account_type in LIABILITY_TYPES else value
+        series.append({"date": snapshot_date, "balance": float(sum(latest.values()))})
+    return series
+
+
+def _downsample(source: str, targets: tuple, before: date) -> int:
+    """
+    Write the last ``source`` row of each target period before ``before``
+    into the target tiers where no row exists yet. Streams one account at a
+    time in (account, date) order.
+    """
+    rows = (
+        BalanceSnapshot.objects.filter(resolution=source, date__lt=before)
+        .order_by("account_id", "date")
+        .values_list("account_id", "date", "current_balance", "available_balance")
+        .iterator(chunk_size=2000)
+    )
+    pending = []
+    written = 0
+    closing = {}
+    current_account = None
+    for account_id, snapshot_date, current_balance, available_balance in rows:
+        if account_id != current_account:
+            pending += _closing_rows(current_account, closing)
+            closing = {}
+            current_account = account_id
+        for resolution in targets:
+            closing[(resolution, bucket(resolution, snapshot_date))] = (current_balance, available_balance)
+        if len(pending) >= _CHUNK_SIZE:
+            BalanceSnapshot.objects.bulk_create(pending, batch_size=_CHUNK_SIZE, ignore_conflicts=True)
+            written += len(pending)
+            pending = []
+    pending += _closing_rows(current_account, closing)
+    BalanceSnapshot.objects.bulk_create(pending, batch_size=_CHUNK_SIZE, ignore_conflicts=True)
+    return written + len(pending)
+
+
+def _closing_rows(account_id, closing: dict) -> list:
+    return [
+        BalanceSnapshot(
+            account_id=account_id, resolution=resolution, date=snapshot_date,
+            current_balance=current_balance, available_balance=available_balance,
+        )
+        for (resolution, snapshot_date), (current_balance, available_balance) in closing.items()
+    ]
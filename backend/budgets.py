@@ -0,0 +1,226 @@
+"""
+backend/budgets.py
+
+Incremental budget tracking.
+
+Each sync produces deltas (transactions added, changed or removed). Instead
+of recomputing every budget, only budgets whose (user, category) appear in
+the deltas are loaded, their running ``BudgetPeriod`` totals are adjusted,
+and just those periods are checked against the alert thresholds. Alerts are
+inserted under a unique constraint, so each threshold fires once per period.
+
+Deltas must be applied after the transactions themselves are saved: a period
+without a running total yet is seeded from the transactions table, which
+already includes the delta.
+
+Budgets count posted spend only. Pending rows, and pending rows already
+settled by a posted one (``duplicate_of``), contribute nothing, both to the
+running totals and to the seed, so a purchase is counted once, when it posts.
+"""
+
+import logging
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.utils import timezone
+
+from backend.periods import period_start
+from finance.models import Budget, BudgetAlert, BudgetPeriod, Transaction
+
+logger = logging.getLogger(__name__)
+
+# Percent of the limit at which an alert fires
+THRESHOLDS = (80, 100)
+
+# Keep IN (...) lookups under SQLite's bound parameter limit
+_CHUNK_SIZE = 500
+
+_TRUNC_FUNCTIONS = {
+    Budget.PERIOD_WEEKLY: TruncWeek,
+    Budget.PERIOD_MONTHLY: TruncMonth,
+}
+
+
+@dataclass(frozen=True)
+class TransactionDelta:
+    """Change in spend for a user's category on a given date."""
+
+    user_id: object
+    category: str
+    date: date
+    amount: Decimal
+
+    @classmethod
+    def from_transaction(cls, txn, sign: int = 1):
+        """
+        Delta for a saved transaction; use ``sign=-1`` for removals. Pending
+        and settled-pending rows yield a zero delta, which is ignored.
+        """
+        if txn.pending or txn.duplicate_of:
+            return cls(txn.user_id, txn.category, txn.date, Decimal(0))
+        return cls(txn.user_id, txn.category, txn.date, txn.amount * sign)
+
+
+def apply_sync_deltas(deltas, thresholds=THRESHOLDS) -> list:
+    """
+    Fold sync deltas into running budget totals and return the
+    ``BudgetAlert`` rows created for newly crossed thresholds.
+    """
+    by_key = defaultdict(list)
+    for delta in deltas:
+        if delta.category and delta.amount:
+            by_key[(str(delta.user_id), delta.category)].append((delta.date, delta.amount))
+
+    keys = list(by_key)
+    alerts = []
+    for start in range(0, len(keys), _CHUNK_SIZE):
+        alerts.extend(_apply_chunk(keys[start:start + _CHUNK_SIZE], by_key, thresholds))
+
+    if alerts:
+        logger.info(f"Budget evaluation raised {len(alerts)} alerts")
+    return alerts
+
+
+def _apply_chunk(keys, by_key, thresholds) -> list:
+    budgets = {
+        budget.id: budget
+        for budget in Budget.objects.filter(
+            is_active=True,
+            user_id__in={user_id for user_id, _ in keys},
+            category__in={category for _, category in keys},
+        )
+        if (str(budget.user_id), budget.category) in by_key
+    }
+    if not budgets:
+        return []
+
+    increments = defaultdict(Decimal)
+    for budget in budgets.values():
+        for day, amount in by_key[(str(budget.user_id), budget.category)]:
+            increments[(budget.id, period_start(budget.period, day))] += amount
+
+    now = timezone.now()
+    with transaction.atomic():
+        existing = {
+            (row.budget_id, row.period_start): row
+            for row in BudgetPeriod.objects.select_for_update().filter(
+                budget_id__in=list(budgets),
+                period_start__in={start for _, start in increments},
+            )
+        }
+
+        updated = []
+        missing = []
+        for key, amount in increments.items():
+            row = existing.get(key)
+            if row is None:
+                missing.append(key)
+            else:
+                row.spent += amount
+                row.updated_at = now
+                updated.append(row)
+
+        seeded = _seed_totals(missing, budgets)
+        created = [
+            BudgetPeriod(budget_id=budget_id, period_start=start, spent=seeded.get((budget_id, start), 0))
+            for budget_id, start in missing
+        ]
+
+        BudgetPeriod.objects.bulk_update(updated, ["spent", "updated_at"], batch_size=_CHUNK_SIZE)
+        BudgetPeriod.objects.bulk_create(created, batch_size=_CHUNK_SIZE, ignore_conflicts=True)
+        if created:
+            created = _recount_raced(missing, seeded, budgets)
+
+        return _evaluate(updated + created, budgets, thresholds)
+
+
+def _recount_raced(keys, seeded, budgets) -> list:
+    """
+    Lock the periods just inserted. A concurrent sync may have created some
+    of them first, from a snapshot without this sync's transactions; those
+    are recounted from the transactions table under the lock.
+    """
+    rows = [
+        row
+        for row in BudgetPeriod.objects.select_for_update().filter(
+            budget_id__in={budget_id for budget_id, _ in keys},
+            period_start__in={start for _, start in keys},
+        )
+        if (row.budget_id, row.period_start) in seeded
+    ]
+    raced = [row for row in rows if row.spent != seeded[(row.budget_id, row.period_start)]]
+    if raced:
+        totals = _seed_totals([(row.budget_id, row.period_start) for row in raced], budgets)
+        for row in raced:
+            row.spent = totals[(row.budget_id, row.period_start)]
+        BudgetPeriod.objects.bulk_update(raced, ["spent", "updated_at"], batch_size=_CHUNK_SIZE)
+    return rows
+
+
+def _seed_totals(keys, budgets) -> dict:
+    """Spend per (budget id, period start) from posted, non-duplicate transactions."""
+    totals = {}
+    by_period = defaultdict(list)
+    for budget_id, start in keys:
+        by_period[budgets[budget_id].period].append((budget_id, start))
+
+    for period, period_keys in by_period.items():
+        period_budgets = [budgets[budget_id] for budget_id, _ in period_keys]
+        starts = [start for _, start in period_keys]
+        rows = (
+            Transaction.objects.filter(
+                pending=False,
+                duplicate_of__isnull=True,
+                user_id__in={b.user_id for b in period_budgets},
+                category__in={b.category for b in period_budgets},
+                date__gte=min(starts),
+                date__lt=max(starts) + timedelta(days=7 if period == Budget.PERIOD_WEEKLY else 31),
+            )
+            .annotate(bucket=_TRUNC_FUNCTIONS[period]("date"))
+            .values("user_id", "category", "bucket")
+            .annotate(total=Sum("amount"))
+            .order_by()
+        )
+        spend = {(str(r["user_id"]), r["category"], r["bucket"]): r["total"] for r in rows}
+        for budget_id, start in period_keys:
+            budget = budgets[budget_id]
+            totals[(budget_id, start)] = spend.get((str(budget.user_id), budget.category, start), 0)
+    return totals
+
+
+def _evaluate(rows, budgets, thresholds) -> list:
+    """Create alerts for thresholds reached by the given periods."""
+    candidates = []
+    for row in rows:
+        limit = budgets[row.budget_id].limit
+        if limit <= 0:
+            continue
+        for threshold in thresholds:
+            if row.spent * 100 >= limit * threshold:
+                candidates.append(BudgetAlert(
+                    budget_id=row.budget_id,
+                    period_start=row.period_start,
+                    threshold=threshold,
+                    spent=row.spent,
+                ))
+    if not candidates:
+        return []
+
+    raised = set(
+        BudgetAlert.objects.filter(
+            budget_id__in={alert.budget_id for alert in candidates},
+            period_start__in={alert.period_start for alert in candidates},
+        ).values_list("budget_id", "period_start", "threshold")
+    )
+    new_alerts = [
+        alert for alert in candidates
+        if (alert.budget_id, alert.period_start, alert.threshold) not in raised
+    ]
+    # ignore_conflicts covers a concurrent sync raising the same alert
+    BudgetAlert.objects.bulk_create(new_alerts, ignore_conflicts=True, batch_size=_CHUNK_SIZE)
+    return new_alerts
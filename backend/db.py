@@ -0,0 +1,23 @@
+"""
+backend/db.py
+
+DB helpers for non-Django code such as the Streamlit app and scripts.
+"""
+
+import os
+
+
+def setup_django(settings_module: str = "config.settings"):
+    """
+    Configure Django so the ORM can be used outside manage.py.
+    Safe to call more than once.
+    """
+    from django.apps import apps
+
+    if apps.ready:
+        return
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+
+    import django
+
+    django.setup()
@@ -0,0 +1,369 @@
+"""
+backend/forecasting.py
+
+Day-by-day cash-flow forecasts.
+
+A forecast starts from each account's current balance and adds two kinds of
+projected flows:
+
+* recurring income and expenses (payroll, rent, subscriptions): a merchant
+  seen at least MIN_OCCURRENCES times on one account at a steady weekly,
+  biweekly or monthly cadence and a steady amount, projected forward from
+  its last occurrence;
+* everything else, as the account's average daily amount per category over
+  the last FORECAST_LOOKBACK_DAYS.
+
+All accounts of a chunk of users are projected together as one
+(accounts x days) NumPy matrix, so ``refresh_forecasts`` (run nightly)
+needs two queries per FORECAST_BATCH_USERS users. Forecasts are stored in
+the ``cash_forecasts`` table, one row per user, so every worker reads what
+the batch wrote. A row is stamped with the user's ``last_plaid_sync`` and
+the day it starts from: ``get_forecast`` recomputes a missing row, one older
+than the user's last sync, or one from an earlier day.
+
+NumPy is slow to import, so request-path modules import this one lazily.
+"""
+
+import logging
+from datetime import date, timedelta
+
+import numpy as np
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from backend.balances import LIABILITY_TYPES
+from backend.routers import read_replica
+from finance.models import Account, CashForecast, Transaction
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HORIZON_DAYS = 90
+DEFAULT_LOOKBACK_DAYS = 180
+DEFAULT_BATCH_USERS = 500
+
+# (name, period in days, tolerance in days for the mean gap and its spread)
+CADENCES = (
+    ("weekly", 7, 1.0),
+    ("biweekly", 14, 2.0),
+    ("monthly", 30.44, 3.0),
+)
+MONTHLY = 2
+MIN_OCCURRENCES = 3
+# Largest standard deviation of a recurring amount, relative to its mean
+AMOUNT_TOLERANCE = 0.4
+# A series not seen for this many periods has stopped
+STALE_PERIODS = 1.5
+
+
+def horizon_days() -> int:
+    return getattr(settings, "FORECAST_HORIZON_DAYS", DEFAULT_HORIZON_DAYS)
+
+
+def lookback_days() -> int:
+    return getattr(settings, "FORECAST_LOOKBACK_DAYS", DEFAULT_LOOKBACK_DAYS)
+
+
+def sync_version(last_plaid_sync) -> str:
+    return last_plaid_sync.isoformat() if last_plaid_sync else "never"
+
+
+def get_forecast(user, today: date = None) -> dict:
+    """The user's stored forecast, recomputed if missing, older than their last sync or from an earlier day."""
+    today = today or timezone.localdate()
+    row = CashForecast.objects.filter(user_id=user.id).values_list("sync_version", "generated_on", "payload").first()
+    if row is not None and row[:2] == (sync_version(user.last_plaid_sync), today):
+        return _load(*row)
+    forecasts = forecast_users([(user.id, user.last_plaid_sync)], today=today)
+    _store(forecasts)
+    return forecasts[user.id]
+
+
+def invalidate_forecast(user_id):
+    CashForecast.objects.filter(user_id=user_id).delete()
+
+
+def refresh_forecasts(today: date = None, batch_users: int = None) -> int:
+    """Recompute and store the forecast of every user with accounts. Returns users forecast."""
+    batch_users = batch_users or getattr(settings, "FORECAST_BATCH_USERS", DEFAULT_BATCH_USERS)
+    with read_replica():
+        users = list(
+            get_user_model().objects.filter(accounts__isnull=False)
+            .order_by().distinct().values_list("id", "last_plaid_sync")
+        )
+    for offset in range(0, len(users), batch_users):
+        _store(forecast_users(users[offset:offset + batch_users], today=today))
+    logger.info(f"Refreshed cash-flow forecasts for {len(users)} users")
+    return len(users)
+
+
+def forecast_users(users, today: date = None) -> dict:
+    """
+    Forecast ``users`` (pairs of user id and ``last_plaid_sync``) for the
+    next FORECAST_HORIZON_DAYS days. Returns {user_id: forecast}.
+    """
+    today = today or timezone.localdate()
+    horizon = horizon_days()
+    versions = dict(users)
+    with read_replica():
+        accounts = list(
+            Account.objects.filter(user_id__in=list(versions))
+            .order_by("user_id", "name")
+            .values_list("id", "user_id", "account_id", "name", "type", "current_balance")
+        )
+        history = list(
+            Transaction.objects.filter(
+                user_id__in=list(versions),
+                date__range=(today - timedelta(days=lookback_days()), today),
+                pending=False, duplicate_of__isnull=True,
+            )
+            .order_by()
+            .values_list("account_id", "date", "amount", "category", "merchant_name", "name")
+        )
+
+    index = {row[0]: position for position, row in enumerate(accounts)}
+    balances = np.array([float(row[5] or 0) * 100 for row in accounts], dtype=np.float64)
+    liability = np.array([row[4] in LIABILITY_TYPES for row in accounts], dtype=bool)
+
+    if history:
+        account = np.fromiter((index[row[0]] for row in history), dtype=np.int64, count=len(history))
+        day = (
+            np.array([row[1] for row in history], dtype="datetime64[D]") - np.datetime64(today)
+        ).astype(np.int64)
+        cents = np.rint(np.array([row[2] for row in history], dtype=np.float64) * 100)
+        categories, category = _factorize(row[3] or "" for row in history)
+        merchants, merchant = _factorize(row[4] or row[5] for row in history)
+    else:
+        account = day = cents = category = merchant = np.zeros(0, dtype=np.int64)
+        categories = merchants = []
+
+    recurring = _detect_recurring(account, day, cents, merchant, len(merchants))
+    due = _project(recurring["cadence"], recurring["last"], today, horizon)
+    flows = _average_flows(account, day, cents, category, len(categories), len(accounts), ~recurring["rows"])
+
+    # Daily flows per account: category averages every day plus recurring hits
+    scheduled = due > 0
+    series_account = recurring["series"] // max(len(merchants), 1)
+    matrix = np.repeat(flows.sum(axis=1, keepdims=True), horizon, axis=1)
+    matrix += np.bincount(
+        (series_account[:, None] * horizon + due - 1)[scheduled],
+        weights=np.broadcast_to(recurring["amount"][:, None], due.shape)[scheduled],
+        minlength=len(accounts) * horizon,
+    ).reshape(len(accounts), horizon)
+    # Positive amounts are outflows: they lower an asset and raise a liability
+    projected = balances[:, None] - np.where(liability, -1, 1)[:, None] * np.cumsum(matrix, axis=1)
+    signed = np.where(liability[:, None], -projected, projected)
+
+    dates = [today + timedelta(days=offset) for offset in range(1, horizon + 1)]
+    first_due = np.where(scheduled, due, horizon + 1).min(axis=1, initial=horizon + 1)
+    forecasts = {}
+    for user_id in versions:
+        forecasts[user_id] = {
+            "sync_version": sync_version(versions[user_id]),
+            "generated_on": today,
+            "accounts": [],
+            "series": [],
+            "recurring": [],
+            "average_daily_spend": {},
+        }
+    start = 0
+    for user_id, rows in _runs(accounts):
+        stop = start + rows
+        forecast = forecasts[user_id]
+        forecast["accounts"] = [
+            {"account_id": accounts[row][2], "name": accounts[row][3], "type": accounts[row][4],
+             "balances": np.round(projected[row] / 100, 2).tolist()}
+            for row in range(start, stop)
+        ]
+        net = np.round(signed[start:stop].sum(axis=0) / 100, 2)
+        forecast["series"] = [{"date": day_, "balance": balance} for day_, balance in zip(dates, net.tolist())]
+        spend = flows[start:stop].sum(axis=0) / 100
+        forecast["average_daily_spend"] = {
+            categories[code]: round(float(spend[code]), 2) for code in np.flatnonzero(np.round(spend, 2))
+        }
+        mine = np.flatnonzero((series_account >= start) & (series_account < stop))
+        forecast["recurring"] = sorted(
+            (
+                {
+                    "account_id": accounts[series_account[series]][2],
+                    "merchant": merchants[recurring["series"][series] % len(merchants)],
+                    "cadence": CADENCES[recurring["cadence"][series]][0],
+                    "amount": round(float(recurring["amount"][series]) / 100, 2),
+                    "next_date": (
+                        today + timedelta(days=int(first_due[series])) if first_due[series] <= horizon else None
+                    ),
+                }
+                for series in mine
+            ),
+            key=lambda item: (item["next_date"] or date.max, item["merchant"]),
+        )
+        start = stop
+    return forecasts
+
+
+def forecast_window(forecast: dict, days: int) -> dict:
+    """The first ``days`` days of a forecast."""
+    end = forecast["generated_on"] + timedelta(days=days)
+    return {
+        **forecast,
+        "accounts": [{**account, "balances": account["balances"][:days]} for account in forecast["accounts"]],
+        "series": forecast["series"][:days],
+        "recurring": [item for item in forecast["recurring"] if item["next_date"] and item["next_date"] <= end],
+    }
+
+
+def _store(forecasts: dict):
+    """Upsert forecasts ({user_id: forecast}) in one query."""
+    CashForecast.objects.bulk_create(
+        [
+            CashForecast(
+                user_id=user_id,
+                sync_version=forecast["sync_version"],
+                generated_on=forecast["generated_on"],
+                payload={
+                    "accounts": forecast["accounts"],
+                    "series": [
+                        {"date": point["date"].isoformat(), "balance": point["balance"]}
+                        for point in forecast["series"]
+                    ],
+                    "recurring": [
+                        {**item, "next_date": item["next_date"] and item["next_date"].isoformat()}
+                        for item in forecast["recurring"]
+                    ],
+                    "average_daily_spend": forecast["average_daily_spend"],
+                },
+            )
+            for user_id, forecast in forecasts.items()
+        ],
+        update_conflicts=True,
+        unique_fields=["user"],
+        update_fields=["sync_version", "generated_on", "payload", "updated_at"],
+    )
+
+
+def _load(version: str, generated_on: date, payload: dict) -> dict:
+    """A stored forecast in the shape ``forecast_users`` returns."""
+    return {
+        "sync_version": version,
+        "generated_on": generated_on,
+        "accounts": payload["accounts"],
+        "series": [
+            {"date": date.fromisoformat(point["date"]), "balance": point["balance"]}
+            for point in payload["series"]
+        ],
+        "recurring": [
+            {**item, "next_date": item["next_date"] and date.fromisoformat(item["next_date"])}
+            for item in payload["recurring"]
+        ],
+        "average_daily_spend": payload["average_daily_spend"],
+    }
+
+
+def _runs(accounts: list):
+    """(user_id, number of accounts) for consecutive accounts of the same user."""
+    current, count = None, 0
+    for row in accounts:
+        if row[1] != current:
+            if count:
+                yield current, count
+            current, count = row[1], 0
+        count += 1
+    if count:
+        yield current, count
+
+
+def _factorize(values) -> tuple:
+    """Distinct values in order of appearance, and each value's code (cheaper than sorting strings)."""
+    codes = {}
+    encoded = np.fromiter((codes.setdefault(value, len(codes)) for value in values), dtype=np.int64)
+    return list(codes), encoded
+
+
+def _detect_recurring(account, day, cents, merchant, merchants: int) -> dict:
+    """
+    Group rows by (account, merchant) and keep the groups that recur at a
+    steady cadence and amount and are still active. Returns per recurring
+    series its key (account * merchants + merchant), cadence index, mean
+    amount in cents and last day, plus a mask of the rows they cover.
+    """
+    series = account * max(merchants, 1) + merchant
+    order = np.lexsort((day, series))
+    series, day, cents = series[order], day[order], cents[order]
+    keys, first, counts = np.unique(series, return_index=True, return_counts=True)
+    group = np.repeat(np.arange(keys.size), counts)
+
+    same = group[1:] == group[:-1]
+    gap_group = group[1:][same]
+    gaps = np.diff(day)[same].astype(np.float64)
+    n_gaps = np.maximum(counts - 1, 1)
+    mean_gap = np.bincount(gap_group, gaps, minlength=keys.size) / n_gaps
+    gap_spread = np.sqrt(np.maximum(np.bincount(gap_group, gaps ** 2, minlength=keys.size) / n_gaps - mean_gap ** 2, 0))
+    mean_amount = np.bincount(group, cents, minlength=keys.size) / np.maximum(counts, 1)
+    amount_spread = np.sqrt(np.maximum(
+        np.bincount(group, cents ** 2, minlength=keys.size) / np.maximum(counts, 1) - mean_amount ** 2, 0,
+    ))
+    one_sign = np.abs(np.bincount(group, np.sign(cents), minlength=keys.size)) == counts
+    last = day[first + counts - 1] if keys.size else np.zeros(0, dtype=np.int64)
+
+    cadence = np.full(keys.size, -1)
+    period = np.zeros(keys.size)
+    for position, (_, days, tolerance) in enumerate(CADENCES):
+        fits = (cadence < 0) & (np.abs(mean_gap - days) <= tolerance) & (gap_spread <= tolerance)
+        cadence[fits] = position
+        period[fits] = days
+    recurring = (
+        (counts >= MIN_OCCURRENCES) & (cadence >= 0) & one_sign
+        & (amount_spread <= AMOUNT_TOLERANCE * np.abs(mean_amount))
+        & (-last <= STALE_PERIODS * period)
+    )
+
+    rows = np.zeros(order.size, dtype=bool)
+    rows[order] = recurring[group]
+    return {
+        "series": keys[recurring],
+        "cadence": cadence[recurring],
+        "amount": mean_amount[recurring],
+        "last": last[recurring],
+        "rows": rows,
+    }
+
+
+def _project(cadence, last, today: date, horizon: int) -> np.ndarray:
+    """
+    Day offsets (1..horizon) of each series' next occurrences, one row per
+    series; unused slots are 0. Monthly series keep their day of month; an
+    occurrence overdue by less than the cadence's tolerance is expected
+    tomorrow.
+    """
+    steps = np.arange(1, horizon // 7 + 3)
+    periods = np.array([days for _, days, _ in CADENCES])[cadence]
+    due = last[:, None] + np.rint(periods[:, None] * steps).astype(np.int64)
+
+    monthly = cadence == MONTHLY
+    if monthly.any():
+        last_date = np.datetime64(today) + last[monthly]
+        month = last_date.astype("datetime64[M]")
+        day_of_month = (last_date - month.astype("datetime64[D]")).astype(np.int64)
+        months = month[:, None] + steps
+        month_start = months.astype("datetime64[D]")
+        month_length = ((months + 1).astype("datetime64[D]") - month_start).astype(np.int64)
+        dates = month_start + np.minimum(day_of_month[:, None], month_length - 1)
+        due[monthly] = (dates - np.datetime64(today)).astype(np.int64)
+
+    grace = np.array([tolerance for _, _, tolerance in CADENCES])[cadence]
+    due = np.where((due <= 0) & (due > -grace[:, None]), 1, due)
+    return np.where((due >= 1) & (due <= horizon), due, 0)
+
+
+def _average_flows(account, day, cents, category, categories: int, accounts: int, mask) -> np.ndarray:
+    """
+    (accounts x categories) average daily amount in cents of the masked rows,
+    over the days each account has history for.
+    """
+    first = np.zeros(accounts, dtype=np.int64)
+    np.minimum.at(first, account, day)
+    observed = 1 - first
+    totals = np.bincount(
+        account[mask] * categories + category[mask], weights=cents[mask], minlength=accounts * categories,
+    ).reshape(accounts, categories)
+    return totals / observed[:, None]
@@ -0,0 +1,184 @@
+"""
+backend/merchants.py
+
+Merchant name normalization for raw bank descriptors.
+
+Raw descriptors such as "SQ *COFFEE 1234 SEATTLE" are reduced to a canonical
+merchant ("Coffee") by a fixed pipeline of compiled cleanup rules. The number
+of distinct descriptors is far lower than the number of transactions, so
+results are memoized per process and persisted in the shared
+``MerchantAlias`` table for every other worker and user. Memo entries expire
+after DEFAULT_MEMO_TTL_SECONDS, so a correction made in the admin reaches
+every worker within that time.
+"""
+
+import logging
+import re
+import string
+import threading
+
+from cachetools import TTLCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MEMO_SIZE = 50_000
+DEFAULT_MEMO_TTL_SECONDS = 300
+DESCRIPTOR_MAX_LENGTH = 255
+UNKNOWN_MERCHANT = "Unknown"
+
+# Keep IN (...) lookups under SQLite's bound parameter limit
+_LOOKUP_CHUNK_SIZE = 500
+
+# Ordered (pattern, replacement) cleanup rules, applied to upper-cased input
+_CLEANUP_RULES = [
+    # Card network / bank boilerplate in front of the merchant
+    (re.compile(r"^(?:POS|ACH|DEBIT|CREDIT|RECURRING|CHECKCARD|PURCHASE)(?:\s+(?:CARD|DEBIT|PURCHASE|PMT|PAYMENT))*(?:\s+\d{4})?\s+"), ""),
+    (re.compile(r"^AUTHORIZED ON \d{1,2}/\d{1,2}\s+"), ""),
+    (re.compile(r"^\d{1,2}/\d{1,2}\s+"), ""),
+    # Payment processor prefixes: "SQ *", "TST* ", "PAYPAL *", ...
+    (re.compile(r"^(?:SQ|TST|SP|PP|PY|IN|DD|CKO|BT|PAYPAL|GOOGLE|APL|APPLE\s*PAY)\s*\*\s*"), ""),
+    # Reference codes after an asterisk: "AMZN MKTP US*2K4AB1"
+    (re.compile(r"\*.*$"), ""),
+    # Web domains: "NETFLIX.COM" -> "NETFLIX"
+    (re.compile(r"\.(?:COM|NET|ORG|IO|CO)\b"), ""),
+    # Phone numbers
+    (re.compile(r"\b\d{3}[-.\s]?\d{3}[-.\s]?\d{4}\b"), ""),
+    # Store numbers and everything after them (usually city/state)
+    (re.compile(r"\s*#\s*\d+.*$"), ""),
+    (re.compile(r"\s+\d{3,}.*$"), ""),
+    # Punctuation other than & and '
+    (re.compile(r"[^A-Z0-9&' ]+"), " "),
+    (re.compile(r"\s+"), " "),
+]
+
+# Canonical names for brands whose descriptors vary beyond the rules above
+_KNOWN_MERCHANTS = [
+    (re.compile(r"^(?:AMZN|AMAZON)\b"), "Amazon"),
+    (re.compile(r"^(?:WM SUPERCENTER|WAL MART|WALMART)\b"), "Walmart"),
+    (re.compile(r"^UBER\s+(?:TRIP|EATS)?\b"), "Uber"),
+    (re.compile(r"^LYFT\b"), "Lyft"),
+    (re.compile(r"^NETFLIX\b"), "Netflix"),
+    (re.compile(r"^SPOTIFY\b"), "Spotify"),
+    (re.compile(r"^STARBUCKS\b"), "Starbucks"),
+    (re.compile(r"^(?:MCDONALD'?S|MCDONALDS)\b"), "McDonald's"),
+    (re.compile(r"^TARGET\b"), "Target"),
+    (re.compile(r"^COSTCO\b"), "Costco"),
+]
+
+
+def canonicalize(descriptor: str) -> str:
+    """
+    Run a raw descriptor through the cleanup pipeline.
+    Pure; does not consult the database (MerchantNormalizer memoizes it).
+    """
+    cleaned = (descriptor or "").upper().strip()
+    for pattern, replacement in _CLEANUP_RULES:
+        cleaned = pattern.sub(replacement, cleaned)
+    cleaned = cleaned.strip()
+
+    for pattern, merchant in _KNOWN_MERCHANTS:
+        if pattern.match(cleaned):
+            return merchant
+
+    if not cleaned:
+        return UNKNOWN_MERCHANT
+    return string.capwords(cleaned)
+
+
+class MerchantNormalizer:
+    """
+    Resolves descriptors to canonical merchants.
+    Lookup order is process memo, shared alias table, then the rule pipeline;
+    pipeline results are written back to the alias table.
+    """
+
+    def __init__(self, memo_size: int = DEFAULT_MEMO_SIZE, memo_ttl: float = DEFAULT_MEMO_TTL_SECONDS):
+        self._memo = TTLCache(maxsize=memo_size, ttl=memo_ttl)
+        self._lock = threading.Lock()
+
+    def normalize(self, descriptor: str) -> str:
+        """
+        Normalize a single descriptor.
+        """
+        return self.normalize_batch([descriptor])[_descriptor_key(descriptor)]
+
+    def normalize_batch(self, descriptors) -> dict:
+        """
+        Normalize many descriptors in one pass.
+        Returns a mapping of descriptor key -> canonical merchant name.
+        """
+        from finance.models import MerchantAlias
+
+        keys = {_descriptor_key(d) for d in descriptors}
+        resolved = {}
+        missing = []
+
+        with self._lock:
+            for key in keys:
+                merchant = self._memo.get(key)
+                if merchant is None:
+                    missing.append(key)
+                else:
+                    resolved[key] = merchant
+
+        if not missing:
+            return resolved
+
+        stored = {}
+        for start in range(0, len(missing), _LOOKUP_CHUNK_SIZE):
+            chunk = missing[start:start + _LOOKUP_CHUNK_SIZE]
+            stored.update(
+                MerchantAlias.objects.filter(descriptor__in=chunk)
+                .values_list('descriptor', 'merchant_name')
+            )
+
+        new_aliases = []
+        for key in missing:
+            merchant = stored.get(key)
+            if merchant is None:
+                merchant = canonicalize(key)
+                new_aliases.append(MerchantAlias(descriptor=key, merchant_name=merchant))
+            resolved[key] = merchant
+
+        if new_aliases:
+            # Another worker may have inserted the same descriptor meanwhile
+            MerchantAlias.objects.bulk_create(
+                new_aliases, ignore_conflicts=True, batch_size=_LOOKUP_CHUNK_SIZE
+            )
+            logger.debug(f"Stored {len(new_aliases)} new merchant aliases")
+
+        with self._lock:
+            for key in missing:
+                self._memo[key] = resolved[key]
+
+        return resolved
+
+    def normalize_transactions(self, transactions: list, source_field: str = "name") -> list:
+        """
+        Set ``merchant_name`` on every transaction dict of a sync batch in place.
+        """
+        mapping = self.normalize_batch(txn.get(source_field) for txn in transactions)
+        for txn in transactions:
+            txn["merchant_name"] = mapping[_descriptor_key(txn.get(source_field))]
+        return transactions
+
+    def invalidate(self, descriptors=None):
+        """
+        Drop memoized entries, e.g. after aliases were corrected by hand.
+        Only affects this process; others catch up when their entries expire.
+        """
+        with self._lock:
+            if descriptors is None:
+                self._memo.clear()
+                return
+            for descriptor in descriptors:
+                self._memo.pop(_descriptor_key(descriptor), None)
+
+
+def _descriptor_key(descriptor) -> str:
+    """Key used for the memo and the alias table."""
+    return " ".join((descriptor or "").split())[:DESCRIPTOR_MAX_LENGTH]
+
+
+# Instantiate globally for easy import
+merchant_normalizer = MerchantNormalizer()
@@ -3,6 +3,8 @@ Custom User model for banking automation application.
 """
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models.functions import Upper
+from django.utils import timezone
 import uuid
 
 
@@ -46,6 +48,21 @@ class User(AbstractUser):
         verbose_name = 'User'
         verbose_name_plural = 'Users'
         ordering = ['-created_at']
+        indexes = [
+            # Admin changelist ordering (the changelist appends -id as a tie-breaker),
+            # alone and behind each list_filter flag
+            models.Index(fields=['-created_at', '-id'], name='users_created_at_idx'),
+            models.Index(fields=['is_staff', '-created_at', '-id'], name='users_is_staff_idx'),
+            models.Index(fields=['is_superuser', '-created_at', '-id'], name='users_is_superuser_idx'),
+            models.Index(fields=['is_active', '-created_at', '-id'], name='users_is_active_idx'),
+            models.Index(fields=['email_verified', '-created_at', '-id'], name='users_email_verified_idx'),
+            models.Index(fields=['two_factor_enabled', '-created_at', '-id'], name='users_two_factor_idx'),
+            # Case-insensitive exact/prefix search on UPPER(column)
+            models.Index(Upper('email'), name='users_email_upper_idx'),
+            models.Index(Upper('username'), name='users_username_upper_idx'),
+            models.Index(Upper('first_name'), name='users_first_name_upper_idx'),
+            models.Index(Upper('last_name'), name='users_last_name_upper_idx'),
+        ]
 
     def __str__(self):
         return self.email
@@ -54,3 +71,41 @@ class User(AbstractUser):
     def has_plaid_connection(self):
         """Check if user has an active Plaid connection."""
         return bool(self.plaid_access_token and self.plaid_item_id)
+
+
+class AuthEvent(models.Model):
+    """
+    Authentication audit trail. Rows are buffered in-process and inserted in
+    batches by backend.audit, so ``created_at`` is the time of the event,
+    not of the insert.
+    """
+
+    LOGIN = 'login'
+    LOGIN_FAILED = 'login_failed'
+    LOGOUT = 'logout'
+    PASSWORD_CHANGED = 'password_changed'
+    EVENT_CHOICES = [
+        (LOGIN, 'Login'),
+        (LOGIN_FAILED, 'Failed login'),
+        (LOGOUT, 'Logout'),
+        (PASSWORD_CHANGED, 'Password changed'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='auth_events')
+    event = models.CharField(max_length=20, choices=EVENT_CHOICES)
+    # Submitted login identifier; the only trace of failures for unknown emails
+    identifier = models.CharField(max_length=254, blank=True, default='')
+    ip_address = models.GenericIPAddressField(null=True, blank=True)
+    user_agent = models.CharField(max_length=255, blank=True, default='')
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'auth_events'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='auth_events_user_idx'),
+            models.Index(fields=['event', '-created_at'], name='auth_events_event_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.event} {self.identifier or self.user_id} at {self.created_at}"
@@ -0,0 +1,261 @@
+"""
+backend/notifications.py
+
+Batched email dispatch for queued notifications.
+
+Pending ``Notification`` rows are filtered by user preferences and local
+delivery hours with bulk queries, split into batches, and each batch is sent
+by a worker thread over a single SMTP connection. Failed messages go to a
+retry queue and are attempted again in later rounds; status is written back
+in bulk. Worker threads never touch the database.
+
+Before any message is built, a run claims its rows with a conditional UPDATE
+(pending -> sending, stamped with the run's token), so overlapping runs on
+one or several hosts never send the same notification twice. Claims older
+than NOTIFICATION_CLAIM_STALE_SECONDS belong to a run that died and are
+picked up again.
+"""
+
+import logging
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone as dt_timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import F, Q
+from django.utils import timezone
+
+from finance.models import Notification
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 200
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_RETRY_DELAY = 5.0
+DEFAULT_CLAIM_STALE_SECONDS = 900
+
+# Keep IN (...) updates under SQLite's bound parameter limit
+_UPDATE_CHUNK_SIZE = 500
+
+
+@dataclass
+class DispatchResult:
+    """Outcome of a dispatch run."""
+
+    sent: int = 0
+    failed: int = 0
+    retried: int = 0
+    skipped: int = 0
+    deferred: int = 0
+
+
+def enqueue_report_ready(reports):
+    """Queue a "report ready" email for each report."""
+    Notification.objects.bulk_create(
+        [
+            Notification(user_id=report.user_id, report_id=report.id, kind=Notification.KIND_REPORT_READY)
+            for report in reports
+        ],
+        batch_size=DEFAULT_BATCH_SIZE,
+    )
+
+
+def is_within_send_window(tz_name: str, now: datetime, hours: tuple) -> bool:
+    """True when ``now`` falls inside [start, end) local hours for the zone."""
+    try:
+        zone = ZoneInfo(tz_name)
+    except (ZoneInfoNotFoundError, ValueError):
+        zone = dt_timezone.utc
+    start, end = hours
+    return start <= now.astimezone(zone).hour < end
+
+
+def build_message(notification) -> EmailMessage:
+    """
+    Build the email for one notification. Emails only link back to the app;
+    they never carry financial data.
+    """
+    user = notification.user
+    report = notification.report
+    base_url = getattr(settings, "APP_BASE_URL", "http://localhost:8501").rstrip("/")
+    greeting = f"Hi {user.first_name}," if user.first_name else "Hi,"
+    body = (
+        f"{greeting}\n\n"
+        f"Your {report.period} report for {report.period_start:%b %d, %Y} is ready.\n"
+        f"Sign in to view it: {base_url}/reports/\n"
+    )
+    return EmailMessage(
+        subject=f"Your {report.period} report is ready",
+        body=body,
+        from_email=settings.DEFAULT_FROM_EMAIL or None,
+        to=[user.email],
+    )
+
+
+class NotificationDispatcher:
+    """
+    Sends pending notifications in batches, one connection per batch.
+    """
+
+    def __init__(self, batch_size: int = None, max_workers: int = None,
+                 max_attempts: int = DEFAULT_MAX_ATTEMPTS, retry_delay: float = DEFAULT_RETRY_DELAY,
+                 connection_factory=get_connection):
+        self.batch_size = batch_size or getattr(settings, "NOTIFICATION_BATCH_SIZE", DEFAULT_BATCH_SIZE)
+        self.max_workers = max_workers or getattr(settings, "NOTIFICATION_WORKERS", DEFAULT_MAX_WORKERS)
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.connection_factory = connection_factory
+
+    def dispatch(self, now: datetime = None) -> DispatchResult:
+        """Send everything that is currently deliverable."""
+        now = now or timezone.now()
+        result = DispatchResult()
+        stale_before = now - timedelta(
+            seconds=getattr(settings, "NOTIFICATION_CLAIM_STALE_SECONDS", DEFAULT_CLAIM_STALE_SECONDS)
+        )
+        claimable = (
+            Q(status=Notification.STATUS_PENDING)
+            | Q(status=Notification.STATUS_SENDING, claimed_at__lt=stale_before)
+        )
+        pending = Notification.objects.filter(claimable)
+
+        # Opted-out users, resolved in one UPDATE
+        result.skipped = pending.filter(
+            Q(user__notification_preferences__email=False)
+            | Q(user__notification_preferences__report_ready=False)
+        ).update(status=Notification.STATUS_SKIPPED)
+
+        # Evaluate the window once per distinct zone rather than per user
+        hours = getattr(settings, "NOTIFICATION_SEND_HOURS", (8, 20))
+        zones = set(pending.order_by().values_list("user__timezone", flat=True).distinct())
+        open_zones = [tz for tz in zones if is_within_send_window(tz, now, hours)]
+
+        deliverable = pending.filter(user__timezone__in=open_zones)
+        result.deferred = pending.count() - deliverable.count()
+        token = self._claim(deliverable, claimable, now)
+
+        queue, unbuildable = [], []
+        for notification in Notification.objects.filter(
+            status=Notification.STATUS_SENDING, claim_token=token,
+        ).select_related("user", "report").only(
+            "id", "user__email", "user__first_name",
+            "report__period", "report__period_start",
+        ).iterator(chunk_size=self.batch_size):
+            # One malformed row must not strand the rest of the claim in 'sending'
+            try:
+                queue.append((notification.id, build_message(notification)))
+            except Exception as e:
+                logger.error(f"Could not build notification {notification.id}: {e}")
+                unbuildable.append((notification.id, f"Could not build message: {e}"))
+        self._mark_attempted([], unbuildable)
+        result.failed += len(unbuildable)
+
+        attempt = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while queue:
+                attempt += 1
+                batches = [queue[i:i + self.batch_size] for i in range(0, len(queue), self.batch_size)]
+                sent_ids, failures = [], []
+                for batch_sent, batch_failed in executor.map(self._send_batch, batches):
+                    sent_ids.extend(batch_sent)
+                    failures.extend(batch_failed)
+
+                self._mark_sent(sent_ids)
+                result.sent += len(sent_ids)
+
+                messages = dict(queue)
+                queue = []
+                exhausted = []
+                for notification_id, error in failures:
+                    if attempt < self.max_attempts:
+                        queue.append((notification_id, messages[notification_id]))
+                    else:
+                        exhausted.append((notification_id, error))
+                self._mark_attempted(queue, exhausted)
+                result.failed += len(exhausted)
+
+                if queue:
+                    result.retried += len(queue)
+                    logger.warning(f"Retrying {len(queue)} notifications (attempt {attempt + 1})")
+                    time.sleep(self.retry_delay * attempt)
+
+        logger.info(
+            f"Notifications: {result.sent} sent, {result.failed} failed, "
+            f"{result.skipped} skipped, {result.deferred} deferred"
+        )
+        return result
+
+    def _claim(self, deliverable, claimable: Q, now: datetime):
+        """
+        Move the deliverable rows to 'sending' under a fresh token. The
+        UPDATE repeats the claimable condition on the row itself, so rows
+        another run claimed in the meantime are left alone. Returns the token.
+        """
+        token = uuid.uuid4()
+        ids = list(deliverable.order_by().values_list("id", flat=True))
+        for start in range(0, len(ids), _UPDATE_CHUNK_SIZE):
+            Notification.objects.filter(claimable, id__in=ids[start:start + _UPDATE_CHUNK_SIZE]).update(
+                status=Notification.STATUS_SENDING, claim_token=token, claimed_at=now,
+            )
+        return token
+
+    def _send_batch(self, batch):
+        """
+        Send one batch over a single connection. Messages are handed over one
+        at a time so a failure only affects the message that caused it.
+        """
+        sent, failed = [], []
+        try:
+            connection = self.connection_factory(fail_silently=False)
+            connection.open()
+        except Exception as e:
+            logger.error(f"Could not open mail connection: {e}")
+            return sent, [(notification_id, str(e)) for notification_id, _ in batch]
+
+        try:
+            for notification_id, message in batch:
+                try:
+                    connection.send_messages([message])
+                    sent.append(notification_id)
+                except Exception as e:
+                    failed.append((notification_id, str(e)))
+        finally:
+            try:
+                connection.close()
+            except Exception:
+                logger.debug("Error closing mail connection", exc_info=True)
+        return sent, failed
+
+    def _mark_sent(self, ids):
+        _bulk_update(
+            ids,
+            status=Notification.STATUS_SENT,
+            sent_at=timezone.now(),
+            attempts=F("attempts") + 1,
+            last_error="",
+        )
+
+    def _mark_attempted(self, retrying, exhausted):
+        _bulk_update([nid for nid, _ in retrying], attempts=F("attempts") + 1)
+
+        # A dead SMTP server fails every message the same way; group by error
+        by_error = {}
+        for notification_id, error in exhausted:
+            by_error.setdefault(error[:1000], []).append(notification_id)
+        for error, ids in by_error.items():
+            _bulk_update(
+                ids,
+                status=Notification.STATUS_FAILED,
+                attempts=F("attempts") + 1,
+                last_error=error,
+            )
+
+
+def _bulk_update(ids, **fields):
+    for start in range(0, len(ids), _UPDATE_CHUNK_SIZE):
+        Notification.objects.filter(id__in=ids[start:start + _UPDATE_CHUNK_SIZE]).update(**fields)
@@ -0,0 +1,80 @@
+"""
+backend/pagination.py
+
+Paginators for very large tables.
+
+A plain ``Paginator`` runs an exact ``COUNT(*)`` on every page, which on a
+table with millions of rows is a full scan. ``EstimatedCountPaginator`` uses
+the planner's row estimate for unfiltered querysets and a bounded count for
+filtered ones, so page loads cost the same regardless of table size.
+"""
+
+import logging
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_table_rows(model, using: str = "default"):
+    """
+    Approximate row count for the model's table from database statistics,
+    or None when the backend offers no cheap estimate.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [table])
+        elif connection.vendor == "mysql":
+            cursor.execute(
+                "SELECT table_rows FROM information_schema.tables "
+                "WHERE table_schema = DATABASE() AND table_name = %s",
+                [table],
+            )
+        elif connection.vendor == "sqlite":
+            # rowids only grow, so the highest one is an upper bound read from the index
+            cursor.execute(f"SELECT MAX(_rowid_) FROM {connection.ops.quote_name(table)}")
+        else:
+            return None
+        row = cursor.fetchone()
+
+    # PostgreSQL reports -1 for tables that were never analyzed
+    if not row or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that avoids exact counts on large tables.
+
+    Tables under ``exact_count_threshold`` rows are counted exactly.
+    Above it, unfiltered querysets report the statistics estimate and
+    filtered querysets are counted up to ``count_limit`` rows.
+    """
+
+    exact_count_threshold = 10_000
+    count_limit = 100_000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet):
+            return super().count
+
+        try:
+            estimate = estimate_table_rows(queryset.model, using=queryset.db)
+        except Exception:
+            logger.warning("Row estimate failed; falling back to COUNT(*)", exc_info=True)
+            estimate = None
+        if estimate is None or estimate <= self.exact_count_threshold:
+            return super().count
+
+        if not queryset.query.where:
+            return estimate
+        # COUNT over a LIMIT subquery stops scanning after count_limit rows
+        return queryset.order_by()[:self.count_limit].count()
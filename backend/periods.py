@@ -0,0 +1,146 @@
+"""
+backend/periods.py
+
+Timezone-aware weekly/monthly bucketing computed in the database.
+
+Each transaction's local date (``authorized_at`` in the user's zone, else the
+bank's ``date``) is truncated to the start of its week or month with
+``TruncWeek``/``TruncMonth`` and summed in SQL. Users sharing a timezone are
+aggregated together, so a run issues one query per distinct zone instead of
+loading rows into Python and converting them one by one.
+
+Date ranges are local too: a transaction belongs to the range its local date
+falls in, which can be a day off the bank's ``date``. Queries filter on the
+bank date widened by a day, so the date index still narrows the scan, and
+only convert the rows on the edges of the range.
+"""
+
+import logging
+from datetime import date, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.contrib.auth import get_user_model
+from django.db.models import Case, Count, DateField, F, Q, Sum, When
+from django.db.models.functions import TruncDate, TruncDay, TruncMonth, TruncWeek
+
+from finance.models import Transaction
+
+logger = logging.getLogger(__name__)
+
+_TRUNC_FUNCTIONS = {
+    "daily": TruncDay,
+    "weekly": TruncWeek,
+    "monthly": TruncMonth,
+}
+
+
+def resolve_zone(tz_name: str) -> ZoneInfo:
+    """Return the user's zone, falling back to UTC for unknown names."""
+    try:
+        return ZoneInfo(tz_name)
+    except (ZoneInfoNotFoundError, ValueError):
+        logger.warning(f"Unknown timezone {tz_name!r}; bucketing in UTC")
+        return ZoneInfo("UTC")
+
+
+def period_start(period: str, day: date) -> date:
+    """First day of the week (Monday) or month containing ``day``."""
+    if period == "weekly":
+        return day - timedelta(days=day.weekday())
+    if period == "monthly":
+        return day.replace(day=1)
+    raise ValueError(f"Unknown bucketing period: {period}")
+
+
+def bucket_expression(period: str, field: str = "local_date"):
+    """
+    Expression yielding the start date of the period containing ``field``,
+    a local date such as the one ``local_range`` annotates.
+    """
+    try:
+        trunc = _TRUNC_FUNCTIONS[period]
+    except KeyError:
+        raise ValueError(f"Unknown bucketing period: {period}") from None
+    return trunc(field, output_field=DateField())
+
+
+def local_date_expression(tz_names):
+    """
+    Expression yielding a transaction's local date: ``authorized_at`` in its
+    user's zone when known, the bank's ``date`` otherwise. ``tz_names`` are
+    the timezones of the users being queried.
+    """
+    tz_names = list(tz_names)
+    # With a single zone there is no need to join users to tell zones apart
+    by_zone = len(tz_names) > 1
+    return Case(
+        *[
+            When(
+                Q(user__timezone=tz_name) if by_zone else Q(),
+                authorized_at__isnull=False,
+                then=TruncDate("authorized_at", tzinfo=resolve_zone(tz_name)),
+            )
+            for tz_name in tz_names
+        ],
+        default=F("date"),
+        output_field=DateField(),
+    )
+
+
+def local_range(queryset, start, end, tz_names):
+    """
+    Transactions of ``queryset`` whose local date is within [start, end],
+    annotated with ``local_date``. The two dates differ by at most a day, so
+    only rows dated on the edges of the range need converting.
+    """
+    day = timedelta(days=1)
+    return (
+        queryset.filter(date__range=(start - day, end + day))
+        .annotate(local_date=local_date_expression(tz_names))
+        .filter(
+            Q(date__range=(start + day, end - day))
+            | Q(date__in=(start - day, start, end, end + day), local_date__range=(start, end))
+        )
+    )
+
+
+def bucketed_totals(period: str, start, end, user_ids=None) -> dict:
+    """
+    Spend/income totals per user per local period between ``start`` and
+    ``end`` (local dates, inclusive).
+
+    Returns {user_id: [{"bucket", "spent", "income", "count"}, ...]} with
+    buckets in ascending order. Amounts follow Plaid's sign convention, so
+    income is reported as a positive number.
+    """
+    bucket_expression(period)  # validate before querying
+
+    users = get_user_model().objects.all()
+    if user_ids is not None:
+        users = users.filter(id__in=user_ids)
+    zones = users.order_by("timezone").values_list("timezone", flat=True).distinct()
+
+    results = {}
+    for tz_name in zones:
+        rows = (
+            local_range(
+                Transaction.objects.filter(user__in=users.filter(timezone=tz_name), pending=False),
+                start, end, [tz_name],
+            )
+            .annotate(bucket=bucket_expression(period))
+            .values("user_id", "bucket")
+            .annotate(
+                spent=Sum("amount", filter=Q(amount__gt=0)),
+                income=Sum("amount", filter=Q(amount__lt=0)),
+                count=Count("id"),
+            )
+            .order_by("user_id", "bucket")
+        )
+        for row in rows:
+            results.setdefault(row["user_id"], []).append({
+                "bucket": row["bucket"],
+                "spent": row["spent"] or 0,
+                "income": -(row["income"] or 0),
+                "count": row["count"],
+            })
+    return results
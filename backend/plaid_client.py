@@ -1,10 +1,17 @@
 """backend/plaid_client.py"""
 
 import logging
-from datetime import datetime
+import threading
+from datetime import date, datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
+# PLAID_ENVIRONMENT values served by the real SDK
+SDK_ENVIRONMENTS = ("sandbox", "production")
+
+# Maximum transactions per /transactions/get page
+PAGE_SIZE = 500
+
 class MockPlaidClient:
     """
     Mock Plaid client used for sandbox and early development.
@@ -39,17 +46,18 @@ class MockPlaidClient:
         Return mock account data for the authenticated user.
         """
         logger.debug(f"Fetching mock accounts for access token: {access_token}")
+        suffix = access_token[-6:]
         return {
             "accounts": [
                 {
-                    "account_id": "mock-checking-001",
+                    "account_id": f"mock-checking-{suffix}",
                     "name": "Plaid Checking",
                     "type": "depository",
                     "subtype": "checking",
                     "balances": {"available": 1500.50, "current": 1500.50},
                 },
                 {
-                    "account_id": "mock-savings-002",
+                    "account_id": f"mock-savings-{suffix}",
                     "name": "Plaid Savings",
                     "type": "depository",
                     "subtype": "savings",
@@ -58,5 +66,212 @@ class MockPlaidClient:
             ]
         }
 
-# Instantiate globally for easy import
-plaid_client = MockPlaidClient()
+    def get_transactions(self, access_token: str, start_date: date, end_date: date) -> dict:
+        """
+        Return deterministic mock transactions for the date range.
+        IDs are stable, so re-fetching a range yields the same transactions.
+        """
+        logger.debug(f"Fetching mock transactions {start_date}..{end_date} for {access_token}")
+        suffix = access_token[-6:]
+        merchants = [
+            ("SQ *COFFEE 1234 SEATTLE", "Food and Drink", 4.75),
+            ("AMZN Mktp US*2K4AB1", "Shopping", 36.20),
+            ("UBER TRIP HELP.UBER.COM", "Transportation", 18.40),
+        ]
+        transactions = []
+        day = start_date
+        while day <= end_date:
+            name, category, amount = merchants[day.toordinal() % len(merchants)]
+            transactions.append({
+                "transaction_id": f"mock-txn-{suffix}-{day:%Y%m%d}",
+                "account_id": f"mock-checking-{suffix}",
+                "date": day,
+                "authorized_datetime": None,
+                "amount": amount,
+                "name": name,
+                "category": category,
+                "pending": False,
+                "pending_transaction_id": None,
+            })
+            day += timedelta(days=1)
+        return {"transactions": transactions}
+
+
+class PlaidClient:
+    """
+    Thin wrapper around the plaid-python SDK exposing the same interface as
+    MockPlaidClient. The SDK is a very large generated package, so it is
+    imported here rather than at module level.
+    """
+
+    def __init__(self, client_id: str, secret: str, environment: str):
+        import plaid
+        from plaid.api import plaid_api
+
+        hosts = {
+            "sandbox": plaid.Environment.Sandbox,
+            "production": plaid.Environment.Production,
+        }
+        configuration = plaid.Configuration(
+            host=hosts[environment],
+            api_key={"clientId": client_id, "secret": secret},
+        )
+        self.client = plaid_api.PlaidApi(plaid.ApiClient(configuration))
+        logger.info(f"Initialized Plaid client for {environment}")
+
+    def create_link_token(self, user_id: str) -> dict:
+        """
+        Create a Link token for the user.
+        """
+        from plaid.model.country_code import CountryCode
+        from plaid.model.link_token_create_request import LinkTokenCreateRequest
+        from plaid.model.link_token_create_request_user import LinkTokenCreateRequestUser
+        from plaid.model.products import Products
+
+        request = LinkTokenCreateRequest(
+            client_name="Banking Automation Bot",
+            language="en",
+            country_codes=[CountryCode("US")],
+            products=[Products("transactions")],
+            user=LinkTokenCreateRequestUser(client_user_id=str(user_id)),
+        )
+        response = self.client.link_token_create(request).to_dict()
+        return {
+            "link_token": response["link_token"],
+            "expiration": response["expiration"].isoformat(),
+        }
+
+    def exchange_public_token(self, public_token: str) -> dict:
+        """
+        Exchange a public token for an access token.
+        """
+        from plaid.model.item_public_token_exchange_request import ItemPublicTokenExchangeRequest
+
+        response = self.client.item_public_token_exchange(
+            ItemPublicTokenExchangeRequest(public_token=public_token)
+        ).to_dict()
+        return {
+            "access_token": response["access_token"],
+            "item_id": response["item_id"],
+        }
+
+    def get_accounts(self, access_token: str) -> dict:
+        """
+        Return account data for an Item.
+        """
+        from plaid.model.accounts_get_request import AccountsGetRequest
+
+        response = self.client.accounts_get(AccountsGetRequest(access_token=access_token)).to_dict()
+        return {
+            "accounts": [
+                {
+                    "account_id": account["account_id"],
+                    "name": account["name"],
+                    "type": str(account["type"]),
+                    "subtype": str(account.get("subtype") or ""),
+                    "balances": {
+                        "available": account["balances"].get("available"),
+                        "current": account["balances"].get("current"),
+                    },
+                }
+                for account in response["accounts"]
+            ]
+        }
+
+    def get_transactions(self, access_token: str, start_date: date, end_date: date) -> dict:
+        """
+        Return all transactions for the date range, following pagination.
+        """
+        from plaid.model.transactions_get_request import TransactionsGetRequest
+        from plaid.model.transactions_get_request_options import TransactionsGetRequestOptions
+
+        transactions = []
+        while True:
+            request = TransactionsGetRequest(
+                access_token=access_token,
+                start_date=start_date,
+                end_date=end_date,
+                options=TransactionsGetRequestOptions(count=PAGE_SIZE, offset=len(transactions)),
+            )
+            response = self.client.transactions_get(request).to_dict()
+            transactions.extend(_transaction_dict(txn) for txn in response["transactions"])
+            if len(transactions) >= response["total_transactions"] or not response["transactions"]:
+                return {"transactions": transactions}
+
+
+def _transaction_dict(txn: dict) -> dict:
+    """Flatten an SDK transaction into the shape MockPlaidClient returns."""
+    category = (txn.get("personal_finance_category") or {}).get("primary")
+    if not category and txn.get("category"):
+        category = txn["category"][0]
+    return {
+        "transaction_id": txn["transaction_id"],
+        "account_id": txn["account_id"],
+        "date": txn["date"],
+        "authorized_datetime": txn.get("authorized_datetime") or txn.get("datetime"),
+        "amount": txn["amount"],
+        "name": txn["name"],
+        "category": category or "",
+        "pending": txn["pending"],
+        "pending_transaction_id": txn.get("pending_transaction_id"),
+    }
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_plaid_client():
+    """
+    Return the process-wide Plaid client, building it on first use.
+
+    PLAID_ENVIRONMENT selects the backend: "sandbox" or "production" use the
+    real SDK when PLAID_CLIENT_ID and PLAID_SECRET are set; "synthetic" serves
+    a generated dataset (backend.synthetic); anything else (including "mock")
+    uses MockPlaidClient.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = _build_client()
+    return _client
+
+
+def reset_plaid_client():
+    """Drop the cached client, e.g. after settings change in tests."""
+    global _client
+    with _client_lock:
+        _client = None
+
+
+def _build_client():
+    from django.conf import settings
+
+    environment = getattr(settings, "PLAID_ENVIRONMENT", "mock").lower()
+    client_id = getattr(settings, "PLAID_CLIENT_ID", "")
+    secret = getattr(settings, "PLAID_SECRET", "")
+
+    if environment in SDK_ENVIRONMENTS and client_id and secret:
+        return PlaidClient(client_id, secret, environment)
+    if environment == "synthetic":
+        from backend.synthetic import SyntheticDataset, SyntheticPlaidClient
+
+        return SyntheticPlaidClient(SyntheticDataset(
+            seed=getattr(settings, "SYNTHETIC_SEED", 0),
+            users=getattr(settings, "SYNTHETIC_USERS", 100),
+        ))
+    if environment in SDK_ENVIRONMENTS:
+        logger.warning(f"PLAID_ENVIRONMENT={environment} but no Plaid credentials; using mock client")
+    return MockPlaidClient()
+
+
+class _LazyPlaidClient:
+    """Module-level stand-in that builds the real client on first attribute access."""
+
+    def __getattr__(self, name):
+        return getattr(get_plaid_client(), name)
+
+
+# Import-compatible handle; nothing is constructed until first use
+plaid_client = _LazyPlaidClient()
@@ -0,0 +1,192 @@
+"""
+backend/reconciliation.py
+
+Pending-to-posted reconciliation.
+
+Banks report a card authorization as a pending transaction and later as a
+posted one with a new ID, a date a few days later and sometimes a different
+amount (tips, fuel holds, currency conversion). Plaid links the two through
+``pending_transaction_id`` when it can; when it can't, both rows survive and
+the spend is counted twice.
+
+``match_pending`` pairs them without comparing every pending row against
+every posted row. Pending rows are indexed in a dict keyed on
+(account, normalized merchant, sign, amount bucket, date bucket); each posted
+row then probes the handful of neighbouring keys it could match, so a batch
+costs O(n) dict lookups. Amount buckets are logarithmic and -log(1 - t)
+wide: a pair within AMOUNT_TOLERANCE t of the larger amount differs by at
+most that much in log1p, so it lands in the same or an adjacent bucket (a
+log(1 + t) width is too narrow for that); date buckets are DATE_WINDOW_DAYS wide, so the pending date
+is in the posted row's bucket or the one before.
+
+``reconcile_transactions`` runs this in the ingestion path: matched posted
+rows get ``pending_transaction_id`` and the superseded pending rows are
+flagged with ``duplicate_of``, including rows stored by earlier batches.
+"""
+
+import logging
+import math
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db.models import F
+
+from finance.models import Transaction
+
+logger = logging.getLogger(__name__)
+
+# A posted transaction settles at most this many days after its authorization
+DATE_WINDOW_DAYS = 7
+# Largest relative change between the pending and posted amount (tips, holds)
+AMOUNT_TOLERANCE = 0.25
+
+_CHUNK_SIZE = 500
+
+
+def match_pending(pending: list, posted: list, window_days: int = DATE_WINDOW_DAYS,
+                  tolerance: float = AMOUNT_TOLERANCE) -> dict:
+    """
+    Pair pending rows with the posted rows that settled them.
+
+    Rows are dicts with ``transaction_id``, ``account_id``, ``merchant_name``
+    (or ``name``), ``amount``, ``date`` and, for posted rows, Plaid's
+    ``pending_transaction_id``. Explicit Plaid links win; otherwise each
+    posted row takes the closest unmatched pending row by amount, then date.
+
+    Returns {pending transaction_id: posted transaction_id}.
+    """
+    step = -math.log1p(-tolerance)
+    by_id = {}
+    index = defaultdict(list)
+    for txn in pending:
+        by_id[txn["transaction_id"]] = txn
+        amount = float(txn["amount"])
+        index[_key(txn, amount, step, txn["date"].toordinal() // window_days)].append(txn)
+
+    matches = {}
+    unlinked = []
+    for txn in posted:
+        linked = txn.get("pending_transaction_id")
+        if linked in by_id and linked not in matches:
+            matches[linked] = txn["transaction_id"]
+        else:
+            unlinked.append(txn)
+
+    for txn in sorted(unlinked, key=lambda t: t["date"]):
+        amount = float(txn["amount"])
+        ordinal = txn["date"].toordinal()
+        account, merchant, sign, bucket, day_bucket = _key(txn, amount, step, ordinal // window_days)
+
+        best, best_score = None, None
+        for amount_bucket in (bucket - 1, bucket, bucket + 1):
+            for date_bucket in (day_bucket - 1, day_bucket):
+                for candidate in index.get((account, merchant, sign, amount_bucket, date_bucket), ()):
+                    if candidate["transaction_id"] in matches:
+                        continue
+                    lag = ordinal - candidate["date"].toordinal()
+                    difference = abs(amount - float(candidate["amount"]))
+                    if not 0 <= lag <= window_days:
+                        continue
+                    if difference > tolerance * max(abs(amount), abs(float(candidate["amount"]))):
+                        continue
+                    score = (difference, lag)
+                    if best_score is None or score < best_score:
+                        best, best_score = candidate, score
+        if best is not None:
+            matches[best["transaction_id"]] = txn["transaction_id"]
+
+    return matches
+
+
+def reconcile_transactions(user, transactions: list) -> int:
+    """
+    Reconcile an ingestion batch in place before it is upserted.
+
+    Sets ``pending_transaction_id`` on posted rows and ``duplicate_of`` on
+    every pending row of the batch, and updates stored rows of the user that
+    pair with the batch. Re-running a batch gives the same result. Returns
+    the number of matched pairs.
+    """
+    pending = [txn for txn in transactions if txn.get("pending")]
+    posted = [txn for txn in transactions if not txn.get("pending")]
+    stored_pending, stored_posted = _stored_counterparts(user, pending, posted)
+
+    matches = match_pending(pending + stored_pending, posted + stored_posted)
+    settled_by = {posted_id: pending_id for pending_id, posted_id in matches.items()}
+
+    for txn in pending:
+        txn["duplicate_of"] = matches.get(txn["transaction_id"])
+    for txn in posted:
+        txn["duplicate_of"] = None
+        txn["pending_transaction_id"] = settled_by.get(txn["transaction_id"], txn.get("pending_transaction_id"))
+
+    changed = []
+    for row in stored_pending:
+        duplicate_of = matches.get(row["transaction_id"])
+        if duplicate_of != row["duplicate_of"]:
+            changed.append(Transaction(id=row["id"], duplicate_of=duplicate_of))
+    Transaction.objects.bulk_update(changed, ["duplicate_of"], batch_size=_CHUNK_SIZE)
+
+    changed = [
+        Transaction(id=row["id"], pending_transaction_id=settled_by[row["transaction_id"]])
+        for row in stored_posted
+        if settled_by.get(row["transaction_id"], row["pending_transaction_id"]) != row["pending_transaction_id"]
+    ]
+    Transaction.objects.bulk_update(changed, ["pending_transaction_id"], batch_size=_CHUNK_SIZE)
+
+    if matches:
+        logger.debug(f"Reconciled {len(matches)} pending transactions for user {user.id}")
+    return len(matches)
+
+
+def _key(txn: dict, amount: float, step: float, date_bucket: int) -> tuple:
+    """Hash-index key; see the module docstring."""
+    merchant = (txn.get("merchant_name") or txn.get("name") or "").casefold()
+    return (
+        txn["account_id"],
+        merchant,
+        amount >= 0,
+        int(math.log1p(abs(amount)) // step),
+        date_bucket,
+    )
+
+
+def _stored_counterparts(user, pending: list, posted: list):
+    """
+    Stored rows that could pair with the batch: open pending rows up to
+    DATE_WINDOW_DAYS before its posted rows, and unlinked posted rows up to
+    DATE_WINDOW_DAYS after its pending rows. Rows already paired with a
+    member of the batch are included so re-runs reproduce the same pairing.
+    """
+    batch_ids = {txn["transaction_id"] for txn in pending + posted}
+    pending_ids = {txn["transaction_id"] for txn in pending}
+    posted_ids = {txn["transaction_id"] for txn in posted}
+
+    stored_pending = [
+        row for row in _stored_rows(user, posted, pending=True, days_before=DATE_WINDOW_DAYS)
+        if row["transaction_id"] not in batch_ids
+        and (row["duplicate_of"] is None or row["duplicate_of"] in posted_ids)
+    ]
+    stored_posted = [
+        row for row in _stored_rows(user, pending, pending=False, days_after=DATE_WINDOW_DAYS)
+        if row["transaction_id"] not in batch_ids
+        and (row["pending_transaction_id"] is None or row["pending_transaction_id"] in pending_ids)
+    ]
+    return stored_pending, stored_posted
+
+
+def _stored_rows(user, batch: list, pending: bool, days_before: int = 0, days_after: int = 0) -> list:
+    """The user's stored rows on the batch's accounts around its date range."""
+    if not batch:
+        return []
+    dates = [txn["date"] for txn in batch]
+    rows = Transaction.objects.filter(
+        user=user,
+        pending=pending,
+        account__account_id__in={txn["account_id"] for txn in batch},
+        date__range=(min(dates) - timedelta(days=days_before), max(dates) + timedelta(days=days_after)),
+    ).order_by().values(
+        "id", "transaction_id", "merchant_name", "name", "amount", "date",
+        "pending_transaction_id", "duplicate_of", plaid_account_id=F("account__account_id"),
+    )
+    return [{**row, "account_id": row.pop("plaid_account_id")} for row in rows]
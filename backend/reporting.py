@@ -0,0 +1,427 @@
+"""
+backend/reporting.py
+
+Weekly/monthly report generation.
+
+A run is split into stages:
+  aggregate  - per-user totals computed in SQL for a chunk of users at once,
+               over each user's local dates (backend.periods), read from a
+               replica when one is configured
+  hash       - SHA-256 of each user's report data; unchanged reports are skipped
+  render     - HTML/PDF rendering in a process pool (CPU-bound, no DB access)
+  record     - Report rows upserted in bulk and "report ready" emails queued
+               for reports rendered for the first time
+Timing is recorded per stage so slow runs can be traced to a stage.
+"""
+
+import hashlib
+import html
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from pathlib import Path
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Bump when the rendered layout changes so every report is re-rendered once
+RENDERER_VERSION = "1"
+
+DEFAULT_FORMATS = ("pdf", "html")
+DEFAULT_CHUNK_SIZE = 500
+TOP_MERCHANTS = 10
+
+
+@dataclass
+class ReportRunResult:
+    """Outcome of a report generation run."""
+
+    rendered: int = 0
+    skipped: int = 0
+    failed: int = 0
+    timings: dict = field(default_factory=dict)
+
+    def add_timing(self, stage: str, seconds: float):
+        self.timings[stage] = self.timings.get(stage, 0.0) + seconds
+
+
+def period_bounds(period: str, as_of: date) -> tuple:
+    """
+    Return (start, end) of the last complete period before ``as_of``.
+    Weeks run Monday to Sunday.
+    """
+    if period == "weekly":
+        this_monday = as_of - timedelta(days=as_of.weekday())
+        return this_monday - timedelta(days=7), this_monday - timedelta(days=1)
+    if period == "monthly":
+        end = as_of.replace(day=1) - timedelta(days=1)
+        return end.replace(day=1), end
+    raise ValueError(f"Unknown report period: {period}")
+
+
+def aggregate_report_data(user_ids, period: str, start: date, end: date) -> dict:
+    """
+    Build report data for many users with a fixed number of grouped queries.
+    ``start`` and ``end`` are local dates in each user's timezone.
+    Returns a mapping of user id (str) -> JSON-serializable report data.
+    """
+    from django.contrib.auth import get_user_model
+    from django.db.models import Count, Q, Sum
+    from backend.periods import local_range
+    from finance.models import Transaction
+
+    users = list(get_user_model().objects.filter(id__in=user_ids).values(
+        "id", "email", "first_name", "last_name", "timezone"
+    ))
+    base = local_range(
+        Transaction.objects.filter(user_id__in=user_ids, pending=False),
+        start, end, {user["timezone"] for user in users},
+    )
+
+    reports = {}
+    for user in users:
+        reports[str(user["id"])] = {
+            "user": {
+                "email": user["email"],
+                "name": f"{user['first_name']} {user['last_name']}".strip(),
+            },
+            "period": period,
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "total_spent": "0.00",
+            "total_income": "0.00",
+            "transaction_count": 0,
+            "categories": [],
+            "top_merchants": [],
+            "daily": [],
+        }
+
+    totals = base.values("user_id").annotate(
+        spent=Sum("amount", filter=Q(amount__gt=0)),
+        income=Sum("amount", filter=Q(amount__lt=0)),
+        count=Count("id"),
+    )
+    for row in totals:
+        report = reports[str(row["user_id"])]
+        report["total_spent"] = _money(row["spent"])
+        report["total_income"] = _money(-(row["income"] or 0))
+        report["transaction_count"] = row["count"]
+
+    categories = (
+        base.filter(amount__gt=0)
+        .values("user_id", "category")
+        .annotate(total=Sum("amount"), count=Count("id"))
+        .order_by("user_id", "-total", "category")
+    )
+    for row in categories:
+        reports[str(row["user_id"])]["categories"].append(
+            [row["category"] or "Uncategorized", _money(row["total"]), row["count"]]
+        )
+
+    merchants = (
+        base.filter(amount__gt=0)
+        .values("user_id", "merchant_name")
+        .annotate(total=Sum("amount"))
+        .order_by("user_id", "-total", "merchant_name")
+    )
+    for row in merchants:
+        top = reports[str(row["user_id"])]["top_merchants"]
+        if len(top) < TOP_MERCHANTS:
+            top.append([row["merchant_name"] or "Unknown", _money(row["total"])])
+
+    daily = (
+        base.filter(amount__gt=0)
+        .values("user_id", "local_date")
+        .annotate(total=Sum("amount"))
+        .order_by("user_id", "local_date")
+    )
+    for row in daily:
+        reports[str(row["user_id"])]["daily"].append(
+            [row["local_date"].isoformat(), _money(row["total"])]
+        )
+
+    return reports
+
+
+def content_hash(data: dict) -> str:
+    """Stable hash of report data plus the renderer version."""
+    payload = json.dumps(data, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(f"{RENDERER_VERSION}:{payload}".encode()).hexdigest()
+
+
+def artifact_paths(root, user_id: str, data: dict, digest: str, formats) -> dict:
+    """Content-addressed artifact locations for one report."""
+    directory = Path(root) / user_id
+    stem = f"{data['period']}-{data['start']}-{digest[:16]}"
+    return {fmt: str(directory / f"{stem}.{fmt}") for fmt in formats}
+
+
+def render_html(data: dict) -> str:
+    """Render a report as a standalone HTML document."""
+    esc = html.escape
+    title = f"{data['period'].title()} report {data['start']} to {data['end']}"
+
+    def table(headers, rows):
+        head = "".join(f"<th>{esc(h)}</th>" for h in headers)
+        body = "".join(
+            "<tr>" + "".join(f"<td>{esc(str(cell))}</td>" for cell in row) + "</tr>"
+            for row in rows
+        )
+        return f"<table><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>"
+
+    return (
+        "<!DOCTYPE html><html><head><meta charset=\"utf-8\">"
+        f"<title>{esc(title)}</title></head><body>"
+        f"<h1>{esc(title)}</h1>"
+        f"<p>{esc(data['user']['name'] or data['user']['email'])}</p>"
+        f"<p>Spent: ${esc(data['total_spent'])} &middot; Income: ${esc(data['total_income'])}"
+        f" &middot; Transactions: {data['transaction_count']}</p>"
+        "<h2>Spending by category</h2>"
+        + table(["Category", "Total", "Transactions"], data["categories"])
+        + "<h2>Top merchants</h2>"
+        + table(["Merchant", "Total"], data["top_merchants"])
+        + "<h2>Daily spending</h2>"
+        + table(["Date", "Total"], data["daily"])
+        + "</body></html>"
+    )
+
+
+def render_pdf(data: dict) -> bytes:
+    """Render a report as a plain-text PDF document."""
+    lines = [
+        f"{data['period'].title()} report {data['start']} to {data['end']}",
+        data["user"]["name"] or data["user"]["email"],
+        "",
+        f"Spent: ${data['total_spent']}   Income: ${data['total_income']}"
+        f"   Transactions: {data['transaction_count']}",
+        "",
+        "Spending by category",
+    ]
+    lines += [f"  {name:<30} ${total:>12}  ({count})" for name, total, count in data["categories"]]
+    lines += ["", "Top merchants"]
+    lines += [f"  {name:<30} ${total:>12}" for name, total in data["top_merchants"]]
+    lines += ["", "Daily spending"]
+    lines += [f"  {day}  ${total:>12}" for day, total in data["daily"]]
+    return _pdf_document(lines)
+
+
+def render_report(job: dict) -> dict:
+    """
+    Render and write one user's artifacts. Runs inside pool workers,
+    so it only touches the filesystem.
+    """
+    timings = {}
+    started = time.perf_counter()
+    rendered = {}
+    for fmt, path in job["paths"].items():
+        if fmt == "html":
+            rendered[path] = render_html(job["data"]).encode()
+        elif fmt == "pdf":
+            rendered[path] = render_pdf(job["data"])
+        else:
+            raise ValueError(f"Unknown report format: {fmt}")
+    timings["render"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for path, content in rendered.items():
+        _write_atomic(Path(path), content)
+    timings["write"] = time.perf_counter() - started
+
+    return {"user_id": job["user_id"], "timings": timings}
+
+
+def generate_reports(period: str = "weekly", as_of: date = None, user_ids=None,
+                     formats=DEFAULT_FORMATS, max_workers: int = None,
+                     chunk_size: int = DEFAULT_CHUNK_SIZE) -> ReportRunResult:
+    """
+    Generate reports for every user with activity in the period
+    (or for ``user_ids``). Set ``max_workers`` to 1 to render inline.
+    """
+    from finance.models import Transaction
+
+    started = time.perf_counter()
+    as_of = as_of or date.today()
+    start, end = period_bounds(period, as_of)
+    root = Path(getattr(settings, "REPORTS_ROOT", settings.BASE_DIR / "reports"))
+    if max_workers is None:
+        max_workers = getattr(settings, "REPORT_WORKERS", None) or os.cpu_count() or 1
+
+    result = ReportRunResult()
+
+    if user_ids is None:
+        # Local dates are at most a day off the bank's
+        user_ids = list(
+            Transaction.objects.filter(date__range=(start - timedelta(days=1), end + timedelta(days=1)))
+            .order_by().values_list("user_id", flat=True).distinct()
+        )
+    user_ids = [str(uid) for uid in user_ids]
+
+    executor = ProcessPoolExecutor(max_workers=max_workers) if max_workers > 1 else None
+    try:
+        for offset in range(0, len(user_ids), chunk_size):
+            chunk = user_ids[offset:offset + chunk_size]
+            _generate_chunk(chunk, period, start, end, root, formats, executor, result)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    result.add_timing("total", time.perf_counter() - started)
+    logger.info(
+        f"{period} reports for {start}: {result.rendered} rendered, "
+        f"{result.skipped} unchanged, {result.failed} failed; "
+        + ", ".join(f"{stage}={secs:.2f}s" for stage, secs in result.timings.items())
+    )
+    return result
+
+
+def _generate_chunk(user_ids, period, start, end, root, formats, executor, result):
+    """Run the aggregate/hash/render/record stages for one chunk of users."""
+    from backend.notifications import enqueue_report_ready
+    from backend.routers import read_replica
+    from finance.models import Report
+
+    stage_started = time.perf_counter()
+    with read_replica():
+        reports = aggregate_report_data(user_ids, period, start, end)
+    result.add_timing("aggregate", time.perf_counter() - stage_started)
+
+    stage_started = time.perf_counter()
+    existing = {
+        str(row["user_id"]): row
+        for row in Report.objects.filter(
+            user_id__in=user_ids, period=period, period_start=start
+        ).values("user_id", "content_hash", "pdf_path", "html_path")
+    }
+    jobs = []
+    records = {}
+    for user_id, data in reports.items():
+        digest = content_hash(data)
+        paths = artifact_paths(root, user_id, data, digest, formats)
+        previous = existing.get(user_id)
+        if (
+            previous
+            and previous["content_hash"] == digest
+            and all(previous.get(f"{fmt}_path") == path and os.path.exists(path)
+                    for fmt, path in paths.items())
+        ):
+            result.skipped += 1
+            continue
+        jobs.append({"user_id": user_id, "data": data, "paths": paths})
+        records[user_id] = Report(
+            user_id=user_id,
+            period=period,
+            period_start=start,
+            period_end=end,
+            content_hash=digest,
+            pdf_path=paths.get("pdf", ""),
+            html_path=paths.get("html", ""),
+        )
+    result.add_timing("hash", time.perf_counter() - stage_started)
+
+    stage_started = time.perf_counter()
+    completed = []
+    if executor is None:
+        outcomes = (_run_inline(job) for job in jobs)
+    else:
+        outcomes = (_unwrap(future) for future in as_completed(
+            [executor.submit(render_report, job) for job in jobs]
+        ))
+    for outcome in outcomes:
+        if isinstance(outcome, Exception):
+            result.failed += 1
+            logger.error(f"Report rendering failed: {outcome}")
+            continue
+        completed.append(outcome["user_id"])
+        for stage, seconds in outcome["timings"].items():
+            result.add_timing(stage, seconds)
+    result.add_timing("render_wall", time.perf_counter() - stage_started)
+
+    stage_started = time.perf_counter()
+    if completed:
+        Report.objects.bulk_create(
+            [records[user_id] for user_id in completed],
+            update_conflicts=True,
+            unique_fields=["user", "period", "period_start"],
+            update_fields=["period_end", "content_hash", "pdf_path", "html_path", "updated_at"],
+        )
+        # A re-render after a late transaction updates the report silently
+        new = [user_id for user_id in completed if user_id not in existing]
+        if new:
+            enqueue_report_ready(
+                Report.objects.filter(user_id__in=new, period=period, period_start=start)
+                .only("id", "user_id")
+            )
+    result.rendered += len(completed)
+    result.add_timing("record", time.perf_counter() - stage_started)
+
+
+def _run_inline(job):
+    try:
+        return render_report(job)
+    except Exception as e:
+        return e
+
+
+def _unwrap(future):
+    try:
+        return future.result()
+    except Exception as e:
+        return e
+
+
+def _money(value) -> str:
+    return f"{(value or 0):.2f}"
+
+
+def _write_atomic(path: Path, content: bytes):
+    """Write via a temp file so readers never see a partial artifact."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(content)
+    os.replace(tmp, path)
+
+
+def _pdf_escape(text: str) -> str:
+    text = text.encode("latin-1", "replace").decode("latin-1")
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _pdf_document(lines, lines_per_page: int = 60) -> bytes:
+    """Minimal PDF 1.4 writer: Courier 10pt text, one stream per page."""
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+
+    # Object numbers: 1 catalog, 2 page tree, 3 font, then (page, content) pairs
+    objects = {}
+    kids = []
+    for index, page_lines in enumerate(pages):
+        page_num = 4 + index * 2
+        content_num = page_num + 1
+        kids.append(f"{page_num} 0 R")
+        text = "".join(f"({_pdf_escape(line)}) Tj T* " for line in page_lines)
+        stream = f"BT /F1 10 Tf 12 TL 40 800 Td {text}ET".encode("latin-1")
+        objects[page_num] = (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_num} 0 R >>"
+        ).encode()
+        objects[content_num] = (
+            f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b"\nendstream"
+        )
+    objects[1] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(pages)} >>".encode()
+    objects[3] = b"<< /Type /Font /Subtype /Type1 /BaseFont /Courier >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for num in range(1, len(objects) + 1):
+        offsets.append(len(out))
+        out += f"{num} 0 obj\n".encode() + objects[num] + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
@@ -0,0 +1,76 @@
+"""
+backend/routers.py
+
+Primary/replica database routing.
+
+Writes and ordinary reads go to the primary. Read-only report, dashboard and
+listing code opts in to replica reads with ``read_replica()``:
+
+    with read_replica(user_id=user.id):
+        frames = fetch_frames(user.id)
+
+A user's replica reads stay on the primary for REPLICA_STICKY_SECONDS
+after their last sync (``User.last_plaid_sync``), so they always see their
+new data despite replication lag. The stamp is read from the primary, so
+this holds whichever process or host ran the sync.
+"""
+
+import contextvars
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils import timezone
+
+_replica_reads = contextvars.ContextVar("replica_reads", default=False)
+
+
+def is_primary_sticky(user_id) -> bool:
+    """True while the user's last sync is more recent than REPLICA_STICKY_SECONDS."""
+    from django.contrib.auth import get_user_model
+
+    since = timezone.now() - timedelta(seconds=getattr(settings, "REPLICA_STICKY_SECONDS", 30))
+    return (
+        get_user_model().objects.using(DEFAULT_DB_ALIAS)
+        .filter(id=user_id, last_plaid_sync__gte=since).exists()
+    )
+
+
+@contextmanager
+def read_replica(user_id=None):
+    """
+    Route reads inside the block to a replica. With ``user_id``, reads stay
+    on the primary while the user is sticky. Also usable as a decorator.
+    """
+    replicas = getattr(settings, "DATABASE_REPLICAS", [])
+    enabled = bool(replicas) and (user_id is None or not is_primary_sticky(user_id))
+    token = _replica_reads.set(enabled)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """Sends opted-in reads to a random replica and everything else to the primary."""
+
+    def db_for_read(self, model, **hints):
+        replicas = getattr(settings, "DATABASE_REPLICAS", [])
+        if not replicas or not _replica_reads.get():
+            return None
+        # Reads inside a write transaction must see its uncommitted rows
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
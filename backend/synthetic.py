@@ -0,0 +1,524 @@
+"""
+backend/synthetic.py
+
+Deterministic synthetic financial data for benchmarks and load tests.
+
+``SyntheticDataset`` generates users, Items, accounts and transactions from a
+seed with vectorized NumPy, so millions of rows take seconds. Transactions
+follow a Zipf-like merchant mix with per-merchant log-normal amounts,
+weekly and yearly seasonality with a holiday peak, monthly bills and
+biweekly payroll, and card authorizations that appear as pending a few days
+before they post (restaurants and rides settle with a tip added).
+
+The same dataset serves two consumers:
+
+* ``SyntheticPlaidClient`` streams it through the Plaid client interface
+  (``PLAID_ENVIRONMENT=synthetic``), so backfill and sync run against
+  realistic volume;
+* ``load_dataset`` writes it straight into the database as it would look
+  after ingestion, for benchmarks and fixtures.
+
+Both are stable for a given seed and parameters.
+"""
+
+import logging
+import zlib
+from datetime import date, timedelta
+from decimal import Decimal
+from functools import cached_property
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+
+from backend.merchants import canonicalize
+from backend.plaid_client import MockPlaidClient
+from finance.models import Account, Transaction
+
+logger = logging.getLogger(__name__)
+
+# (descriptor template, category, median amount, log-sigma, popularity, tipped)
+# "{n}" becomes one of a few store numbers per merchant
+MERCHANTS = (
+    ("AMZN Mktp US*{n}AB1", "Shopping", 32.00, 0.8, 14, False),
+    ("STARBUCKS STORE 0{n}", "Food and Drink", 6.50, 0.35, 12, False),
+    ("WM SUPERCENTER #{n}", "Shops", 58.00, 0.7, 9, False),
+    ("UBER TRIP HELP.UBER.COM", "Transportation", 19.00, 0.5, 7, True),
+    ("TARGET 000{n}", "Shops", 41.00, 0.7, 7, False),
+    ("CHIPOTLE {n}", "Food and Drink", 13.50, 0.25, 6, True),
+    ("SQ *BLUE BOTTLE COFFEE", "Food and Drink", 5.75, 0.3, 5, True),
+    ("SHELL OIL {n}", "Transportation", 42.00, 0.3, 5, False),
+    ("COSTCO WHSE #0{n}", "Shops", 145.00, 0.6, 4, False),
+    ("TRADER JOE'S #{n}", "Shops", 64.00, 0.5, 4, False),
+    ("TST* SHAKE SHACK {n}", "Food and Drink", 18.00, 0.3, 3, True),
+    ("MCDONALD'S F{n}", "Food and Drink", 9.50, 0.35, 3, False),
+    ("LYFT *RIDE SUN 4PM", "Transportation", 17.00, 0.5, 3, True),
+    ("CVS/PHARMACY #0{n}", "Healthcare", 22.00, 0.7, 3, False),
+    ("DD *DOORDASH TACOBELL", "Food and Drink", 27.00, 0.4, 2, True),
+    ("HOME DEPOT #{n}", "Shops", 88.00, 0.9, 2, False),
+    ("APPLE.COM/BILL", "Service", 4.99, 0.6, 2, False),
+    ("SPIRIT AIRLINES {n}", "Travel", 240.00, 0.5, 1, False),
+    ("MARRIOTT HOTELS 0{n}", "Travel", 310.00, 0.5, 1, False),
+)
+STORE_VARIANTS = 8
+
+# (descriptor, category, median amount, log-sigma, day of month, share of accounts)
+RECURRING = (
+    ("CHECKCARD 0412 PROPERTY MGMT RENT", "Payment", 1650.00, 0.25, 1, 0.6),
+    ("NETFLIX.COM", "Service", 15.49, 0.0, 7, 0.6),
+    ("SPOTIFY USA", "Service", 11.99, 0.0, 12, 0.5),
+    ("PLANET FITNESS CLUB FEES", "Recreation", 24.99, 0.0, 17, 0.3),
+    ("CITY UTILITIES PAYMENT", "Service", 110.00, 0.3, 20, 0.8),
+    ("VERIZON WIRELESS PAYMENTS", "Service", 85.00, 0.1, 22, 0.7),
+    ("GEICO AUTO INSURANCE", "Service", 130.00, 0.2, 26, 0.5),
+)
+PAYROLL = ("ACME CORP PAYROLL", "Transfer", 2400.00, 0.35)
+INTEREST = ("INTEREST PAYMENT", "Interest", 4.00, 0.8)
+
+# Share of card purchases first reported as a pending authorization
+PENDING_RATE = 0.35
+# Share of those for which Plaid supplies pending_transaction_id
+LINKED_RATE = 0.5
+# Purchases this recent have not posted yet
+UNSETTLED_DAYS = 3
+
+_INSERT_BATCH_SIZE = 20_000
+
+
+class SyntheticDataset:
+    """
+    Seedable synthetic users, Items, accounts and transactions.
+
+    Each Item has a checking account that carries spending, bills and
+    payroll, and ``accounts_per_item - 1`` savings accounts that only earn
+    interest. ``daily_rate`` is the mean number of card purchases per
+    checking account per day.
+    """
+
+    def __init__(self, seed: int = 0, users: int = 100, items_per_user: int = 1,
+                 accounts_per_item: int = 2, days: int = 730, end: date = date(2025, 6, 30),
+                 daily_rate: float = 1.5):
+        self.seed = seed
+        self.users = users
+        self.items_per_user = items_per_user
+        self.accounts_per_item = accounts_per_item
+        self.days = days
+        self.end = end
+        self.start = end - timedelta(days=days - 1)
+        self.daily_rate = daily_rate
+
+    # --- Users, Items, accounts ---
+
+    @property
+    def items(self) -> int:
+        return self.users * self.items_per_user
+
+    @property
+    def accounts(self) -> int:
+        return self.items * self.accounts_per_item
+
+    def user_email(self, user: int) -> str:
+        return f"synthetic{self.seed}-{user}@example.com"
+
+    def item_id(self, item: int) -> str:
+        return f"syn{self.seed}-item-{item}"
+
+    def access_token(self, item: int) -> str:
+        return f"synthetic-access-{self.seed}-{item}"
+
+    def account_id(self, account: int) -> str:
+        return f"syn{self.seed}-acc-{account}"
+
+    @cached_property
+    def account_item(self) -> np.ndarray:
+        return np.repeat(np.arange(self.items), self.accounts_per_item)
+
+    @cached_property
+    def account_user(self) -> np.ndarray:
+        return self.account_item // self.items_per_user
+
+    @cached_property
+    def is_checking(self) -> np.ndarray:
+        return np.arange(self.accounts) % self.accounts_per_item == 0
+
+    @cached_property
+    def balances(self) -> np.ndarray:
+        """Current balance per account in cents."""
+        rng = self._rng("balances")
+        median = np.where(self.is_checking, 3_500_00, 12_000_00)
+        return np.round(median * rng.lognormal(0, 0.6, self.accounts)).astype(np.int64)
+
+    # --- Transactions ---
+
+    @cached_property
+    def descriptors(self) -> np.ndarray:
+        """Raw descriptor per descriptor code (object array)."""
+        names = [
+            template.replace("{n}", str(1000 + 37 * variant + 11 * index))
+            for index, (template, *_) in enumerate(MERCHANTS)
+            for variant in range(STORE_VARIANTS)
+        ]
+        names += [row[0] for row in RECURRING] + [PAYROLL[0], INTEREST[0]]
+        return np.array(names, dtype=object)
+
+    @cached_property
+    def categories(self) -> np.ndarray:
+        """Category per descriptor code (object array)."""
+        categories = [row[1] for row in MERCHANTS for _ in range(STORE_VARIANTS)]
+        categories += [row[1] for row in RECURRING] + [PAYROLL[1], INTEREST[1]]
+        return np.array(categories, dtype=object)
+
+    @cached_property
+    def merchant_names(self) -> np.ndarray:
+        """Canonical merchant per descriptor code, as ingestion would store it."""
+        return np.array([canonicalize(name) for name in self.descriptors], dtype=object)
+
+    @cached_property
+    def transactions(self) -> dict:
+        """
+        Columnar transactions sorted by (account, day):
+
+        ``account``      account index
+        ``day``          days since ``start``
+        ``cents``        amount in cents, Plaid sign convention
+        ``descriptor``   index into ``descriptors``
+        ``pending``      still an authorization
+        ``twin``         for a pending row, the index of the posted row that
+                         settled it; -1 otherwise
+        ``linked``       posted row carries Plaid's pending_transaction_id
+        """
+        parts = [self._purchases(), self._bills(), self._payroll(), self._interest()]
+        columns = {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+
+        order = np.lexsort((columns["day"], columns["account"]))
+        position = np.empty_like(order)
+        position[order] = np.arange(order.size)
+        sorted_columns = {key: values[order] for key, values in columns.items()}
+        twin = sorted_columns["twin"]
+        sorted_columns["twin"] = np.where(twin >= 0, position[np.maximum(twin, 0)], -1)
+        return sorted_columns
+
+    def __len__(self) -> int:
+        return int(self.transactions["day"].size)
+
+    def transaction_ids(self, start: int, stop: int) -> list:
+        return [f"syn{self.seed}-txn-{index}" for index in range(start, stop)]
+
+    def _transaction_id(self, index: int):
+        return f"syn{self.seed}-txn-{index}" if index >= 0 else None
+
+    def _purchases(self) -> dict:
+        """Card purchases with seasonality, plus pending twins."""
+        rng = self._rng("purchases")
+        checking = np.flatnonzero(self.is_checking)
+        activity = rng.lognormal(0, 0.4, checking.size)
+        counts = rng.poisson(self.daily_rate * self.days * activity)
+        count = int(counts.sum())
+
+        account = np.repeat(checking, counts)
+        day = rng.choice(self.days, size=count, p=self._day_weights())
+
+        popularity = np.array([row[4] for row in MERCHANTS], dtype=float)
+        merchant = rng.choice(len(MERCHANTS), size=count, p=popularity / popularity.sum())
+        median = np.array([row[2] for row in MERCHANTS])[merchant]
+        sigma = np.array([row[3] for row in MERCHANTS])[merchant]
+        cents = np.maximum(np.round(median * 100 * np.exp(sigma * rng.standard_normal(count))), 50).astype(np.int64)
+        descriptor = merchant * STORE_VARIANTS + rng.integers(0, STORE_VARIANTS, count)
+
+        # Recent purchases are still authorizations; older ones may have a pending twin
+        unsettled = day >= self.days - UNSETTLED_DAYS
+        has_twin = ~unsettled & (day >= 3) & (rng.random(count) < PENDING_RATE)
+        source = np.flatnonzero(has_twin)
+        tipped = np.array([row[5] for row in MERCHANTS])[merchant[source]]
+        tip = np.where(tipped, rng.uniform(0.15, 0.22, source.size), 0.0)
+
+        twin_count = source.size
+        return {
+            "account": np.concatenate([account, account[source]]),
+            "day": np.concatenate([day, np.maximum(day[source] - rng.integers(1, 4, twin_count), 0)]),
+            "cents": np.concatenate([cents, np.round(cents[source] / (1 + tip)).astype(np.int64)]),
+            "descriptor": np.concatenate([descriptor, descriptor[source]]),
+            "pending": np.concatenate([unsettled, np.ones(twin_count, dtype=bool)]),
+            "twin": np.concatenate([np.full(count, -1), source]),
+            "linked": np.concatenate([
+                np.isin(np.arange(count), source[rng.random(twin_count) < LINKED_RATE]),
+                np.zeros(twin_count, dtype=bool),
+            ]),
+        }
+
+    def _bills(self) -> dict:
+        """Monthly bills on a fixed day, each account subscribing to a subset."""
+        rng = self._rng("bills")
+        checking = np.flatnonzero(self.is_checking)
+        months = self._month_starts()
+
+        accounts, days, cents, descriptors = [], [], [], []
+        base = len(MERCHANTS) * STORE_VARIANTS
+        for index, (_, _, median, sigma, day_of_month, share) in enumerate(RECURRING):
+            subscribers = checking[rng.random(checking.size) < share]
+            # Fixed per-subscriber amount with a little month-to-month variation
+            amount = median * rng.lognormal(0, sigma, subscribers.size)
+            jitter = rng.lognormal(0, sigma / 5 if sigma else 0, (subscribers.size, months.size))
+            day = months + day_of_month - 1
+            accounts.append(np.repeat(subscribers, months.size))
+            days.append(np.tile(day, subscribers.size))
+            cents.append(np.round((amount[:, None] * jitter).ravel() * 100).astype(np.int64))
+            descriptors.append(np.full(subscribers.size * months.size, base + index))
+        return self._fixed_rows(accounts, days, cents, descriptors)
+
+    def _payroll(self) -> dict:
+        """Biweekly payroll deposits (negative amounts) into checking accounts."""
+        rng = self._rng("payroll")
+        checking = np.flatnonzero(self.is_checking)
+        salary = PAYROLL[2] * rng.lognormal(0, PAYROLL[3], checking.size)
+        phase = rng.integers(0, 14, checking.size)
+        paydays = np.arange(0, self.days, 14)
+
+        days = (phase[:, None] + paydays[None, :]).ravel()
+        keep = days < self.days
+        cents = -np.round(np.repeat(salary, paydays.size) * 100).astype(np.int64)
+        descriptor = len(MERCHANTS) * STORE_VARIANTS + len(RECURRING)
+        return self._fixed_rows(
+            [np.repeat(checking, paydays.size)[keep]], [days[keep]], [cents[keep]],
+            [np.full(int(keep.sum()), descriptor)],
+        )
+
+    def _interest(self) -> dict:
+        """Monthly interest credits into savings accounts."""
+        rng = self._rng("interest")
+        savings = np.flatnonzero(~self.is_checking)
+        months = self._month_starts()
+        cents = -np.round(INTEREST[2] * 100 * rng.lognormal(0, INTEREST[3], savings.size * months.size))
+        descriptor = len(MERCHANTS) * STORE_VARIANTS + len(RECURRING) + 1
+        return self._fixed_rows(
+            [np.repeat(savings, months.size)], [np.tile(months, savings.size)],
+            [cents.astype(np.int64)], [np.full(savings.size * months.size, descriptor)],
+        )
+
+    def _fixed_rows(self, accounts, days, cents, descriptors) -> dict:
+        account = np.concatenate(accounts) if accounts else np.empty(0, dtype=np.int64)
+        day = np.concatenate(days) if days else np.empty(0, dtype=np.int64)
+        keep = (day >= 0) & (day < self.days)
+        size = int(keep.sum())
+        return {
+            "account": account[keep],
+            "day": day[keep],
+            "cents": np.concatenate(cents)[keep],
+            "descriptor": np.concatenate(descriptors)[keep],
+            "pending": np.zeros(size, dtype=bool),
+            "twin": np.full(size, -1),
+            "linked": np.zeros(size, dtype=bool),
+        }
+
+    def _day_weights(self) -> np.ndarray:
+        """Relative purchase volume per day: weekends, summer, holiday season."""
+        dates = np.datetime64(self.start) + np.arange(self.days)
+        weekday = (dates.astype("datetime64[D]").view("int64") - 4) % 7  # 0 = Monday
+        day_of_year = (dates - dates.astype("datetime64[Y]")).astype(int)
+        weights = 1 + 0.12 * np.sin(2 * np.pi * (day_of_year - 80) / 365.25)
+        weights *= np.where(weekday >= 5, 1.3, 1.0)
+        weights *= np.where((day_of_year >= 327) & (day_of_year <= 358), 1.6, 1.0)  # ~Nov 23 - Dec 24
+        return weights / weights.sum()
+
+    def _month_starts(self) -> np.ndarray:
+        """Day offsets of every month start overlapping the range (may be negative)."""
+        first = np.datetime64(self.start, "M")
+        last = np.datetime64(self.end, "M")
+        months = np.arange(first, last + 1)
+        return (months.astype("datetime64[D]") - np.datetime64(self.start)).astype(np.int64)
+
+    def _rng(self, stream: str) -> np.random.Generator:
+        """Independent generator per stream, so changing one part leaves the rest stable."""
+        return np.random.default_rng([self.seed, zlib.crc32(stream.encode())])
+
+    # --- Streaming ---
+
+    def item_accounts(self, item: int) -> range:
+        """Account indexes of an Item."""
+        first = item * self.accounts_per_item
+        return range(first, first + self.accounts_per_item)
+
+    def iter_transactions(self, accounts=None, start: date = None, end: date = None):
+        """
+        Yield Plaid-shaped transaction dicts (see ``MockPlaidClient``) for the
+        given account indexes (default all) between ``start`` and ``end``.
+        """
+        columns = self.transactions
+        first_day = 0 if start is None else max((start - self.start).days, 0)
+        last_day = self.days - 1 if end is None else (end - self.start).days
+        bounds = np.searchsorted(columns["account"], np.arange(self.accounts + 1))
+
+        for account in range(self.accounts) if accounts is None else accounts:
+            lo, hi = bounds[account], bounds[account + 1]
+            days = columns["day"][lo:hi]
+            lo, hi = lo + np.searchsorted(days, first_day), lo + np.searchsorted(days, last_day, side="right")
+            yield from self._transaction_dicts(lo, hi)
+
+    def _transaction_dicts(self, lo: int, hi: int):
+        columns = self.transactions
+        # Plaid links only some settled authorizations explicitly
+        linked = np.where(columns["linked"][lo:hi], self.settled_pending[lo:hi], -1)
+        for transaction_id, account, day, cents, descriptor, pending, pending_row in zip(
+            self.transaction_ids(lo, hi), columns["account"][lo:hi].tolist(),
+            columns["day"][lo:hi].tolist(), columns["cents"][lo:hi].tolist(),
+            columns["descriptor"][lo:hi].tolist(), columns["pending"][lo:hi].tolist(), linked.tolist(),
+        ):
+            yield {
+                "transaction_id": transaction_id,
+                "account_id": self.account_id(account),
+                "date": self.start + timedelta(days=day),
+                "authorized_datetime": None,
+                "amount": cents / 100,
+                "name": self.descriptors[descriptor],
+                "category": self.categories[descriptor],
+                "pending": pending,
+                "pending_transaction_id": self._transaction_id(pending_row),
+            }
+
+    @cached_property
+    def settled_pending(self) -> np.ndarray:
+        """For each posted row, the index of its pending twin; -1 if none."""
+        twin = self.transactions["twin"]
+        pending_rows = np.flatnonzero(twin >= 0)
+        settled = np.full(twin.size, -1)
+        settled[twin[pending_rows]] = pending_rows
+        return settled
+
+
+class SyntheticPlaidClient(MockPlaidClient):
+    """
+    Mock client that serves a ``SyntheticDataset``. Public tokens map to a
+    stable Item, so exchanging the same token always links the same data.
+    """
+
+    def __init__(self, dataset: SyntheticDataset):
+        self.dataset = dataset
+        logger.info(f"Initialized Synthetic Plaid Client ({dataset.items} items, seed {dataset.seed})")
+
+    def exchange_public_token(self, public_token: str) -> dict:
+        item = zlib.crc32(public_token.encode()) % self.dataset.items
+        return {"access_token": self.dataset.access_token(item), "item_id": self.dataset.item_id(item)}
+
+    def get_accounts(self, access_token: str) -> dict:
+        dataset = self.dataset
+        return {
+            "accounts": [
+                {
+                    "account_id": dataset.account_id(account),
+                    "name": "Synthetic Checking" if dataset.is_checking[account] else "Synthetic Savings",
+                    "type": "depository",
+                    "subtype": "checking" if dataset.is_checking[account] else "savings",
+                    "balances": {
+                        "available": dataset.balances[account] / 100,
+                        "current": dataset.balances[account] / 100,
+                    },
+                }
+                for account in dataset.item_accounts(self._item(access_token))
+            ]
+        }
+
+    def get_transactions(self, access_token: str, start_date: date, end_date: date) -> dict:
+        accounts = self.dataset.item_accounts(self._item(access_token))
+        return {"transactions": list(self.dataset.iter_transactions(accounts, start_date, end_date))}
+
+    def _item(self, access_token: str) -> int:
+        return int(access_token.rsplit("-", 1)[1]) % self.dataset.items
+
+
+def load_dataset(dataset: SyntheticDataset, using: str = DEFAULT_DB_ALIAS) -> dict:
+    """
+    Bulk-load the dataset into an empty database as it would look after
+    ingestion: merchants normalized and pending twins reconciled. Returns
+    row counts per table.
+    """
+    connection = connections[using]
+    User = get_user_model()
+    now = timezone.now()
+
+    with transaction.atomic(using=using):
+        password = make_password(None)
+        User.objects.using(using).bulk_create([
+            User(
+                email=dataset.user_email(user),
+                username=dataset.user_email(user),
+                password=password,
+                plaid_access_token=dataset.access_token(user * dataset.items_per_user),
+                plaid_item_id=dataset.item_id(user * dataset.items_per_user),
+                last_plaid_sync=now,
+            )
+            for user in range(dataset.users)
+        ], batch_size=1000)
+        emails = {dataset.user_email(user): user for user in range(dataset.users)}
+        # Primary keys in their database representation, for the raw insert below
+        user_pk = np.empty(dataset.users, dtype=object)
+        for pk, email in User.objects.using(using).filter(email__in=list(emails)).values_list("id", "email"):
+            user_pk[emails[email]] = User._meta.pk.get_db_prep_value(pk, connection)
+
+        Account.objects.using(using).bulk_create([
+            Account(
+                user_id=user_pk[dataset.account_user[account]],
+                account_id=dataset.account_id(account),
+                item_id=dataset.item_id(dataset.account_item[account]),
+                name="Synthetic Checking" if dataset.is_checking[account] else "Synthetic Savings",
+                type="depository",
+                subtype="checking" if dataset.is_checking[account] else "savings",
+                current_balance=Decimal(int(dataset.balances[account])).scaleb(-2),
+                available_balance=Decimal(int(dataset.balances[account])).scaleb(-2),
+            )
+            for account in range(dataset.accounts)
+        ], batch_size=1000)
+        account_pk = np.empty(dataset.accounts, dtype=object)
+        prefix = f"syn{dataset.seed}-acc-"
+        for pk, account_id in Account.objects.using(using).filter(
+            account_id__startswith=prefix,
+        ).values_list("id", "account_id"):
+            account_pk[int(account_id[len(prefix):])] = Account._meta.pk.get_db_prep_value(pk, connection)
+
+        _insert_transactions(dataset, connection, user_pk, account_pk, now)
+
+    logger.info(f"Loaded synthetic dataset: {dataset.users} users, {dataset.accounts} accounts, {len(dataset)} transactions")
+    return {"users": dataset.users, "accounts": dataset.accounts, "transactions": len(dataset)}
+
+
+def _insert_transactions(dataset, connection, user_pk, account_pk, now):
+    """Plain executemany in large batches; model instances are the bottleneck at this volume."""
+    fields = [
+        "user", "account", "transaction_id", "date", "authorized_at", "amount", "name",
+        "merchant_name", "category", "pending", "pending_transaction_id", "duplicate_of",
+        "created_at", "updated_at",
+    ]
+    meta = Transaction._meta
+    columns = ", ".join(connection.ops.quote_name(meta.get_field(name).column) for name in fields)
+    sql = (
+        f"INSERT INTO {connection.ops.quote_name(meta.db_table)} ({columns}) "
+        f"VALUES ({', '.join(['%s'] * len(fields))})"
+    )
+    timestamp = connection.ops.adapt_datetimefield_value(now)
+    columns = dataset.transactions
+
+    with connection.cursor() as cursor:
+        for lo in range(0, len(dataset), _INSERT_BATCH_SIZE):
+            hi = min(lo + _INSERT_BATCH_SIZE, len(dataset))
+            account = columns["account"][lo:hi]
+            descriptor = columns["descriptor"][lo:hi]
+            dates = np.datetime_as_string(np.datetime64(dataset.start) + columns["day"][lo:hi], unit="D")
+            ids = dataset.transaction_ids(lo, hi)
+            rows = zip(
+                user_pk[dataset.account_user[account]].tolist(),
+                account_pk[account].tolist(),
+                ids,
+                dates.tolist(),
+                [None] * (hi - lo),
+                [f"{cents / 100:.2f}" for cents in columns["cents"][lo:hi].tolist()],
+                dataset.descriptors[descriptor].tolist(),
+                dataset.merchant_names[descriptor].tolist(),
+                dataset.categories[descriptor].tolist(),
+                columns["pending"][lo:hi].tolist(),
+                [dataset._transaction_id(index) for index in dataset.settled_pending[lo:hi].tolist()],
+                [dataset._transaction_id(index) for index in columns["twin"][lo:hi].tolist()],
+                [timestamp] * (hi - lo),
+                [timestamp] * (hi - lo),
+            )
+            cursor.executemany(sql, list(rows))
@@ -5,10 +5,12 @@ from rest_framework import status # generics
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
-# from .models import User
+from .audit import audit_log
+from .models import AuthEvent
 from .serializers import (
     UserRegistrationSerializer,
     UserSerializer,
@@ -33,6 +35,9 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     def validate(self, attrs):
         data = super().validate(attrs)
 
+        # Buffered; last_login is written with the next audit flush
+        audit_log.record(AuthEvent.LOGIN, user=self.user, request=self.context.get('request'))
+
         # Add user data to response
         data['user'] = {
             'id': str(self.user.id),
@@ -49,6 +54,17 @@ class CustomTokenObtainPairView(TokenObtainPairView):
     """Custom login view with user data in response."""
     serializer_class = CustomTokenObtainPairSerializer
 
+    def post(self, request, *args, **kwargs):
+        try:
+            return super().post(request, *args, **kwargs)
+        except AuthenticationFailed:
+            audit_log.record(
+                AuthEvent.LOGIN_FAILED,
+                identifier=str(request.data.get(self.serializer_class.username_field, '')),
+                request=request,
+            )
+            raise
+
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
@@ -113,6 +129,7 @@ def logout_view(request):
 
         token = RefreshToken(refresh_token)
         token.blacklist()
+        audit_log.record(AuthEvent.LOGOUT, user=request.user, request=request)
 
         return Response({
             'message': 'Logout successful'
@@ -185,6 +202,7 @@ def change_password_view(request):
 
     if serializer.is_valid():
         serializer.save()
+        audit_log.record(AuthEvent.PASSWORD_CHANGED, user=request.user, request=request)
         return Response({
             'message': 'Password changed successfully'
         }, status=status.HTTP_200_OK)
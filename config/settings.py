@@ -68,13 +68,63 @@ TEMPLATES = [
 WSGI_APPLICATION = "config.wsgi.application"
 
 # --- DATABASE ---
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+# DB_ENGINE=sqlite3 (default) treats DB_NAME and DB_REPLICAS as file names;
+# other engines (e.g. postgresql) use DB_NAME/DB_USER/DB_PASSWORD/DB_HOST/DB_PORT
+# and treat DB_REPLICAS as replica hosts.
+DB_ENGINE = os.getenv("DB_ENGINE", "sqlite3")
+DB_CONN_MAX_AGE = int(os.getenv("DB_CONN_MAX_AGE", "60"))  # persistent connections (seconds)
+DB_POOL = os.getenv("DB_POOL", "False") == "True"  # psycopg connection pool (PostgreSQL only)
+
+
+def _database(name, host=""):
+    if DB_ENGINE == "sqlite3":
+        return {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": BASE_DIR / name,
+            "CONN_MAX_AGE": DB_CONN_MAX_AGE,
+            "CONN_HEALTH_CHECKS": True,
+        }
+    config = {
+        "ENGINE": f"django.db.backends.{DB_ENGINE}",
+        "NAME": name,
+        "USER": os.getenv("DB_USER", ""),
+        "PASSWORD": os.getenv("DB_PASSWORD", ""),
+        "HOST": host,
+        "PORT": os.getenv("DB_PORT", ""),
+        # Pooled connections must not also be persistent
+        "CONN_MAX_AGE": 0 if DB_POOL else DB_CONN_MAX_AGE,
+        "CONN_HEALTH_CHECKS": True,
     }
+    if DB_POOL:
+        config["OPTIONS"] = {
+            "pool": {
+                "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+                "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+            }
+        }
+    return config
+
+
+DATABASES = {
+    "default": _database(os.getenv("DB_NAME", "db.sqlite3"), os.getenv("DB_HOST", "")),
 }
 
+# Read replicas, used only inside backend.routers.read_replica()
+DATABASE_REPLICAS = []
+for _index, _replica in enumerate(filter(None, os.getenv("DB_REPLICAS", "").split(",")), start=1):
+    _alias = f"replica_{_index}"
+    if DB_ENGINE == "sqlite3":
+        DATABASES[_alias] = _database(_replica.strip())
+    else:
+        DATABASES[_alias] = _database(DATABASES["default"]["NAME"], _replica.strip())
+    DATABASES[_alias]["TEST"] = {"MIRROR": "default"}
+    DATABASE_REPLICAS.append(_alias)
+
+DATABASE_ROUTERS = ["backend.routers.PrimaryReplicaRouter"]
+
+# After a user's own sync, their reads stay on the primary for this long
+REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", "30"))
+
 # --- PASSWORD VALIDATION ---
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
@@ -114,8 +164,15 @@ SIMPLE_JWT = {
     "BLACKLIST_AFTER_ROTATION": True,
     "AUTH_HEADER_TYPES": ("Bearer",),
     "ALGORITHM": os.getenv("JWT_ALGORITHM", "HS256"),
+    # last_login is written in batches by backend.audit, not in the login request
+    "UPDATE_LAST_LOGIN": False,
 }
 
+# --- AUTH AUDIT LOG ---
+AUTH_AUDIT_BATCH_SIZE = int(os.getenv("AUTH_AUDIT_BATCH_SIZE", "500"))
+AUTH_AUDIT_FLUSH_INTERVAL = float(os.getenv("AUTH_AUDIT_FLUSH_INTERVAL", "2.0"))
+AUTH_AUDIT_BACKGROUND = os.getenv("AUTH_AUDIT_BACKGROUND", "True") == "True"
+
 # --- CORS CONFIG ---
 CORS_ALLOWED_ORIGINS = os.getenv("CORS_ALLOWED_ORIGINS", "http://localhost:3000,http://localhost:8501").split(",")
 CORS_ALLOW_CREDENTIALS = os.getenv("CORS_ALLOW_CREDENTIALS", "True") == "True"
@@ -129,10 +186,48 @@ EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER", "")
 EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD", "")
 DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL", EMAIL_HOST_USER)
 
+# --- NOTIFICATIONS ---
+APP_BASE_URL = os.getenv("APP_BASE_URL", "http://localhost:8501")
+NOTIFICATION_SEND_HOURS = (
+    int(os.getenv("NOTIFICATION_SEND_START_HOUR", "8")),
+    int(os.getenv("NOTIFICATION_SEND_END_HOUR", "20")),
+)
+NOTIFICATION_BATCH_SIZE = int(os.getenv("NOTIFICATION_BATCH_SIZE", "200"))
+NOTIFICATION_WORKERS = int(os.getenv("NOTIFICATION_WORKERS", "4"))
+# Rows claimed by a dispatch run that has not finished after this long are sent again
+NOTIFICATION_CLAIM_STALE_SECONDS = int(os.getenv("NOTIFICATION_CLAIM_STALE_SECONDS", "900"))
+
 # --- PLAID CONFIGURATION ---
 PLAID_CLIENT_ID = os.getenv("PLAID_CLIENT_ID", "")
 PLAID_SECRET = os.getenv("PLAID_SECRET", "")
-PLAID_ENVIRONMENT = os.getenv("PLAID_ENVIRONMENT", "sandbox")
+PLAID_ENVIRONMENT = os.getenv("PLAID_ENVIRONMENT", "sandbox")  # sandbox | production | mock | synthetic
+# Dataset served when PLAID_ENVIRONMENT=synthetic (see backend/synthetic.py)
+SYNTHETIC_SEED = int(os.getenv("SYNTHETIC_SEED", "0"))
+SYNTHETIC_USERS = int(os.getenv("SYNTHETIC_USERS", "100"))
+
+# --- BACKFILL ---
+BACKFILL_MONTHS = int(os.getenv("BACKFILL_MONTHS", "24"))
+BACKFILL_CHUNK_DAYS = int(os.getenv("BACKFILL_CHUNK_DAYS", "30"))
+# A running job whose worker has not checkpointed for this long is reclaimed
+BACKFILL_STALE_SECONDS = int(os.getenv("BACKFILL_STALE_SECONDS", "300"))
+BACKFILL_MAX_ATTEMPTS = int(os.getenv("BACKFILL_MAX_ATTEMPTS", "5"))
+# Delay before the first retry of a failed job; doubles with every attempt
+BACKFILL_RETRY_SECONDS = int(os.getenv("BACKFILL_RETRY_SECONDS", "60"))
+
+# --- BALANCE HISTORY ---
+# Older daily/weekly snapshots are downsampled by manage.py compact_balance_snapshots
+BALANCE_DAILY_RETENTION_DAYS = int(os.getenv("BALANCE_DAILY_RETENTION_DAYS", "90"))
+BALANCE_WEEKLY_RETENTION_DAYS = int(os.getenv("BALANCE_WEEKLY_RETENTION_DAYS", "730"))
+
+# --- CASH-FLOW FORECASTS ---
+# Stored per user and refreshed nightly by manage.py refresh_forecasts; a sync invalidates the user's row
+FORECAST_HORIZON_DAYS = int(os.getenv("FORECAST_HORIZON_DAYS", "90"))
+FORECAST_LOOKBACK_DAYS = int(os.getenv("FORECAST_LOOKBACK_DAYS", "180"))
+FORECAST_BATCH_USERS = int(os.getenv("FORECAST_BATCH_USERS", "500"))
+
+# --- REPORTING ---
+REPORTS_ROOT = Path(os.getenv("REPORTS_ROOT", BASE_DIR / "reports"))
+REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", "0")) or None  # None = one per CPU
 
 # --- SECURITY SETTINGS ---
 SECURE_SSL_REDIRECT = os.getenv("SECURE_SSL_REDIRECT", "False") == "True"
@@ -141,3 +236,7 @@ CSRF_COOKIE_SECURE = os.getenv("CSRF_COOKIE_SECURE", "False") == "True"
 SECURE_HSTS_SECONDS = int(os.getenv("SECURE_HSTS_SECONDS", "0"))
 SECURE_HSTS_INCLUDE_SUBDOMAINS = os.getenv("SECURE_HSTS_INCLUDE_SUBDOMAINS", "False") == "True"
 SECURE_HSTS_PRELOAD = os.getenv("SECURE_HSTS_PRELOAD", "False") == "True"
+
+# --- STARTUP ---
+# Import-time budget for config.wsgi, enforced by tests/test_import_time.py
+WSGI_IMPORT_BUDGET_MS = int(os.getenv("WSGI_IMPORT_BUDGET_MS", "1500"))
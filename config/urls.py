@@ -12,4 +12,7 @@ urlpatterns = [
     path("api/plaid/create-link-token/", finance_views.create_link_token),
     path("api/plaid/exchange-token/", finance_views.exchange_public_token),
     path("api/plaid/accounts/", finance_views.get_accounts),
+    path("api/plaid/backfill/<uuid:job_id>/", finance_views.backfill_status),
+    path("api/balances/history/", finance_views.balance_history),
+    path("api/forecast/", finance_views.cash_forecast),
 ]
@@ -0,0 +1,30 @@
+"""
+Admin configuration for finance app.
+"""
+from django.contrib import admin
+from backend.merchants import merchant_normalizer
+from .models import Budget, MerchantAlias
+
+
+@admin.register(MerchantAlias)
+class MerchantAliasAdmin(admin.ModelAdmin):
+    """Admin interface for curating merchant aliases."""
+
+    list_display = ['descriptor', 'merchant_name', 'updated_at']
+    search_fields = ['descriptor', 'merchant_name']
+    readonly_fields = ['created_at', 'updated_at']
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        # Corrections take effect immediately here, in other workers once their memo entries expire
+        merchant_normalizer.invalidate([obj.descriptor])
+
+
+@admin.register(Budget)
+class BudgetAdmin(admin.ModelAdmin):
+    """Admin interface for category budgets."""
+
+    list_display = ['user', 'category', 'period', 'limit', 'is_active']
+    list_filter = ['period', 'is_active']
+    search_fields = ['user__email', 'category']
+    raw_id_fields = ['user']
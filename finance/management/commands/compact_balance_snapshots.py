@@ -0,0 +1,24 @@
+"""
+Downsample old balance snapshots into the weekly and monthly tiers.
+
+    python manage.py compact_balance_snapshots
+    python manage.py compact_balance_snapshots --today 2025-06-30
+"""
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from backend.balances import compact_snapshots
+
+
+class Command(BaseCommand):
+    help = "Compact daily and weekly balance snapshots past their retention window."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--today", type=date.fromisoformat, default=None, help="Reference date (YYYY-MM-DD).")
+
+    def handle(self, *args, **options):
+        deleted = compact_snapshots(today=options["today"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Removed {deleted['daily']} daily and {deleted['weekly']} weekly snapshots"
+        ))
@@ -0,0 +1,27 @@
+"""
+Recompute every user's cash-flow forecast; run nightly.
+
+    python manage.py refresh_forecasts
+    python manage.py refresh_forecasts --batch-users 1000
+"""
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from backend.forecasting import refresh_forecasts
+
+
+class Command(BaseCommand):
+    help = "Refresh the stored cash-flow forecasts of all users."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--today", type=date.fromisoformat, default=None, help="Reference date (YYYY-MM-DD).")
+        parser.add_argument("--batch-users", type=int, default=None)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        users = refresh_forecasts(today=options["today"], batch_users=options["batch_users"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Forecast {users} users in {time.perf_counter() - started:.1f}s"
+        ))
@@ -0,0 +1,30 @@
+"""
+Import transaction history for newly linked Items.
+
+    python manage.py run_backfills
+    python manage.py run_backfills --forever
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from backend.backfill import run_pending
+
+
+class Command(BaseCommand):
+    help = "Run queued backfill jobs, resuming interrupted ones from their checkpoint."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--max-jobs", type=int, default=None)
+        parser.add_argument("--forever", action="store_true", help="Keep polling for new jobs.")
+        parser.add_argument("--poll-interval", type=float, default=5.0)
+
+    def handle(self, *args, **options):
+        while True:
+            processed = run_pending(max_jobs=options["max_jobs"])
+            if processed or not options["forever"]:
+                self.stdout.write(self.style.SUCCESS(f"Processed {processed} backfill jobs"))
+            if not options["forever"]:
+                return
+            if not processed:
+                time.sleep(options["poll_interval"])
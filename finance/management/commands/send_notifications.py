@@ -0,0 +1,26 @@
+"""
+Send pending notification emails.
+
+    python manage.py send_notifications
+"""
+from django.core.management.base import BaseCommand
+
+from backend.notifications import NotificationDispatcher
+
+
+class Command(BaseCommand):
+    help = "Send pending notifications in batches over reused mail connections."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument("--workers", type=int, default=None)
+
+    def handle(self, *args, **options):
+        result = NotificationDispatcher(
+            batch_size=options["batch_size"],
+            max_workers=options["workers"],
+        ).dispatch()
+        self.stdout.write(self.style.SUCCESS(
+            f"Sent {result.sent}, failed {result.failed}, retried {result.retried}, "
+            f"skipped {result.skipped}, deferred {result.deferred}"
+        ))
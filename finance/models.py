@@ -0,0 +1,375 @@
+"""
+Financial data models for banking automation application.
+"""
+import uuid
+
+from django.conf import settings
+from django.db import models
+
+
+class MerchantAlias(models.Model):
+    """
+    Shared raw descriptor -> canonical merchant mapping.
+    Rows are written by the normalizer; a row edited in the admin wins over
+    the rule pipeline because stored aliases are consulted first.
+    """
+    descriptor = models.CharField(max_length=255, unique=True)
+    merchant_name = models.CharField(max_length=255, db_index=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'merchant_aliases'
+        verbose_name = 'Merchant Alias'
+        verbose_name_plural = 'Merchant Aliases'
+        ordering = ['merchant_name']
+
+    def __str__(self):
+        return f"{self.descriptor} -> {self.merchant_name}"
+
+
+class Account(models.Model):
+    """Bank account linked through Plaid."""
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='accounts')
+
+    # Plaid identifiers
+    account_id = models.CharField(max_length=255, unique=True)
+    item_id = models.CharField(max_length=255, blank=True, default='')
+
+    name = models.CharField(max_length=255)
+    type = models.CharField(max_length=50)
+    subtype = models.CharField(max_length=50, blank=True, default='')
+
+    # Balances as last reported by Plaid
+    current_balance = models.DecimalField(max_digits=14, decimal_places=2, null=True, blank=True)
+    available_balance = models.DecimalField(max_digits=14, decimal_places=2, null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'accounts'
+        ordering = ['name']
+
+    def __str__(self):
+        return f"{self.name} ({self.account_id})"
+
+
+class Transaction(models.Model):
+    """
+    Bank transaction. Follows Plaid's sign convention:
+    positive amounts are money leaving the account.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='transactions')
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name='transactions')
+
+    transaction_id = models.CharField(max_length=255, unique=True)
+    date = models.DateField()
+    # Plaid's authorized_datetime/datetime when available (UTC); ``date`` is the bank's local date
+    authorized_at = models.DateTimeField(null=True, blank=True)
+    amount = models.DecimalField(max_digits=14, decimal_places=2)
+
+    # Raw descriptor and its canonical merchant (see backend.merchants)
+    name = models.CharField(max_length=255)
+    merchant_name = models.CharField(max_length=255, blank=True, default='')
+    category = models.CharField(max_length=100, blank=True, default='')
+
+    pending = models.BooleanField(default=False)
+    pending_transaction_id = models.CharField(max_length=255, blank=True, null=True)
+    # Set on a pending row once the posted transaction that settled it is known
+    # (see backend.reconciliation); such rows must not be counted again
+    duplicate_of = models.CharField(max_length=255, blank=True, null=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'transactions'
+        ordering = ['-date']
+        indexes = [
+            models.Index(fields=['user', 'date'], name='txn_user_date_idx'),
+            models.Index(fields=['date'], name='txn_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.name} {self.amount}"
+
+
+class Report(models.Model):
+    """Rendered weekly/monthly report artifacts for a user."""
+
+    PERIOD_WEEKLY = 'weekly'
+    PERIOD_MONTHLY = 'monthly'
+    PERIOD_CHOICES = [
+        (PERIOD_WEEKLY, 'Weekly'),
+        (PERIOD_MONTHLY, 'Monthly'),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='reports')
+    period = models.CharField(max_length=10, choices=PERIOD_CHOICES)
+    period_start = models.DateField()
+    period_end = models.DateField()
+
+    # SHA-256 of the report data; unchanged data is never re-rendered
+    content_hash = models.CharField(max_length=64)
+    pdf_path = models.CharField(max_length=500, blank=True, default='')
+    html_path = models.CharField(max_length=500, blank=True, default='')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'reports'
+        ordering = ['-period_start']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'period', 'period_start'], name='unique_report_per_period'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} {self.period} {self.period_start}"
+
+
+class Notification(models.Model):
+    """Queued user notification, e.g. an email saying a report is ready."""
+
+    KIND_REPORT_READY = 'report_ready'
+    KIND_CHOICES = [
+        (KIND_REPORT_READY, 'Report ready'),
+    ]
+
+    STATUS_PENDING = 'pending'
+    STATUS_SENDING = 'sending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+    STATUS_SKIPPED = 'skipped'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_SENDING, 'Sending'),
+        (STATUS_SENT, 'Sent'),
+        (STATUS_FAILED, 'Failed'),
+        (STATUS_SKIPPED, 'Skipped'),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='notifications')
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    report = models.ForeignKey(Report, on_delete=models.CASCADE, null=True, blank=True, related_name='notifications')
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+    # Set when a dispatch run claims the row (status 'sending'); see backend.notifications
+    claim_token = models.UUIDField(null=True, blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'notifications'
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='notification_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} for {self.user} ({self.status})"
+
+
+class Budget(models.Model):
+    """Spending limit for one category over a weekly or monthly period."""
+
+    PERIOD_WEEKLY = 'weekly'
+    PERIOD_MONTHLY = 'monthly'
+    PERIOD_CHOICES = [
+        (PERIOD_WEEKLY, 'Weekly'),
+        (PERIOD_MONTHLY, 'Monthly'),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='budgets')
+    category = models.CharField(max_length=100)
+    period = models.CharField(max_length=10, choices=PERIOD_CHOICES, default=PERIOD_MONTHLY)
+    limit = models.DecimalField(max_digits=14, decimal_places=2)
+    is_active = models.BooleanField(default=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'budgets'
+        ordering = ['category']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'category', 'period'], name='unique_budget_per_category'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} {self.category} {self.limit}/{self.period}"
+
+
+class BudgetPeriod(models.Model):
+    """Running spend total for a budget in one period, maintained from sync deltas."""
+
+    budget = models.ForeignKey(Budget, on_delete=models.CASCADE, related_name='periods')
+    period_start = models.DateField()
+    spent = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'budget_periods'
+        ordering = ['-period_start']
+        constraints = [
+            models.UniqueConstraint(fields=['budget', 'period_start'], name='unique_budget_period'),
+        ]
+
+    def __str__(self):
+        return f"{self.budget} {self.period_start}: {self.spent}"
+
+
+class BudgetAlert(models.Model):
+    """
+    A budget crossing a threshold (percent of limit) in a period.
+    The unique constraint guarantees one alert per threshold per period.
+    """
+    budget = models.ForeignKey(Budget, on_delete=models.CASCADE, related_name='alerts')
+    period_start = models.DateField()
+    threshold = models.PositiveSmallIntegerField()
+    spent = models.DecimalField(max_digits=14, decimal_places=2)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'budget_alerts'
+        ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['budget', 'period_start', 'threshold'], name='unique_budget_alert'),
+        ]
+
+    def __str__(self):
+        return f"{self.budget} reached {self.threshold}% on {self.period_start}"
+
+
+class BackfillJob(models.Model):
+    """
+    Background import of transaction history for a newly linked Item.
+    History is fetched in date-range chunks from newest to oldest; the
+    checkpoint fields are saved after every chunk so a crashed or
+    redeployed worker resumes where it stopped.
+    """
+
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_COMPLETED, 'Completed'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='backfill_jobs')
+    item_id = models.CharField(max_length=255)
+    # The Item's own token: linking another Item replaces the one on the user
+    access_token = models.TextField(blank=True, default='')
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    start_date = models.DateField()
+    end_date = models.DateField()
+    chunk_days = models.PositiveSmallIntegerField(default=30)
+
+    # Checkpoint: everything after cursor_date has been imported
+    cursor_date = models.DateField()
+    chunks_total = models.PositiveIntegerField()
+    chunks_done = models.PositiveIntegerField(default=0)
+    transactions_synced = models.PositiveIntegerField(default=0)
+
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+    # Refreshed by the worker; a running job with a stale heartbeat is reclaimed
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    # Set by each claim; a worker only writes the job while its token is current
+    claim_token = models.UUIDField(null=True, blank=True)
+    # A failed job is queued again but not claimed before this (retry backoff)
+    available_at = models.DateTimeField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'backfill_jobs'
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'heartbeat_at'], name='backfill_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"Backfill {self.item_id} ({self.status} {self.chunks_done}/{self.chunks_total})"
+
+    @property
+    def progress(self):
+        """Fraction of chunks imported, 0.0 to 1.0."""
+        return self.chunks_done / self.chunks_total if self.chunks_total else 1.0
+
+
+class BalanceSnapshot(models.Model):
+    """
+    Closing balance of an account per day, week or month.
+    Each tier is complete within its own retention window (see
+    backend.balances), so a chart reads exactly one tier.
+    """
+
+    RESOLUTION_DAILY = 'daily'
+    RESOLUTION_WEEKLY = 'weekly'
+    RESOLUTION_MONTHLY = 'monthly'
+    RESOLUTION_CHOICES = [
+        (RESOLUTION_DAILY, 'Daily'),
+        (RESOLUTION_WEEKLY, 'Weekly'),
+        (RESOLUTION_MONTHLY, 'Monthly'),
+    ]
+
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name='balance_snapshots')
+    resolution = models.CharField(max_length=7, choices=RESOLUTION_CHOICES)
+    # The day, or the first day of the week (Monday) or month
+    date = models.DateField()
+    current_balance = models.DecimalField(max_digits=14, decimal_places=2, null=True, blank=True)
+    available_balance = models.DecimalField(max_digits=14, decimal_places=2, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'balance_snapshots'
+        ordering = ['account', 'resolution', 'date']
+        constraints = [
+            models.UniqueConstraint(fields=['account', 'resolution', 'date'], name='unique_balance_snapshot'),
+        ]
+        indexes = [
+            # Compaction scans a tier by age across all accounts
+            models.Index(fields=['resolution', 'date'], name='balance_resolution_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.account} {self.resolution} {self.date}: {self.current_balance}"
+
+
+class CashForecast(models.Model):
+    """
+    A user's latest cash-flow forecast (see backend.forecasting), shared by
+    every worker. ``payload`` holds the accounts, series and recurring items
+    with dates as ISO strings.
+    """
+
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='cash_forecast')
+    # The user's last_plaid_sync the forecast was computed from
+    sync_version = models.CharField(max_length=40)
+    generated_on = models.DateField()
+    payload = models.JSONField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'cash_forecasts'
+
+    def __str__(self):
+        return f"{self.user} forecast from {self.generated_on}"
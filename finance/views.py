@@ -1,9 +1,16 @@
 """finance/views.py"""
 
+from datetime import date, timedelta
+
+from django.utils import timezone
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from backend.backfill import enqueue_backfill
+from backend.balances import balance_series, pick_resolution
 from backend.plaid_client import plaid_client
+from backend.routers import read_replica
+from finance.models import BackfillJob, BalanceSnapshot
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
@@ -18,12 +25,37 @@ def create_link_token(request):
 @permission_classes([IsAuthenticated])
 def exchange_public_token(request):
     """
-    Mock endpoint to exchange public token for access token.
+    Exchange a public token for an access token and queue the history import.
+    Only the token exchange happens in-request; history is fetched by the
+    backfill worker, and progress is polled via ``backfill_status``.
     """
     public_token = request.data.get("public_token")
     token_data = plaid_client.exchange_public_token(public_token)
-    # Here you’d save the mock access_token + item_id to the user model
-    return Response(token_data)
+
+    user = request.user
+    user.plaid_access_token = token_data["access_token"]
+    user.plaid_item_id = token_data["item_id"]
+    user.save(update_fields=["plaid_access_token", "plaid_item_id"])
+    job = enqueue_backfill(user, token_data["item_id"], access_token=token_data["access_token"])
+
+    # The access token stays on the server
+    return Response({"item_id": token_data["item_id"], "backfill_job_id": str(job.id)})
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def backfill_status(request, job_id):
+    """
+    Progress of one of the user's history imports.
+    """
+    job = BackfillJob.objects.filter(id=job_id, user=request.user).values(
+        "id", "item_id", "status", "start_date", "end_date", "cursor_date",
+        "chunks_done", "chunks_total", "transactions_synced", "last_error",
+        "created_at", "completed_at",
+    ).first()
+    if job is None:
+        return Response({"detail": "Not found."}, status=404)
+    job["progress"] = job["chunks_done"] / job["chunks_total"] if job["chunks_total"] else 1.0
+    return Response(job)
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
@@ -34,3 +66,52 @@ def get_accounts(request):
     mock_access_token = "mock-access-token-placeholder"
     accounts = plaid_client.get_accounts(mock_access_token)
     return Response(accounts)
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def balance_history(request):
+    """
+    Net balance series for charts.
+
+    GET /api/balances/history/?start=2023-01-01&end=2025-06-30&resolution=weekly
+    ``resolution`` (daily | weekly | monthly) defaults to the finest tier
+    that covers ``start``; the range defaults to the last year.
+    """
+    try:
+        end = date.fromisoformat(request.query_params["end"]) if "end" in request.query_params else timezone.localdate()
+        start = (
+            date.fromisoformat(request.query_params["start"])
+            if "start" in request.query_params else end - timedelta(days=365)
+        )
+    except ValueError:
+        return Response({"detail": "start and end must be YYYY-MM-DD dates."}, status=400)
+    resolution = request.query_params.get("resolution") or pick_resolution(start)
+    if resolution not in dict(BalanceSnapshot.RESOLUTION_CHOICES):
+        return Response({"detail": "resolution must be daily, weekly or monthly."}, status=400)
+
+    with read_replica(user_id=request.user.id):
+        series = balance_series(request.user, start, end, resolution=resolution)
+    return Response({"resolution": resolution, "series": series})
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def cash_forecast(request):
+    """
+    Projected balances for the next ``days`` days (default 30, at most
+    FORECAST_HORIZON_DAYS), served from the stored nightly forecast.
+
+    GET /api/forecast/?days=60
+    """
+    # Imported here: forecasting pulls in NumPy, which worker boot shouldn't pay for
+    from backend import forecasting
+
+    try:
+        days = int(request.query_params.get("days", 30))
+    except ValueError:
+        days = 0
+    if not 1 <= days <= forecasting.horizon_days():
+        return Response({"detail": f"days must be between 1 and {forecasting.horizon_days()}."}, status=400)
+
+    with read_replica(user_id=request.user.id):
+        forecast = forecasting.get_forecast(request.user)
+    return Response(forecasting.forecast_window(forecast, days))
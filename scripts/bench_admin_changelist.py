@@ -0,0 +1,116 @@
+"""
+Benchmark: user admin changelist on a large users table.
+
+Seeds an in-memory test database with synthetic users and times common
+changelist requests with the original admin configuration (icontains search,
+exact COUNT(*) paginator, full result count, no indexes) against
+backend.admin.UserAdmin with the users table indexes in place.
+
+    python scripts/bench_admin_changelist.py --users 1000000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.db import setup_django  # noqa: E402
+
+setup_django()
+
+from django.contrib.admin.sites import site  # noqa: E402
+from django.contrib.auth.admin import UserAdmin as BaseUserAdmin  # noqa: E402
+from django.core.paginator import Paginator  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import RequestFactory  # noqa: E402
+
+from backend.models import User  # noqa: E402
+
+REQUESTS = {
+    "first page": {},
+    "page 50": {"p": "50"},
+    "filter is_staff": {"is_staff__exact": "1"},
+    "filter email_verified": {"email_verified__exact": "0"},
+    "search prefix": {"q": "user12345"},
+    "search exact email": {"q": "=user12345@example.com"},
+}
+
+
+class BaselineUserAdmin(site._registry[User].__class__):
+    """The changelist configuration before indexes and estimated counts."""
+
+    search_fields = ["email", "username", "first_name", "last_name"]
+    paginator = Paginator
+    show_full_result_count = True
+
+    def get_search_results(self, request, queryset, search_term):
+        return BaseUserAdmin.get_search_results(self, request, queryset, search_term.lstrip("="))
+
+
+def seed(count: int):
+    batch = []
+    for i in range(count):
+        batch.append(User(
+            email=f"user{i}@example.com", username=f"user{i}", password="!",
+            first_name=f"First{i % 5000}", last_name=f"Last{i % 20000}",
+            is_staff=i % 1000 == 0, email_verified=i % 3 == 0, two_factor_enabled=i % 7 == 0,
+        ))
+        if len(batch) == 10_000:
+            User.objects.bulk_create(batch)
+            batch = []
+    User.objects.bulk_create(batch)
+
+
+def time_changelist(model_admin, params, superuser, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        request = RequestFactory().get("/admin/backend/user/", params)
+        request.user = superuser
+        started = time.perf_counter()
+        changelist = model_admin.get_changelist_instance(request)
+        list(changelist.result_list)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    connection.creation.create_test_db(verbosity=0)
+
+    started = time.perf_counter()
+    seed(args.users)
+    print(f"seeded {args.users:,} users in {time.perf_counter() - started:.1f}s")
+
+    superuser = User.objects.create_superuser(username="bench-admin", email="admin@bench.test", password="x")
+
+    indexes = User._meta.indexes
+    with connection.schema_editor() as editor:
+        for index in indexes:
+            editor.remove_index(User, index)
+    baseline = {
+        label: time_changelist(BaselineUserAdmin(User, site), params, superuser, args.repeat)
+        for label, params in REQUESTS.items()
+    }
+
+    with connection.schema_editor() as editor:
+        for index in indexes:
+            editor.add_index(User, index)
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+    current = {
+        label: time_changelist(site._registry[User], params, superuser, args.repeat)
+        for label, params in REQUESTS.items()
+    }
+
+    print(f"{'request':<24}{'baseline':>12}{'indexed':>12}")
+    for label in REQUESTS:
+        print(f"{label:<24}{baseline[label] * 1000:>10.1f}ms{current[label] * 1000:>10.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
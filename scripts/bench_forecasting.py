@@ -0,0 +1,64 @@
+"""
+Benchmark: nightly cash-flow forecast batch and stored single-user reads.
+
+Loads a synthetic dataset (backend.synthetic) with FORECAST_LOOKBACK_DAYS of
+history into an in-memory test database, times refresh_forecasts for every
+user, extrapolates to a larger user base, and times get_forecast served from
+the cash_forecasts table against a cold recompute for one user.
+
+    python scripts/bench_forecasting.py --users 2000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.db import setup_django  # noqa: E402
+
+setup_django()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connection  # noqa: E402
+
+from backend.forecasting import (  # noqa: E402
+    get_forecast, horizon_days, invalidate_forecast, lookback_days, refresh_forecasts,
+)
+from backend.synthetic import SyntheticDataset, load_dataset  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch-users", type=int, default=None)
+    parser.add_argument("--extrapolate", type=int, default=100_000, help="User count to project the batch to.")
+    args = parser.parse_args()
+
+    connection.creation.create_test_db(verbosity=0)
+    dataset = SyntheticDataset(seed=args.seed, users=args.users, days=lookback_days() + 1)
+    load_dataset(dataset)
+    print(f"dataset:  {args.users:,} users, {dataset.accounts:,} accounts, {len(dataset):,} transactions")
+
+    started = time.perf_counter()
+    users = refresh_forecasts(today=dataset.end, batch_users=args.batch_users)
+    elapsed = time.perf_counter() - started
+    print(f"batch:    {users:,} users x {horizon_days()} days in {elapsed:.2f}s "
+          f"({users / elapsed:,.0f} users/s, ~{args.extrapolate / users * elapsed / 60:.1f} min "
+          f"for {args.extrapolate:,} users)")
+
+    user = get_user_model().objects.first()
+    started = time.perf_counter()
+    for _ in range(100):
+        get_forecast(user, today=dataset.end)
+    stored = (time.perf_counter() - started) / 100
+    invalidate_forecast(user.id)
+    started = time.perf_counter()
+    get_forecast(user, today=dataset.end)
+    cold = time.perf_counter() - started
+    print(f"single:   stored {stored * 1000:.2f}ms, recomputed {cold * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
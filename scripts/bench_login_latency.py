@@ -0,0 +1,91 @@
+"""
+Benchmark: login latency with inline vs. buffered audit writes.
+
+Logs in repeatedly through CustomTokenObtainPairView against a file-backed
+SQLite test database. The inline variant writes the audit row and
+last_login inside the request, as a synchronous implementation would. The
+buffered variant uses backend.audit, whose batched flush is timed
+separately. A fast password hasher keeps hashing from hiding the
+difference.
+
+    python scripts/bench_login_latency.py --logins 2000
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.db import setup_django  # noqa: E402
+
+setup_django()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth.models import update_last_login  # noqa: E402
+from django.db import connection  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+from backend import views  # noqa: E402
+from backend.audit import audit_log  # noqa: E402
+from backend.models import AuthEvent, User  # noqa: E402
+
+PASSWORD = "bench-password"
+
+
+class InlineAudit:
+    """Writes each event and last_login in the request."""
+
+    def record(self, event, user=None, identifier="", request=None):
+        AuthEvent.objects.create(user=user, event=event, identifier=identifier or user.email)
+        if event == AuthEvent.LOGIN:
+            update_last_login(None, user)
+
+
+def run(client, users, logins):
+    timings = []
+    for n in range(logins):
+        started = time.perf_counter()
+        response = client.post("/api/auth/login/", {"email": users[n % len(users)], "password": PASSWORD})
+        timings.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200
+    timings.sort()
+    return timings[len(timings) // 2], timings[int(len(timings) * 0.99)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--logins", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=200)
+    args = parser.parse_args()
+
+    settings.PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+    settings.ALLOWED_HOSTS = ["testserver"]
+    settings.AUTH_AUDIT_BACKGROUND = False
+    settings.AUTH_AUDIT_BATCH_SIZE = args.logins + 1
+    connection.settings_dict["TEST"]["NAME"] = str(Path(tempfile.mkdtemp()) / "bench.sqlite3")
+    connection.creation.create_test_db(verbosity=0)
+
+    emails = [f"login{i}@example.com" for i in range(args.users)]
+    for email in emails:
+        User.objects.create_user(email=email, username=email, password=PASSWORD)
+    client = APIClient()
+
+    views.audit_log = InlineAudit()
+    inline = run(client, emails, args.logins)
+    views.audit_log = audit_log
+    buffered = run(client, emails, args.logins)
+
+    started = time.perf_counter()
+    written = audit_log.flush()
+    flushed = (time.perf_counter() - started) * 1000
+
+    print(f"inline:   p50 {inline[0]:.2f}ms  p99 {inline[1]:.2f}ms")
+    print(f"buffered: p50 {buffered[0]:.2f}ms  p99 {buffered[1]:.2f}ms")
+    print(f"flush:    {written} events and {args.users} last_login values in {flushed:.1f}ms "
+          f"({flushed / max(written, 1) * 1000:.0f}us per event)")
+
+
+if __name__ == "__main__":
+    main()
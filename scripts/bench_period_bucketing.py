@@ -0,0 +1,131 @@
+"""
+Benchmark: timezone-aware weekly bucketing in SQL vs. in Python.
+
+Seeds an in-memory test database with synthetic transactions, then compares
+backend.periods.bucketed_totals against loading every row and converting it
+with pytz. SQLite evaluates the truncation through Django's Python
+callbacks, so the gap is considerably wider on PostgreSQL.
+
+    python scripts/bench_period_bucketing.py --rows 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+import pytz  # noqa: E402
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connection  # noqa: E402
+
+from backend.periods import bucketed_totals  # noqa: E402
+from finance.models import Account, Transaction  # noqa: E402
+
+ZONES = [
+    "UTC", "America/New_York", "America/Chicago", "America/Denver",
+    "America/Los_Angeles", "Europe/London", "Europe/Berlin", "Asia/Tokyo",
+]
+START = date(2024, 1, 1)
+END = date(2024, 12, 31)
+
+
+def seed(rows: int, users: int):
+    rng = random.Random(42)
+    User = get_user_model()
+    User.objects.bulk_create([
+        User(email=f"bench{i}@example.com", username=f"bench{i}", timezone=ZONES[i % len(ZONES)])
+        for i in range(users)
+    ])
+    user_ids = list(User.objects.values_list("id", flat=True))
+    Account.objects.bulk_create([
+        Account(user_id=uid, account_id=f"bench-acc-{i}", name="Checking", type="depository")
+        for i, uid in enumerate(user_ids)
+    ])
+    accounts = dict(Account.objects.values_list("user_id", "id"))
+
+    span = (END - START).days
+    batch = []
+    for n in range(rows):
+        uid = user_ids[n % users]
+        moment = datetime.combine(START, datetime.min.time(), timezone.utc) + timedelta(
+            seconds=rng.randrange(span * 86400)
+        )
+        batch.append(Transaction(
+            user_id=uid, account_id=accounts[uid], transaction_id=f"bench-{n}",
+            date=moment.date(), authorized_at=moment if n % 4 else None,
+            amount=Decimal(rng.randrange(-20000, 20000)) / 100, name="BENCH",
+        ))
+        if len(batch) == 10_000:
+            Transaction.objects.bulk_create(batch)
+            batch = []
+    Transaction.objects.bulk_create(batch)
+
+
+def python_bucketed_totals(start, end):
+    """Baseline: load all rows and bucket them in Python with pytz."""
+    results = {}
+    rows = Transaction.objects.filter(
+        date__range=(start - timedelta(days=1), end + timedelta(days=1)), pending=False,
+    ).values_list(
+        "user_id", "user__timezone", "date", "authorized_at", "amount"
+    ).order_by().iterator(chunk_size=10_000)
+    zones = {}
+    for user_id, tz_name, day, authorized_at, amount in rows:
+        if authorized_at is not None:
+            zone = zones.setdefault(tz_name, pytz.timezone(tz_name))
+            day = authorized_at.astimezone(zone).date()
+        if not start <= day <= end:
+            continue
+        bucket = day - timedelta(days=day.weekday())
+        totals = results.setdefault(user_id, {}).setdefault(bucket, [Decimal(0), Decimal(0), 0])
+        if amount > 0:
+            totals[0] += amount
+        elif amount < 0:
+            totals[1] -= amount
+        totals[2] += 1
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=1_000)
+    args = parser.parse_args()
+
+    connection.creation.create_test_db(verbosity=0)
+
+    started = time.perf_counter()
+    seed(args.rows, args.users)
+    print(f"seeded {args.rows:,} transactions in {time.perf_counter() - started:.1f}s")
+
+    started = time.perf_counter()
+    sql = bucketed_totals("weekly", START, END)
+    sql_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    py = python_bucketed_totals(START, END)
+    py_seconds = time.perf_counter() - started
+
+    mismatches = sum(
+        1
+        for user_id, buckets in sql.items()
+        for b in buckets
+        if py[user_id][b["bucket"]] != [b["spent"], b["income"], b["count"]]
+    )
+    print(f"sql     {sql_seconds:8.2f}s")
+    print(f"python  {py_seconds:8.2f}s  ({py_seconds / sql_seconds:.1f}x slower)")
+    print(f"bucket mismatches: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
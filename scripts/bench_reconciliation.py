@@ -0,0 +1,114 @@
+"""
+Benchmark: hash-indexed pending/posted matching vs. pairwise comparison.
+
+Builds a synthetic batch in which roughly half the transactions are pending
+authorizations and most of those settle a few days later, some with a tip
+or hold adjustment. Times backend.reconciliation.match_pending on the full
+batch and a pairwise scan on a smaller slice (it is quadratic, so the full
+batch would take hours), and checks both find the same pairs on the slice.
+
+    python scripts/bench_reconciliation.py --rows 100000
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.db import setup_django  # noqa: E402
+
+setup_django()
+
+from backend.reconciliation import AMOUNT_TOLERANCE, DATE_WINDOW_DAYS, match_pending  # noqa: E402
+
+MERCHANTS = [
+    "Amazon", "Starbucks", "Uber", "Lyft", "Chipotle", "Target", "Walmart", "Shell",
+    "Netflix", "Spotify", "Whole Foods", "Costco", "DoorDash", "Apple", "Home Depot",
+]
+START = date(2024, 1, 1)
+
+
+def synthesize(rows: int, accounts: int, seed: int = 42):
+    """Pending and posted rows; about 90% of pending rows have a posted twin."""
+    rng = random.Random(seed)
+    pending, posted = [], []
+    while len(pending) + len(posted) < rows:
+        n = len(pending)
+        account = f"acc-{rng.randrange(accounts)}"
+        merchant = rng.choice(MERCHANTS)
+        amount = round(rng.lognormvariate(3, 1), 2)
+        day = START + timedelta(days=rng.randrange(365))
+        pending.append({
+            "transaction_id": f"p-{n}", "account_id": account, "merchant_name": merchant,
+            "amount": amount, "date": day,
+        })
+        if rng.random() < 0.9:
+            settled = amount * (1 + rng.choice([0, 0, 0, 0.15, 0.2])) if rng.random() < 0.3 else amount
+            posted.append({
+                "transaction_id": f"s-{n}", "account_id": account, "merchant_name": merchant,
+                "amount": round(settled, 2), "date": day + timedelta(days=rng.randrange(1, 5)),
+                "pending_transaction_id": None,
+            })
+    return pending, posted
+
+
+def pairwise(pending: list, posted: list) -> dict:
+    """Reference implementation: compare every posted row with every pending row."""
+    matches = {}
+    for txn in sorted(posted, key=lambda t: t["date"]):
+        best, best_score = None, None
+        for candidate in pending:
+            if candidate["transaction_id"] in matches:
+                continue
+            if (candidate["account_id"], candidate["merchant_name"].casefold()) != (
+                txn["account_id"], txn["merchant_name"].casefold()
+            ):
+                continue
+            if (candidate["amount"] >= 0) != (txn["amount"] >= 0):
+                continue
+            lag = (txn["date"] - candidate["date"]).days
+            difference = abs(txn["amount"] - candidate["amount"])
+            if not 0 <= lag <= DATE_WINDOW_DAYS:
+                continue
+            if difference > AMOUNT_TOLERANCE * max(abs(txn["amount"]), abs(candidate["amount"])):
+                continue
+            score = (difference, lag)
+            if best_score is None or score < best_score:
+                best, best_score = candidate, score
+        if best is not None:
+            matches[best["transaction_id"]] = txn["transaction_id"]
+    return matches
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--accounts", type=int, default=200)
+    parser.add_argument("--pairwise-rows", type=int, default=10_000)
+    args = parser.parse_args()
+
+    pending, posted = synthesize(args.rows, args.accounts)
+    matches, elapsed = timed(match_pending, pending, posted)
+    correct = sum(1 for p, s in matches.items() if p[2:] == s[2:])
+    print(f"hash index: {len(pending) + len(posted):,} rows, {len(matches):,} pairs "
+          f"({correct / max(len(matches), 1):.1%} true pairs) in {elapsed:.2f}s")
+
+    small_pending, small_posted = synthesize(args.pairwise_rows, args.accounts)
+    indexed, indexed_time = timed(match_pending, small_pending, small_posted)
+    naive, naive_time = timed(pairwise, small_pending, small_posted)
+    print(f"{args.pairwise_rows:,} rows: hash index {indexed_time * 1000:.0f}ms, "
+          f"pairwise {naive_time * 1000:.0f}ms ({naive_time / indexed_time:.0f}x); "
+          f"same pairs: {indexed == naive}")
+
+
+if __name__ == "__main__":
+    main()
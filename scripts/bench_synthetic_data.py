@@ -0,0 +1,59 @@
+"""
+Benchmark: generate and bulk-load a synthetic dataset.
+
+Times backend.synthetic.SyntheticDataset generation and load_dataset into an
+in-memory test database, then streams one Item through SyntheticPlaidClient.
+The default size is about one million transactions.
+
+    python scripts/bench_synthetic_data.py --users 565
+"""
+import argparse
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.db import setup_django  # noqa: E402
+
+setup_django()
+
+from django.db import connection  # noqa: E402
+
+from backend.synthetic import SyntheticDataset, SyntheticPlaidClient, load_dataset  # noqa: E402
+from finance.models import Transaction  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--users", type=int, default=565)
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    connection.creation.create_test_db(verbosity=0)
+
+    started = time.perf_counter()
+    dataset = SyntheticDataset(seed=args.seed, users=args.users, days=args.days)
+    count = len(dataset)
+    generated = time.perf_counter() - started
+    print(f"generate: {count:,} transactions for {dataset.accounts:,} accounts in {generated:.2f}s")
+
+    started = time.perf_counter()
+    load_dataset(dataset)
+    loaded = time.perf_counter() - started
+    assert Transaction.objects.count() == count
+    print(f"load:     {count / loaded:,.0f} rows/s, {loaded:.2f}s")
+    print(f"total:    {generated + loaded:.2f}s")
+
+    client = SyntheticPlaidClient(dataset)
+    token = client.exchange_public_token("public-bench")["access_token"]
+    started = time.perf_counter()
+    rows = client.get_transactions(token, dataset.end - timedelta(days=89), dataset.end)["transactions"]
+    print(f"stream:   {len(rows):,} transactions for 90 days of one Item in "
+          f"{(time.perf_counter() - started) * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
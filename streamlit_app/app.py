@@ -0,0 +1,115 @@
+"""
+streamlit_app/app.py
+
+MVP dashboard.
+
+    streamlit run streamlit_app/app.py
+
+All widgets work on the cached, pre-aggregated frames from
+``streamlit_app.data``; a rerun only queries the database when the user's
+sync version has changed.
+"""
+
+import sys
+from datetime import timedelta
+from pathlib import Path
+
+import streamlit as st
+
+# streamlit puts this directory on sys.path, not the project root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.db import setup_django  # noqa: E402
+from streamlit_app import data  # noqa: E402
+
+st.set_page_config(page_title="Banking Automation Bot", layout="wide")
+
+
+def login_form():
+    """Authenticate against the Django user table."""
+    st.title("Banking Automation Bot")
+    with st.form("login"):
+        email = st.text_input("Email")
+        password = st.text_input("Password", type="password")
+        submitted = st.form_submit_button("Sign in")
+    if submitted:
+        setup_django()
+        from django.contrib.auth import authenticate
+
+        user = authenticate(username=email, password=password)
+        if user is None:
+            st.error("Invalid email or password.")
+        else:
+            st.session_state["user_id"] = str(user.id)
+            st.session_state["user_email"] = user.email
+            st.rerun()
+
+
+def dashboard(user_id: str):
+    version = data.current_sync_version(user_id)
+    frames = data.load_dashboard_data(user_id, version)
+    daily = frames["daily"]
+
+    with st.sidebar:
+        st.caption(f"Signed in as {st.session_state.get('user_email', '')}")
+        if st.button("Sign out"):
+            st.session_state.clear()
+            st.rerun()
+        st.caption(f"Last sync: {version}")
+
+    st.title("Dashboard")
+    if daily.empty:
+        st.info("No transactions yet. Link an account to get started.")
+        return
+
+    first_day, last_day = daily["date"].min(), daily["date"].max()
+    with st.sidebar:
+        picked = st.date_input(
+            "Date range",
+            value=(max(first_day, last_day - timedelta(days=90)), last_day),
+            min_value=first_day,
+            max_value=last_day,
+        )
+        # Mid-selection the widget returns only the start date
+        start, end = picked if len(picked) == 2 else (picked[0], last_day)
+        categories = st.multiselect("Categories", sorted(daily["category"].unique()))
+        resolution = st.radio("Resolution", ["Daily", "Weekly", "Monthly"], index=1, horizontal=True)
+
+    selected = data.filter_daily(daily, start, end, categories)
+
+    spent, income = selected["spent"].sum(), selected["income"].sum()
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Spent", f"${spent:,.2f}")
+    col2.metric("Income", f"${income:,.2f}")
+    col3.metric("Net", f"${income - spent:,.2f}")
+
+    st.subheader("Spending over time")
+    st.line_chart(data.spend_over_time(selected, resolution[0]))
+
+    left, right = st.columns(2)
+    with left:
+        st.subheader("By category")
+        st.bar_chart(data.spend_by_category(selected))
+    with right:
+        st.subheader("Top merchants")
+        merchants = frames["merchants"]
+        in_range = merchants[
+            (merchants["month"].dt.date >= start.replace(day=1)) & (merchants["month"].dt.date <= end)
+        ]
+        st.dataframe(
+            in_range.groupby("merchant_name", observed=True)["spent"].sum()
+            .nlargest(10).to_frame(),
+            use_container_width=True,
+        )
+
+    st.subheader("Accounts")
+    st.dataframe(frames["accounts"], hide_index=True, use_container_width=True)
+
+    st.subheader("Recent transactions")
+    st.dataframe(frames["recent"], hide_index=True, use_container_width=True)
+
+
+if "user_id" in st.session_state:
+    dashboard(st.session_state["user_id"])
+else:
+    login_form()
@@ -0,0 +1,173 @@
+"""
+streamlit_app/data.py
+
+Data layer for the Streamlit dashboard.
+
+A user's accounts and transactions are loaded once into Arrow-backed pandas
+frames and pre-aggregated (daily totals per category, monthly totals per
+merchant). The result is cached with ``st.cache_data`` keyed by user and a
+sync version stamp, so widget reruns only slice small cached frames; the
+database is read again only after a new sync changes the stamp.
+"""
+
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
+
+from backend.db import setup_django
+
+# How often to re-check whether a new sync has landed
+SYNC_VERSION_TTL = 30
+
+# Dashboards kept per process; one entry per (user, sync version)
+CACHE_MAX_ENTRIES = 256
+
+RECENT_TRANSACTIONS = 200
+
+ACCOUNT_SCHEMA = pa.schema([
+    ("account_id", pa.string()),
+    ("name", pa.string()),
+    ("type", pa.string()),
+    ("subtype", pa.string()),
+    ("current_balance", pa.decimal128(14, 2)),
+    ("available_balance", pa.decimal128(14, 2)),
+])
+
+TRANSACTION_SCHEMA = pa.schema([
+    ("transaction_id", pa.string()),
+    ("date", pa.date32()),
+    ("account_id", pa.string()),
+    ("name", pa.string()),
+    ("merchant_name", pa.string()),
+    ("category", pa.string()),
+    ("amount", pa.decimal128(14, 2)),
+    ("pending", pa.bool_()),
+])
+
+
+def sync_version(user_id: str) -> str:
+    """Stamp that changes whenever a sync lands for the user."""
+    setup_django()
+    from django.contrib.auth import get_user_model
+
+    last_sync = (
+        get_user_model().objects.filter(id=user_id)
+        .values_list("last_plaid_sync", flat=True).first()
+    )
+    return last_sync.isoformat() if last_sync else "never"
+
+
+def fetch_frames(user_id: str) -> dict:
+    """Load raw accounts and transactions as Arrow-backed frames."""
+    setup_django()
+    from backend.routers import read_replica
+    from finance.models import Account, Transaction
+
+    accounts = Account.objects.filter(user_id=user_id).values_list(
+        "account_id", "name", "type", "subtype", "current_balance", "available_balance",
+    ).order_by("name")
+    # Pending rows already settled by a posted transaction would be shown twice
+    transactions = Transaction.objects.filter(user_id=user_id, duplicate_of__isnull=True).values_list(
+        "transaction_id", "date", "account__account_id", "name",
+        "merchant_name", "category", "amount", "pending",
+    ).order_by("date")
+
+    with read_replica(user_id=user_id):
+        account_rows = list(accounts)
+        transaction_rows = list(transactions)
+
+    return {
+        "accounts": _arrow_frame(account_rows, ACCOUNT_SCHEMA),
+        "transactions": _arrow_frame(transaction_rows, TRANSACTION_SCHEMA),
+    }
+
+
+def aggregate_frames(frames: dict) -> dict:
+    """
+    Pre-aggregate raw frames into the shapes the charts need.
+    Amounts use Plaid's sign convention (positive = money out).
+    """
+    txns = frames["transactions"]
+    posted = txns[~txns["pending"]].assign(
+        spent=lambda df: df["amount"].clip(lower=0),
+        income=lambda df: (-df["amount"]).clip(lower=0),
+        category=lambda df: df["category"].mask(df["category"] == "", "Uncategorized"),
+    )
+
+    daily = (
+        posted.groupby(["date", "category"], observed=True)
+        .agg(spent=("spent", "sum"), income=("income", "sum"), count=("amount", "size"))
+        .reset_index()
+    )
+    merchants = (
+        posted[posted["spent"] > 0]
+        .assign(month=lambda df: pd.to_datetime(df["date"]).dt.to_period("M").dt.to_timestamp())
+        .groupby(["month", "merchant_name"], observed=True)
+        .agg(spent=("spent", "sum"), count=("spent", "size"))
+        .reset_index()
+    )
+
+    return {
+        "accounts": frames["accounts"],
+        "daily": daily,
+        "merchants": merchants,
+        "recent": txns.tail(RECENT_TRANSACTIONS).iloc[::-1].reset_index(drop=True),
+    }
+
+
+def filter_daily(daily: pd.DataFrame, start, end, categories=None) -> pd.DataFrame:
+    """Slice pre-aggregated daily totals by date range and categories."""
+    mask = (daily["date"] >= start) & (daily["date"] <= end)
+    if categories:
+        mask &= daily["category"].isin(categories)
+    return daily[mask]
+
+
+def spend_over_time(daily: pd.DataFrame, freq: str = "D") -> pd.DataFrame:
+    """Spend and income resampled to ``freq`` ("D", "W" or "M")."""
+    if daily.empty:
+        return pd.DataFrame(columns=["spent", "income"])
+    totals = daily.groupby("date")[["spent", "income"]].sum()
+    totals.index = pd.to_datetime(totals.index)
+    if freq == "W":
+        # Monday-to-Sunday weeks labelled by their Monday, as in backend.periods
+        totals = totals.resample("W-MON", closed="left", label="left").sum()
+    elif freq == "M":
+        totals = totals.resample("MS").sum()
+    return totals
+
+
+def spend_by_category(daily: pd.DataFrame) -> pd.DataFrame:
+    """Total spend per category, largest first."""
+    return (
+        daily.groupby("category", observed=True)["spent"].sum()
+        .sort_values(ascending=False).to_frame()
+    )
+
+
+@st.cache_data(ttl=SYNC_VERSION_TTL, show_spinner=False)
+def current_sync_version(user_id: str) -> str:
+    """Cached sync stamp lookup; at most one query per user per TTL."""
+    return sync_version(user_id)
+
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, show_spinner="Loading your accounts...")
+def load_dashboard_data(user_id: str, version: str) -> dict:
+    """
+    Pre-aggregated dashboard frames for a user. ``version`` is part of the
+    cache key only; pass ``current_sync_version(user_id)``.
+    """
+    return aggregate_frames(fetch_frames(user_id))
+
+
+def _arrow_frame(rows: list, schema: pa.Schema) -> pd.DataFrame:
+    """Build an Arrow-backed frame column-wise; money becomes float64."""
+    columns = list(zip(*rows)) if rows else [[] for _ in schema]
+    table = pa.table(
+        [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+        schema=schema,
+    )
+    for index, field in enumerate(schema):
+        if pa.types.is_decimal(field.type):
+            table = table.set_column(index, field.name, table.column(index).cast(pa.float64()))
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
@@ -20,3 +20,26 @@ def user_factory():
         return user
 
     return create_user
+
+
+@pytest.fixture
+def synthetic_data(db):
+    """
+    A small synthetic dataset (see backend.synthetic) loaded into the test
+    database in one bulk insert.
+    """
+    from backend.synthetic import SyntheticDataset, load_dataset
+
+    dataset = SyntheticDataset(seed=7, users=3, days=120)
+    load_dataset(dataset)
+    return dataset
+
+
+@pytest.fixture(autouse=True)
+def synchronous_audit_log(settings):
+    """Write auth audit events on the test thread, and only on flush()."""
+    from backend.audit import audit_log
+
+    settings.AUTH_AUDIT_BACKGROUND = False
+    yield audit_log
+    audit_log.discard()
@@ -0,0 +1,66 @@
+"""
+Tests for the user admin changelist on large tables
+tests/test_admin_changelist.py
+"""
+
+import pytest
+from django.contrib.admin.sites import site
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from backend.models import User
+from backend.pagination import EstimatedCountPaginator, estimate_table_rows
+
+
+@pytest.fixture
+def users(db):
+    User.objects.bulk_create([
+        User(email=f"person{i}@example.com", username=f"person{i}", first_name="John" if i < 5 else "Jane",
+             last_name=f"Smith{i % 3}", is_staff=i % 10 == 0)
+        for i in range(30)
+    ])
+
+
+@pytest.fixture
+def changelist(users):
+    admin = User.objects.create_superuser(username="admin", email="admin@example.com", password="x")
+
+    def run(**params):
+        request = RequestFactory().get("/admin/backend/user/", params)
+        request.user = admin
+        return site._registry[User].get_changelist_instance(request)
+    return run
+
+
+def test_estimate_table_rows(users):
+    assert estimate_table_rows(User) >= 30
+
+
+def test_paginator_uses_estimate_above_threshold(users, monkeypatch):
+    monkeypatch.setattr(EstimatedCountPaginator, "exact_count_threshold", 10)
+    monkeypatch.setattr(EstimatedCountPaginator, "count_limit", 5)
+
+    with CaptureQueriesContext(connection) as ctx:
+        unfiltered = EstimatedCountPaginator(User.objects.all(), 10).count
+    assert unfiltered >= 30
+    assert not any("COUNT(" in q["sql"] for q in ctx.captured_queries)
+
+    # Filtered querysets are counted, but never beyond count_limit
+    assert EstimatedCountPaginator(User.objects.filter(is_staff=False), 10).count == 5
+    assert EstimatedCountPaginator(User.objects.filter(is_staff=True), 10).count == 3
+
+
+def test_changelist_prefix_and_exact_search(changelist):
+    assert changelist(q="person1").result_count == 11  # person1, person10..person19
+    assert changelist(q="=person1@example.com").result_count == 1
+    assert changelist(q="erson1").result_count == 0  # no infix matches
+    assert changelist(is_staff__exact="1").result_count == 4  # includes the admin
+
+
+def test_changelist_search_matches_every_word(changelist):
+    # John: person0-4; Smith0: person0, 3, 6, ...
+    assert changelist(q="John Smith0").result_count == 2
+    assert changelist(q="john smith").result_count == 5
+    assert changelist(q="John Nobody").result_count == 0
+    assert changelist(q="=person1@example.com person2").result_count == 0
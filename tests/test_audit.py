@@ -0,0 +1,156 @@
+"""
+Tests for the buffered auth audit log
+tests/test_audit.py
+"""
+
+import time
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from backend.models import AuthEvent
+
+PASSWORD = "Secur3!Passw0rd"
+
+
+@pytest.fixture(autouse=True)
+def fast_hasher(settings):
+    settings.PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+
+@pytest.fixture
+def client():
+    return APIClient(REMOTE_ADDR="203.0.113.7", HTTP_USER_AGENT="pytest")
+
+
+def login(client, email, password=PASSWORD):
+    return client.post(reverse("backend:login"), {"email": email, "password": password}, format="json")
+
+
+def writes(queries, tables=('"users"', '"auth_events"')):
+    """INSERT INTO <table> / UPDATE <table> statements against the given tables."""
+    statements = []
+    for query in queries:
+        words = query["sql"].split(" ", 3)
+        if (words[0] == "INSERT" and words[2] in tables) or (words[0] == "UPDATE" and words[1] in tables):
+            statements.append(query["sql"])
+    return statements
+
+
+@pytest.mark.django_db
+def test_login_defers_audit_and_last_login_writes(client, user_factory, synchronous_audit_log):
+    user = user_factory()
+
+    with CaptureQueriesContext(connection) as queries:
+        assert login(client, user.email).status_code == 200
+    assert writes(queries.captured_queries) == []
+    assert not AuthEvent.objects.exists()
+
+    assert synchronous_audit_log.flush() == 1
+    event = AuthEvent.objects.get()
+    assert (event.event, event.user_id, event.ip_address, event.user_agent) == (
+        AuthEvent.LOGIN, user.id, "203.0.113.7", "pytest",
+    )
+    user.refresh_from_db()
+    assert user.last_login == event.created_at
+
+
+@pytest.mark.django_db
+def test_failed_login_logout_and_password_change_are_recorded(client, user_factory, synchronous_audit_log):
+    user = user_factory()
+
+    assert login(client, "nobody@example.com").status_code == 401
+    client.force_authenticate(user=user)
+    refresh = str(RefreshToken.for_user(user))
+    assert client.post(reverse("backend:logout"), {"refresh": refresh}, format="json").status_code == 200
+    assert client.post(reverse("backend:change_password"), {
+        "old_password": PASSWORD,
+        "new_password": "N3w!Passw0rd-long",
+        "new_password_confirm": "N3w!Passw0rd-long",
+    }, format="json").status_code == 200
+
+    synchronous_audit_log.flush()
+    events = list(AuthEvent.objects.order_by("created_at").values_list("event", "user_id", "identifier"))
+    assert events == [
+        (AuthEvent.LOGIN_FAILED, None, "nobody@example.com"),
+        (AuthEvent.LOGOUT, user.id, user.email),
+        (AuthEvent.PASSWORD_CHANGED, user.id, user.email),
+    ]
+
+
+@pytest.mark.django_db
+def test_flush_coalesces_last_login_and_batches_inserts(user_factory, synchronous_audit_log):
+    users = [user_factory(email=f"u{i}@example.com", username=f"u{i}") for i in range(3)]
+    for _ in range(20):
+        for user in users:
+            synchronous_audit_log.record(AuthEvent.LOGIN, user=user)
+    latest = synchronous_audit_log._last_login.copy()
+
+    with CaptureQueriesContext(connection) as queries:
+        assert synchronous_audit_log.flush() == 60
+    # One multi-row INSERT plus one CASE UPDATE for all users
+    assert len(writes(queries.captured_queries)) == 2
+    assert AuthEvent.objects.count() == 60
+    for user in users:
+        user.refresh_from_db()
+        assert user.last_login == latest[user.pk]
+
+
+@pytest.mark.django_db
+def test_size_threshold_flushes_inline(settings, user_factory, synchronous_audit_log):
+    settings.AUTH_AUDIT_BATCH_SIZE = 5
+    user = user_factory()
+
+    for _ in range(4):
+        synchronous_audit_log.record(AuthEvent.LOGOUT, user=user)
+    assert not AuthEvent.objects.exists()
+    synchronous_audit_log.record(AuthEvent.LOGOUT, user=user)
+    assert AuthEvent.objects.count() == 5
+    assert synchronous_audit_log.pending() == 0
+
+
+@pytest.mark.django_db(transaction=True)
+def test_background_worker_flushes_on_interval_and_close(settings, user_factory):
+    from backend.audit import AuditLog
+
+    settings.AUTH_AUDIT_BACKGROUND = True
+    settings.AUTH_AUDIT_FLUSH_INTERVAL = 0.05
+    user = user_factory()
+    log = AuditLog()
+    try:
+        log.record(AuthEvent.LOGIN, user=user)
+        deadline = time.monotonic() + 5
+        while log.pending() and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert log.pending() == 0
+
+        settings.AUTH_AUDIT_FLUSH_INTERVAL = 60
+        log.record(AuthEvent.LOGOUT, user=user)
+    finally:
+        log.close()
+
+    assert AuthEvent.objects.count() == 2
+    user.refresh_from_db()
+    assert user.last_login is not None
+
+
+@pytest.mark.django_db(transaction=True)
+def test_events_of_deleted_users_do_not_block_the_trail(user_factory, synchronous_audit_log):
+    kept = user_factory(email="kept@example.com", username="kept")
+    gone = user_factory(email="gone@example.com", username="gone")
+    synchronous_audit_log.record(AuthEvent.LOGIN, user=gone)
+    synchronous_audit_log.record(AuthEvent.LOGIN, user=kept)
+    gone.delete()
+
+    assert synchronous_audit_log.flush() == 2
+
+    assert synchronous_audit_log.pending() == 0
+    assert sorted(AuthEvent.objects.values_list("identifier", "user_id")) == [
+        ("gone@example.com", None), ("kept@example.com", kept.pk),
+    ]
+    kept.refresh_from_db()
+    assert kept.last_login is not None
@@ -0,0 +1,263 @@
+"""
+Tests for resumable historical backfill
+tests/test_backfill.py
+"""
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from backend import backfill
+from backend.plaid_client import MockPlaidClient
+from django.db.models import Sum
+
+from finance.models import BackfillJob, Budget, BudgetAlert, BudgetPeriod, Transaction
+
+
+class FlakyPlaidClient(MockPlaidClient):
+    """Mock client that records ranges and fails on the ``fail_on``-th fetch."""
+
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.ranges = []
+
+    def get_transactions(self, access_token, start_date, end_date):
+        self.ranges.append((start_date, end_date))
+        if len(self.ranges) == self.fail_on:
+            raise ConnectionError("worker killed")
+        return super().get_transactions(access_token, start_date, end_date)
+
+
+@pytest.fixture
+def linked_user(user_factory):
+    user = user_factory()
+    user.plaid_access_token = "mock-access-token-abc123"
+    user.plaid_item_id = "mock-item-abc123"
+    user.save()
+    return user
+
+
+def queue_job(user, months=3):
+    return backfill.enqueue_backfill(user, user.plaid_item_id, months=months, today=date(2025, 6, 30))
+
+
+@pytest.mark.django_db
+def test_exchange_token_queues_backfill_without_importing(user_factory):
+    user = user_factory()
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    res = client.post("/api/plaid/exchange-token/", {"public_token": "public-abc123"})
+
+    assert res.status_code == 200
+    job = BackfillJob.objects.get(id=res.data["backfill_job_id"])
+    assert job.status == BackfillJob.STATUS_QUEUED
+    assert job.cursor_date == job.end_date
+    assert not Transaction.objects.exists()
+    assert set(res.data) == {"item_id", "backfill_job_id"}
+    user.refresh_from_db()
+    assert user.plaid_access_token and job.access_token == user.plaid_access_token
+    assert user.plaid_item_id == res.data["item_id"]
+
+
+@pytest.mark.django_db
+def test_backfill_imports_history_in_chunks(linked_user, monkeypatch):
+    client = FlakyPlaidClient()
+    monkeypatch.setattr(backfill, "plaid_client", client)
+    job = queue_job(linked_user)
+
+    assert backfill.run_pending() == 1
+
+    job.refresh_from_db()
+    days = (job.end_date - job.start_date).days + 1
+    assert job.status == BackfillJob.STATUS_COMPLETED
+    assert job.chunks_done == job.chunks_total == len(client.ranges)
+    assert job.transactions_synced == days == Transaction.objects.filter(user=linked_user).count()
+    # Newest first, contiguous, non-overlapping
+    assert client.ranges[0][1] == job.end_date and client.ranges[-1][0] == job.start_date
+    for newer, older in zip(client.ranges, client.ranges[1:]):
+        assert older[1] == newer[0] - timedelta(days=1)
+    assert set(Transaction.objects.values_list("merchant_name", flat=True)) == {"Amazon", "Coffee", "Uber"}
+    linked_user.refresh_from_db()
+    assert linked_user.last_plaid_sync is not None
+
+
+@pytest.mark.django_db
+def test_backfill_resumes_from_checkpoint_after_crash(linked_user, monkeypatch):
+    crashing = FlakyPlaidClient(fail_on=3)
+    monkeypatch.setattr(backfill, "plaid_client", crashing)
+    job = queue_job(linked_user)
+
+    backfill.run_pending(max_jobs=1)
+
+    job.refresh_from_db()
+    assert job.status == BackfillJob.STATUS_QUEUED
+    assert job.chunks_done == 2
+    assert job.cursor_date == crashing.ranges[1][0] - timedelta(days=1)
+    assert "worker killed" in job.last_error
+    imported = Transaction.objects.filter(user=linked_user).count()
+    assert imported == job.transactions_synced
+    # Backing off: not reclaimed straight away
+    assert backfill.run_pending() == 0
+    BackfillJob.objects.filter(id=job.id).update(available_at=timezone.now())
+
+    resumed = FlakyPlaidClient()
+    monkeypatch.setattr(backfill, "plaid_client", resumed)
+    backfill.run_pending()
+
+    job.refresh_from_db()
+    assert job.status == BackfillJob.STATUS_COMPLETED
+    assert resumed.ranges[0] == crashing.ranges[2]
+    assert len(resumed.ranges) == job.chunks_total - 2
+    assert Transaction.objects.filter(user=linked_user).count() == (job.end_date - job.start_date).days + 1
+
+
+@pytest.mark.django_db
+def test_stale_running_job_is_reclaimed(linked_user, settings):
+    settings.BACKFILL_STALE_SECONDS = 60
+    now = timezone.now()
+    live = queue_job(linked_user)
+    stale = queue_job(linked_user)
+    BackfillJob.objects.filter(id=live.id).update(status=BackfillJob.STATUS_RUNNING, heartbeat_at=now)
+    BackfillJob.objects.filter(id=stale.id).update(
+        status=BackfillJob.STATUS_RUNNING, heartbeat_at=now - timedelta(minutes=5),
+    )
+
+    claimed = backfill.claim_next_job(now=now)
+
+    assert claimed.id == stale.id
+    assert claimed.attempts == 1
+    assert backfill.claim_next_job(now=now) is None
+
+
+@pytest.mark.django_db
+def test_slow_worker_stops_once_its_job_is_reclaimed(linked_user, monkeypatch, settings):
+    settings.BACKFILL_STALE_SECONDS = 60
+    job = queue_job(linked_user)
+    slow = backfill.claim_next_job()
+    reclaimed = []
+
+    class SlowPlaidClient(FlakyPlaidClient):
+        def get_transactions(self, access_token, start_date, end_date):
+            # Stalls on the second chunk long enough for another worker to take over
+            if len(self.ranges) == 1:
+                reclaimed.append(backfill.claim_next_job(now=timezone.now() + timedelta(minutes=5)))
+            return super().get_transactions(access_token, start_date, end_date)
+
+    monkeypatch.setattr(backfill, "plaid_client", SlowPlaidClient())
+    backfill.run_job(slow)
+
+    job.refresh_from_db()
+    assert reclaimed[0].id == job.id
+    assert (job.status, job.chunks_done, job.claim_token) == (BackfillJob.STATUS_RUNNING, 1, reclaimed[0].claim_token)
+    # The slow worker's second chunk was rolled back with its checkpoint
+    assert Transaction.objects.filter(user=linked_user).count() == job.transactions_synced
+
+    monkeypatch.setattr(backfill, "plaid_client", FlakyPlaidClient())
+    backfill.run_job(reclaimed[0])
+    job.refresh_from_db()
+    assert job.status == BackfillJob.STATUS_COMPLETED
+    assert job.chunks_done == job.chunks_total
+    assert job.transactions_synced == Transaction.objects.filter(user=linked_user).count()
+
+
+@pytest.mark.django_db
+def test_backfill_status_endpoint_is_scoped_to_owner(linked_user, user_factory):
+    job = queue_job(linked_user)
+    client = APIClient()
+    client.force_authenticate(user=linked_user)
+
+    res = client.get(f"/api/plaid/backfill/{job.id}/")
+    assert res.status_code == 200
+    assert res.data["status"] == BackfillJob.STATUS_QUEUED
+    assert res.data["progress"] == 0.0
+
+    other = user_factory(email="other@example.com", username="other")
+    client.force_authenticate(user=other)
+    assert client.get(f"/api/plaid/backfill/{job.id}/").status_code == 404
+
+
+@pytest.mark.django_db
+def test_failed_job_retries_with_growing_backoff(linked_user, monkeypatch, settings):
+    settings.BACKFILL_RETRY_SECONDS = 60
+    monkeypatch.setattr(backfill, "plaid_client", FlakyPlaidClient(fail_on=1))
+    job = queue_job(linked_user)
+
+    delays = []
+    for _ in range(3):
+        claimed = backfill.claim_next_job(now=job.available_at or timezone.now())
+        failed_at = timezone.now()
+        monkeypatch.setattr(backfill, "plaid_client", FlakyPlaidClient(fail_on=1))
+        backfill.run_job(claimed)
+        job.refresh_from_db()
+        delays.append(round((job.available_at - failed_at).total_seconds() / 60))
+        assert backfill.claim_next_job(now=job.available_at - timedelta(seconds=1)) is None
+
+    assert delays == [1, 2, 4]
+    # Retries keep the Item's token
+    assert job.access_token == linked_user.plaid_access_token
+
+
+@pytest.mark.django_db
+def test_finished_jobs_drop_their_token_copy(linked_user, monkeypatch, settings):
+    settings.BACKFILL_MAX_ATTEMPTS = 1
+    monkeypatch.setattr(backfill, "plaid_client", FlakyPlaidClient(fail_on=1))
+    failed = queue_job(linked_user)
+    backfill.run_pending()
+
+    monkeypatch.setattr(backfill, "plaid_client", FlakyPlaidClient())
+    completed = queue_job(linked_user)
+    backfill.run_pending()
+
+    failed.refresh_from_db()
+    completed.refresh_from_db()
+    assert (failed.status, failed.access_token) == (BackfillJob.STATUS_FAILED, "")
+    assert (completed.status, completed.access_token) == (BackfillJob.STATUS_COMPLETED, "")
+
+
+@pytest.mark.django_db
+def test_jobs_use_their_own_items_token(user_factory):
+    user = user_factory()
+    client = APIClient()
+    client.force_authenticate(user=user)
+    # Link two Items before the worker gets to the first job
+    first = client.post("/api/plaid/exchange-token/", {"public_token": "public-aaaaaa"}).data
+    second = client.post("/api/plaid/exchange-token/", {"public_token": "public-bbbbbb"}).data
+
+    assert backfill.run_pending() == 2
+
+    accounts = dict(user.accounts.values_list("account_id", "item_id"))
+    assert accounts == {
+        "mock-checking-aaaaaa": first["item_id"], "mock-savings-aaaaaa": first["item_id"],
+        "mock-checking-bbbbbb": second["item_id"], "mock-savings-bbbbbb": second["item_id"],
+    }
+    for item_id in (first["item_id"], second["item_id"]):
+        job = BackfillJob.objects.get(item_id=item_id)
+        assert (job.status, job.access_token) == (BackfillJob.STATUS_COMPLETED, "")
+        assert Transaction.objects.filter(account__item_id=item_id).count() == job.transactions_synced > 0
+
+
+@pytest.mark.django_db
+def test_backfill_updates_budgets_and_raises_alerts(linked_user, monkeypatch):
+    monkeypatch.setattr(backfill, "plaid_client", FlakyPlaidClient())
+    budget = Budget.objects.create(user=linked_user, category="Shopping", limit=Decimal("300.00"))
+    june = Transaction.objects.filter(user=linked_user, category="Shopping", date__gte=date(2025, 6, 1))
+
+    queue_job(linked_user)
+    backfill.run_pending()
+
+    spent = june.aggregate(total=Sum("amount"))["total"]
+    assert spent > budget.limit
+    assert BudgetPeriod.objects.get(budget=budget, period_start=date(2025, 6, 1)).spent == spent
+    assert set(
+        BudgetAlert.objects.filter(budget=budget, period_start=date(2025, 6, 1)).values_list("threshold", flat=True)
+    ) == {80, 100}
+
+    # Importing the same history again changes nothing
+    queue_job(linked_user)
+    backfill.run_pending()
+    assert BudgetPeriod.objects.get(budget=budget, period_start=date(2025, 6, 1)).spent == spent
+    assert BudgetAlert.objects.filter(budget=budget, period_start=date(2025, 6, 1)).count() == 2
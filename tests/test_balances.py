@@ -0,0 +1,165 @@
+"""
+Tests for tiered balance snapshots
+tests/test_balances.py
+"""
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from backend.balances import (
+    DAILY, MONTHLY, WEEKLY, balance_series, compact_snapshots, reconstruct_history, record_snapshots,
+)
+from finance.models import Account, BalanceSnapshot, Transaction
+
+TODAY = date(2025, 6, 30)
+
+
+@pytest.fixture
+def accounts(user_factory):
+    user = user_factory()
+    checking = Account.objects.create(
+        user=user, account_id="chk", name="Checking", type="depository",
+        current_balance=Decimal("1000.00"), available_balance=Decimal("950.00"),
+    )
+    card = Account.objects.create(
+        user=user, account_id="card", name="Card", type="credit", current_balance=Decimal("200.00"),
+    )
+    return user, checking, card
+
+
+def tiers(account):
+    return {
+        resolution: dict(
+            BalanceSnapshot.objects.filter(account=account, resolution=resolution)
+            .values_list("date", "current_balance")
+        )
+        for resolution in (DAILY, WEEKLY, MONTHLY)
+    }
+
+
+def seed_daily(account, days, today=TODAY):
+    """One daily snapshot per day for ``days`` days ending ``today``; balance = day offset."""
+    record = []
+    for offset in range(days):
+        day = today - timedelta(days=days - 1 - offset)
+        account.current_balance = Decimal(offset)
+        record_snapshots([account], day=day)
+        record.append((day, Decimal(offset)))
+    return record
+
+
+@pytest.mark.django_db
+def test_record_rolls_up_into_every_tier(accounts):
+    _, checking, _ = accounts
+
+    record_snapshots([checking], day=date(2025, 6, 24))
+    checking.current_balance = Decimal("1200.00")
+    record_snapshots([checking], day=date(2025, 6, 25))
+
+    snapshots = tiers(checking)
+    assert snapshots[DAILY] == {date(2025, 6, 24): Decimal("1000.00"), date(2025, 6, 25): Decimal("1200.00")}
+    # The open week and month hold the latest balance
+    assert snapshots[WEEKLY] == {date(2025, 6, 23): Decimal("1200.00")}
+    assert snapshots[MONTHLY] == {date(2025, 6, 1): Decimal("1200.00")}
+
+
+@pytest.mark.django_db
+def test_compaction_drops_old_rows_and_keeps_closing_balances(settings, accounts):
+    settings.BALANCE_DAILY_RETENTION_DAYS = 30
+    settings.BALANCE_WEEKLY_RETENTION_DAYS = 120
+    _, checking, _ = accounts
+    history = seed_daily(checking, 400)
+    # Simulate rows that predate the rollup: only the daily tier knows them
+    BalanceSnapshot.objects.filter(resolution__in=(WEEKLY, MONTHLY), date__lt=date(2024, 9, 1)).delete()
+
+    deleted = compact_snapshots(today=TODAY)
+
+    snapshots = tiers(checking)
+    daily_cutoff = date(2025, 5, 26)  # Monday on or before today - 30 days
+    assert min(snapshots[DAILY]) == daily_cutoff
+    assert min(snapshots[WEEKLY]) == date(2025, 3, 3)  # first Monday on or after 2025-03-01 (today - 120 days, month-aligned)
+    assert deleted[DAILY] == 400 - len(snapshots[DAILY])
+    assert deleted[WEEKLY] > 0
+
+    closing = {}
+    for day, balance in history:
+        closing[day.replace(day=1)] = balance
+    assert snapshots[MONTHLY] == closing
+
+    assert compact_snapshots(today=TODAY) == {DAILY: 0, WEEKLY: 0}
+
+
+@pytest.mark.django_db
+def test_long_range_series_reads_a_single_coarse_tier(accounts):
+    user, checking, card = accounts
+    seed_daily(checking, 3 * 365)
+    record_snapshots([card], day=TODAY - timedelta(days=3 * 365))
+
+    with CaptureQueriesContext(connection) as queries:
+        series = balance_series(user, TODAY - timedelta(days=3 * 365), TODAY)
+
+    assert len(queries.captured_queries) == 1
+    assert 36 <= len(series) <= 38
+    # Card balance is carried forward and subtracted
+    assert series[-1] == {"date": date(2025, 6, 1), "balance": float(3 * 365 - 1 - 200)}
+
+
+@pytest.mark.django_db
+def test_reconstruct_history_walks_back_from_current_balance(accounts):
+    user, checking, card = accounts
+    for account, day, amount in [
+        (checking, date(2025, 6, 28), "100.00"),   # spent 100 two days ago
+        (checking, date(2025, 6, 29), "-500.00"),  # paid 500 yesterday
+        (card, date(2025, 6, 29), "50.00"),        # charged 50 yesterday
+    ]:
+        Transaction.objects.create(
+            user=user, account=account, transaction_id=f"t-{account.account_id}-{day}",
+            date=day, amount=Decimal(amount), name="x",
+        )
+    Transaction.objects.create(
+        user=user, account=checking, transaction_id="t-pending", date=date(2025, 6, 29),
+        amount=Decimal("999.00"), name="x", pending=True,
+    )
+
+    reconstruct_history([checking, card], date(2025, 6, 27), TODAY)
+
+    assert tiers(checking)[DAILY] == {
+        date(2025, 6, 27): Decimal("600.00"),
+        date(2025, 6, 28): Decimal("500.00"),
+        date(2025, 6, 29): Decimal("1000.00"),
+        date(2025, 6, 30): Decimal("1000.00"),
+    }
+    assert tiers(card)[DAILY][date(2025, 6, 28)] == Decimal("150.00")
+    assert tiers(checking)[WEEKLY] == {date(2025, 6, 23): Decimal("1000.00"), date(2025, 6, 30): Decimal("1000.00")}
+
+
+@pytest.mark.django_db
+def test_history_endpoint(accounts):
+    user, checking, _ = accounts
+    seed_daily(checking, 10)
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    response = client.get("/api/balances/history/", {"start": "2025-06-25", "end": "2025-06-30", "resolution": "daily"})
+    assert response.status_code == 200
+    assert response.data["resolution"] == DAILY
+    assert [point["balance"] for point in response.data["series"]] == [4.0, 5.0, 6.0, 7.0, 8.0, 9.0]
+
+    assert client.get("/api/balances/history/", {"start": "yesterday"}).status_code == 400
+    assert client.get("/api/balances/history/", {"resolution": "hourly"}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_compact_command(accounts):
+    _, checking, _ = accounts
+    seed_daily(checking, 200)
+
+    call_command("compact_balance_snapshots", "--today", TODAY.isoformat())
+
+    assert BalanceSnapshot.objects.filter(resolution=DAILY).count() < 100
@@ -0,0 +1,127 @@
+"""
+Tests for incremental budget evaluation
+tests/test_budgets.py
+"""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from backend import budgets
+from backend.budgets import TransactionDelta, apply_sync_deltas
+from finance.models import Account, Budget, BudgetAlert, BudgetPeriod, Transaction
+
+
+@pytest.fixture
+def user(user_factory):
+    return user_factory()
+
+
+def save_txn(user, txn_id, amount, category="Food and Drink", day=date(2025, 6, 10)):
+    account, _ = Account.objects.get_or_create(
+        account_id="acc-1", defaults={"user": user, "name": "Checking", "type": "depository"},
+    )
+    return Transaction.objects.create(
+        user=user, account=account, transaction_id=txn_id, date=day,
+        amount=Decimal(amount), name="TEST", category=category,
+    )
+
+
+@pytest.mark.django_db
+def test_alerts_fire_once_per_threshold(user):
+    budget = Budget.objects.create(user=user, category="Food and Drink", limit=Decimal("100.00"))
+
+    first = save_txn(user, "t1", "50.00")
+    assert apply_sync_deltas([TransactionDelta.from_transaction(first)]) == []
+
+    second = save_txn(user, "t2", "35.00")
+    alerts = apply_sync_deltas([TransactionDelta.from_transaction(second)])
+    assert [a.threshold for a in alerts] == [80]
+
+    third = save_txn(user, "t3", "5.00")
+    assert apply_sync_deltas([TransactionDelta.from_transaction(third)]) == []
+
+    fourth = save_txn(user, "t4", "20.00")
+    alerts = apply_sync_deltas([TransactionDelta.from_transaction(fourth)])
+    assert [a.threshold for a in alerts] == [100]
+
+    period = BudgetPeriod.objects.get(budget=budget)
+    assert (period.period_start, period.spent) == (date(2025, 6, 1), Decimal("110.00"))
+    assert BudgetAlert.objects.filter(budget=budget).count() == 2
+
+
+@pytest.mark.django_db
+def test_new_budget_seeds_from_existing_transactions(user):
+    save_txn(user, "old", "70.00", day=date(2025, 6, 2))
+    Budget.objects.create(user=user, category="Food and Drink", limit=Decimal("100.00"), period="weekly")
+
+    txn = save_txn(user, "new", "15.00", day=date(2025, 6, 3))
+    alerts = apply_sync_deltas([TransactionDelta.from_transaction(txn)])
+
+    assert [a.threshold for a in alerts] == [80]
+    assert BudgetPeriod.objects.get().spent == Decimal("85.00")
+
+
+@pytest.mark.django_db
+def test_only_touched_budgets_are_evaluated(user_factory):
+    users = [user_factory(email=f"u{i}@example.com", username=f"u{i}") for i in range(6)]
+    for u in users:
+        Budget.objects.create(user=u, category="Shopping", limit=Decimal("10.00"))
+        Budget.objects.create(user=u, category="Travel", limit=Decimal("10.00"))
+        BudgetPeriod.objects.create(budget=Budget.objects.get(user=u, category="Shopping"),
+                                    period_start=date(2025, 6, 1))
+
+    deltas = [TransactionDelta(u.id, "Shopping", date(2025, 6, 10), Decimal("9.00")) for u in users]
+    deltas.append(TransactionDelta(users[0].id, "Shopping", date(2025, 6, 11), Decimal("-2.00")))
+
+    with CaptureQueriesContext(connection) as ctx:
+        alerts = apply_sync_deltas(deltas)
+
+    assert len(alerts) == 5
+    assert not BudgetPeriod.objects.filter(budget__category="Travel").exists()
+    # Query count is independent of the number of budgets
+    assert len(ctx.captured_queries) <= 8
+
+
+@pytest.mark.django_db
+def test_pending_rows_count_once_when_posted(user):
+    Budget.objects.create(user=user, category="Food and Drink", limit=Decimal("100.00"))
+    pending = save_txn(user, "p1", "40.00")
+    Transaction.objects.filter(pk=pending.pk).update(pending=True)
+    pending.refresh_from_db()
+
+    assert apply_sync_deltas([TransactionDelta.from_transaction(pending)]) == []
+    assert not BudgetPeriod.objects.exists()
+
+    posted = save_txn(user, "s1", "40.00")
+    Transaction.objects.filter(pk=pending.pk).update(duplicate_of=posted.transaction_id)
+    pending.refresh_from_db()
+    apply_sync_deltas([TransactionDelta.from_transaction(pending), TransactionDelta.from_transaction(posted)])
+
+    # Same total whether the period was seeded or kept running
+    assert BudgetPeriod.objects.get().spent == Decimal("40.00")
+    another = save_txn(user, "s2", "10.00")
+    apply_sync_deltas([TransactionDelta.from_transaction(another)])
+    assert BudgetPeriod.objects.get().spent == Decimal("50.00")
+
+
+@pytest.mark.django_db
+def test_concurrently_created_period_is_recounted(user, monkeypatch):
+    budget = Budget.objects.create(user=user, category="Food and Drink", limit=Decimal("100.00"))
+    txn = save_txn(user, "t1", "30.00")
+    seed_totals = budgets._seed_totals
+
+    def seed_while_another_sync_inserts(keys, budget_map):
+        totals = seed_totals(keys, budget_map)
+        if not BudgetPeriod.objects.exists():
+            # The other sync saw an older snapshot without "t1"
+            BudgetPeriod.objects.create(budget=budget, period_start=date(2025, 6, 1), spent=Decimal("5.00"))
+        return totals
+
+    monkeypatch.setattr(budgets, "_seed_totals", seed_while_another_sync_inserts)
+    apply_sync_deltas([TransactionDelta.from_transaction(txn)])
+
+    assert BudgetPeriod.objects.get().spent == Decimal("30.00")
@@ -0,0 +1,89 @@
+"""
+Tests for the Streamlit dashboard data layer
+tests/test_dashboard_data.py
+"""
+
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pandas as pd
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from finance.models import Account, Transaction
+from streamlit_app import data
+
+
+@pytest.fixture
+def synced_user(user_factory):
+    user = user_factory(last_plaid_sync=datetime(2025, 6, 30, tzinfo=timezone.utc))
+    account = Account.objects.create(
+        user=user, account_id="acc-1", name="Checking", type="depository",
+        current_balance=Decimal("1500.50"),
+    )
+    rows = [
+        ("t1", date(2025, 6, 2), "12.50", "Coffee", "Food and Drink", False),
+        ("t2", date(2025, 6, 2), "80.00", "Amazon", "Shopping", False),
+        ("t3", date(2025, 6, 16), "-1500.00", "Payroll", "", False),
+        ("t4", date(2025, 6, 20), "40.00", "Amazon", "Shopping", True),
+    ]
+    for txn_id, day, amount, merchant, category, pending in rows:
+        Transaction.objects.create(
+            user=user, account=account, transaction_id=txn_id, date=day, amount=Decimal(amount),
+            name=merchant.upper(), merchant_name=merchant, category=category, pending=pending,
+        )
+    return user
+
+
+@pytest.mark.django_db
+def test_frames_are_arrow_backed_and_aggregated(synced_user):
+    frames = data.aggregate_frames(data.fetch_frames(str(synced_user.id)))
+
+    assert isinstance(frames["daily"]["spent"].dtype, pd.ArrowDtype)
+    assert frames["accounts"]["current_balance"].tolist() == [1500.50]
+
+    daily = frames["daily"]
+    assert len(daily) == 3  # pending transaction excluded
+    assert data.spend_by_category(daily)["spent"].to_dict() == {
+        "Shopping": 80.0, "Food and Drink": 12.5, "Uncategorized": 0.0,
+    }
+    june_2 = data.filter_daily(daily, date(2025, 6, 1), date(2025, 6, 7))
+    assert june_2["spent"].sum() == 92.5
+    assert data.spend_over_time(daily, "M")["income"].tolist() == [1500.0]
+    assert frames["recent"]["transaction_id"].iloc[0] == "t4"
+
+
+@pytest.mark.django_db
+def test_dashboard_cache_keyed_by_sync_version(synced_user):
+    data.load_dashboard_data.clear()
+    user_id = str(synced_user.id)
+    version = data.sync_version(user_id)
+
+    data.load_dashboard_data(user_id, version)
+    with CaptureQueriesContext(connection) as ctx:
+        data.load_dashboard_data(user_id, version)
+    assert len(ctx.captured_queries) == 0
+
+    synced_user.last_plaid_sync = datetime(2025, 7, 1, tzinfo=timezone.utc)
+    synced_user.save()
+    new_version = data.sync_version(user_id)
+    assert new_version != version
+
+    with CaptureQueriesContext(connection) as ctx:
+        data.load_dashboard_data(user_id, new_version)
+    assert len(ctx.captured_queries) == 2
+
+
+def test_weekly_spend_uses_monday_to_sunday_weeks():
+    daily = pd.DataFrame({
+        "date": [date(2025, 6, 1), date(2025, 6, 2), date(2025, 6, 8)],
+        "spent": [10.0, 20.0, 5.0],
+        "income": [0.0, 0.0, 0.0],
+    })
+
+    weekly = data.spend_over_time(daily, "W")
+
+    # Sunday Jun 1 closes the week of May 26; Monday Jun 2 opens a new one through Sunday Jun 8
+    assert weekly.index.date.tolist() == [date(2025, 5, 26), date(2025, 6, 2)]
+    assert weekly["spent"].tolist() == [10.0, 25.0]
@@ -0,0 +1,104 @@
+"""
+Tests for primary/replica database routing
+tests/test_db_routing.py
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+
+from django.utils import timezone
+
+from backend.routers import PrimaryReplicaRouter, read_replica
+from backend.models import User
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def router(settings):
+    settings.DATABASE_REPLICAS = ["replica_1", "replica_2"]
+    return PrimaryReplicaRouter()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_reads_use_replica_only_when_opted_in(router):
+    assert router.db_for_read(User) is None
+    with read_replica():
+        assert router.db_for_read(User) in {"replica_1", "replica_2"}
+        assert router.db_for_write(User) == "default"
+    assert router.db_for_read(User) is None
+
+
+@pytest.mark.django_db(transaction=True)
+def test_recently_synced_user_reads_from_primary(router, settings, user_factory):
+    settings.REPLICA_STICKY_SECONDS = 30
+    synced = user_factory(last_plaid_sync=timezone.now())
+    earlier = user_factory(
+        email="earlier@example.com", username="earlier",
+        last_plaid_sync=timezone.now() - timedelta(seconds=60),
+    )
+    with read_replica(user_id=synced.id):
+        assert router.db_for_read(User) is None
+    with read_replica(user_id=earlier.id):
+        assert router.db_for_read(User) in {"replica_1", "replica_2"}
+
+
+def test_only_primary_is_migrated(router):
+    assert router.allow_migrate("default", "finance")
+    assert not router.allow_migrate("replica_1", "finance")
+
+
+SYNC_SCRIPT = """
+import django
+django.setup()
+from django.utils import timezone
+from backend.models import User
+
+User.objects.create_user(username="fresh", email="fresh@example.com", password="x", last_plaid_sync=timezone.now())
+"""
+
+READ_SCRIPT = """
+import django
+django.setup()
+from backend.models import User
+from backend.routers import read_replica
+
+user = User.objects.get(email="fresh@example.com")
+with read_replica():
+    print("replica", User.objects.filter(email="fresh@example.com").exists())
+with read_replica(user_id=user.id):
+    print("sticky", User.objects.filter(email="fresh@example.com").exists())
+"""
+
+
+def test_two_sqlite_files_stand_in_for_primary_and_replica(tmp_path):
+    """
+    The replica file is a stale copy of the primary, i.e. maximal lag. The
+    sync and the read run in separate processes, like a backfill worker and
+    an API worker.
+    """
+    env = dict(
+        os.environ,
+        DJANGO_SETTINGS_MODULE="config.settings",
+        DB_NAME=str(tmp_path / "primary.sqlite3"),
+        DB_REPLICAS=str(tmp_path / "replica.sqlite3"),
+    )
+
+    def run(*args):
+        return subprocess.run(
+            [sys.executable, *args], cwd=PROJECT_ROOT, env=env,
+            capture_output=True, text=True, check=True,
+        ).stdout
+
+    run("manage.py", "migrate", "--run-syncdb", "--verbosity", "0")
+    shutil.copy(tmp_path / "primary.sqlite3", tmp_path / "replica.sqlite3")
+
+    run("-c", SYNC_SCRIPT)
+    output = run("-c", READ_SCRIPT).split()
+    assert output == ["replica", "False", "sticky", "True"]
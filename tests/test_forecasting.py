@@ -0,0 +1,213 @@
+"""
+Tests for cash-flow forecasting
+tests/test_forecasting.py
+"""
+
+import os
+import subprocess
+import sys
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from backend import backfill
+from backend.forecasting import forecast_users, get_forecast, refresh_forecasts
+from finance.models import Account, BackfillJob, CashForecast, Transaction
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+TODAY = date(2025, 6, 30)
+
+
+@pytest.fixture
+def household(user_factory):
+    """Checking with rent, biweekly pay and groceries; a card with a subscription."""
+    user = user_factory()
+    checking = Account.objects.create(
+        user=user, account_id="chk", name="Checking", type="depository", current_balance=Decimal("3000.00"),
+    )
+    card = Account.objects.create(
+        user=user, account_id="card", name="Card", type="credit", current_balance=Decimal("100.00"),
+    )
+    rows = []
+    for month in (3, 4, 5, 6):
+        rows.append((checking, date(2025, month, 1), "1500.00", "Payment", "Rent"))
+        rows.append((card, date(2025, month, 12), "15.00", "Service", "Netflix"))
+    for payday in range(6):
+        rows.append((checking, date(2025, 6, 27) - timedelta(days=14 * payday), "-2000.00", "Transfer", "Acme Payroll"))
+    # Groceries at $20 every other day over the last 180 days, i.e. $10/day
+    for offset in range(1, 181, 2):
+        rows.append((checking, TODAY - timedelta(days=offset), "20.00", "Shops", "Market"))
+    Transaction.objects.bulk_create([
+        Transaction(
+            user=user, account=account, transaction_id=f"t{position}", date=day,
+            amount=Decimal(amount), name=merchant.upper(), merchant_name=merchant, category=category,
+        )
+        for position, (account, day, amount, category, merchant) in enumerate(rows)
+    ])
+    return user
+
+
+def forecast(user):
+    return forecast_users([(user.id, user.last_plaid_sync)], today=TODAY)[user.id]
+
+
+@pytest.mark.django_db
+def test_recurring_series_are_detected_and_projected(household):
+    result = forecast(household)
+
+    recurring = {item["merchant"]: item for item in result["recurring"]}
+    assert set(recurring) == {"Rent", "Netflix", "Acme Payroll"}
+    assert (recurring["Rent"]["cadence"], recurring["Rent"]["next_date"], recurring["Rent"]["amount"]) == (
+        "monthly", date(2025, 7, 1), 1500.0,
+    )
+    assert (recurring["Acme Payroll"]["cadence"], recurring["Acme Payroll"]["next_date"]) == (
+        "biweekly", date(2025, 7, 11),
+    )
+    assert recurring["Netflix"]["next_date"] == date(2025, 7, 12)
+    # Groceries are no single recurring merchant; they become the category average
+    assert result["average_daily_spend"] == {"Shops": 10.0}
+
+
+@pytest.mark.django_db
+def test_balances_are_projected_day_by_day(household):
+    result = forecast(household)
+    checking, card = sorted(result["accounts"], key=lambda account: account["name"], reverse=True)
+
+    assert len(result["series"]) == 90 and result["series"][0]["date"] == date(2025, 7, 1)
+    # Jul 1: rent and a day of groceries
+    assert checking["balances"][0] == 3000 - 1500 - 10
+    # Jul 11 (day 11): payroll lands
+    assert checking["balances"][10] == 3000 - 1500 - 110 + 2000
+    # Card balances grow with charges
+    assert card["balances"][11] == 115.0
+    assert result["series"][11]["balance"] == checking["balances"][11] - card["balances"][11]
+
+
+@pytest.mark.django_db
+def test_get_forecast_answers_from_storage_until_next_sync(household):
+    first = get_forecast(household, today=TODAY)
+
+    with CaptureQueriesContext(connection) as queries:
+        assert get_forecast(household, today=TODAY) == first
+    assert len(queries.captured_queries) == 1
+
+    household.last_plaid_sync = timezone.now()
+    with CaptureQueriesContext(connection) as queries:
+        refreshed = get_forecast(household, today=TODAY)
+    # Stored row, accounts, transactions, upsert
+    assert len(queries.captured_queries) == 4
+    assert refreshed["sync_version"] == household.last_plaid_sync.isoformat()
+    assert CashForecast.objects.get(user=household).sync_version == refreshed["sync_version"]
+
+    with CaptureQueriesContext(connection) as queries:
+        assert get_forecast(household, today=TODAY + timedelta(days=1))["generated_on"] == TODAY + timedelta(days=1)
+    assert len(queries.captured_queries) == 4
+
+
+@pytest.mark.django_db
+def test_backfill_invalidates_cached_forecast(household):
+    get_forecast(household, today=TODAY)
+    household.plaid_access_token = "access-sandbox-test"
+    household.plaid_item_id = "item-test"
+    household.save()
+    job = backfill.enqueue_backfill(household, household.plaid_item_id, months=1, today=TODAY)
+
+    backfill.run_job(backfill.claim_next_job())
+
+    job.refresh_from_db()
+    assert job.status == BackfillJob.STATUS_COMPLETED
+    assert not CashForecast.objects.filter(user=household).exists()
+
+
+@pytest.mark.django_db
+def test_nightly_batch_forecasts_all_users_in_chunks(synthetic_data):
+    with CaptureQueriesContext(connection) as queries:
+        assert refresh_forecasts(today=synthetic_data.end, batch_users=2) == synthetic_data.users
+    # One user listing plus accounts, transactions and an upsert per chunk of two users
+    assert len(queries.captured_queries) == 1 + 2 * 3
+
+    for user in get_user_model().objects.all():
+        stored = get_forecast(user, today=synthetic_data.end)
+        assert len(stored["accounts"]) == synthetic_data.accounts_per_item
+        merchants = {item["merchant"]: item["cadence"] for item in stored["recurring"]}
+        assert merchants.get("Acme Corp Payroll") == "biweekly"
+        assert {cadence for cadence in merchants.values()} <= {"weekly", "biweekly", "monthly"}
+
+
+@pytest.mark.django_db
+def test_forecast_endpoint(household, monkeypatch):
+    monkeypatch.setattr(timezone, "localdate", lambda *args, **kwargs: TODAY)
+    client = APIClient()
+    client.force_authenticate(user=household)
+    refresh_forecasts()
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get("/api/forecast/", {"days": 10})
+    assert response.status_code == 200
+    assert len(queries.captured_queries) == 1
+    assert len(response.data["series"]) == 10
+    assert all(len(account["balances"]) == 10 for account in response.data["accounts"])
+    assert [item["merchant"] for item in response.data["recurring"]] == ["Rent"]
+
+    assert client.get("/api/forecast/", {"days": 91}).status_code == 400
+    assert client.get("/api/forecast/", {"days": "soon"}).status_code == 400
+
+
+REFRESH_SCRIPT = """
+import django
+django.setup()
+from datetime import date
+from decimal import Decimal
+from backend.forecasting import refresh_forecasts
+from backend.models import User
+from finance.models import Account, Transaction
+
+user = User.objects.create_user(username="batch", email="batch@example.com", password="x")
+account = Account.objects.create(
+    user=user, account_id="chk", name="Checking", type="depository", current_balance=Decimal("1000.00"),
+)
+for month in (3, 4, 5, 6):
+    Transaction.objects.create(
+        user=user, account=account, transaction_id=f"rent-{month}", date=date(2025, month, 1),
+        amount=Decimal("500.00"), name="RENT", merchant_name="Rent",
+    )
+print(refresh_forecasts(today=date(2025, 6, 30)))
+"""
+
+READ_SCRIPT = """
+import django
+django.setup()
+from datetime import date
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from backend.forecasting import get_forecast
+from backend.models import User
+
+user = User.objects.get(email="batch@example.com")
+with CaptureQueriesContext(connection) as queries:
+    forecast = get_forecast(user, today=date(2025, 6, 30))
+print(len(queries.captured_queries), forecast["series"][0]["balance"], forecast["recurring"][0]["next_date"])
+"""
+
+
+def test_batch_forecasts_are_read_by_other_processes(tmp_path):
+    """The nightly batch and an API worker are separate processes sharing only the database."""
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE="config.settings", DB_NAME=str(tmp_path / "db.sqlite3"))
+
+    def run(*args):
+        return subprocess.run(
+            [sys.executable, *args], cwd=PROJECT_ROOT, env=env,
+            capture_output=True, text=True, check=True,
+        ).stdout
+
+    run("manage.py", "migrate", "--run-syncdb", "--verbosity", "0")
+    assert run("-c", REFRESH_SCRIPT).split() == ["1"]
+    # Answered by the stored row alone: no recompute in the reading process
+    assert run("-c", READ_SCRIPT).split() == ["1", "500.0", "2025-07-01"]
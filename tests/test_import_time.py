@@ -0,0 +1,68 @@
+"""
+Import-time budget for worker boot
+tests/test_import_time.py
+
+Workers are started by the autoscaler under load, so boot time is
+user-facing latency. These tests run ``python -X importtime`` in a fresh
+interpreter and fail if ``config.wsgi`` exceeds WSGI_IMPORT_BUDGET_MS or if
+the Plaid SDK or NumPy is imported before it is actually used.
+"""
+
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+from django.conf import settings
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$")
+
+# Boot a worker and load the URLconf, as the first request would
+BOOT_SCRIPT = (
+    "import config.wsgi\n"
+    "from django.urls import get_resolver\n"
+    "get_resolver().url_patterns\n"
+)
+
+
+def run_importtime(script: str) -> dict:
+    """Return {module: cumulative microseconds} for a fresh interpreter."""
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE="config.settings")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            cumulative[match.group(4)] = int(match.group(2))
+    return cumulative
+
+
+def test_worker_boot_does_not_import_plaid_sdk():
+    modules = run_importtime(BOOT_SCRIPT)
+    assert "finance.views" in modules
+    assert not [name for name in modules if name == "plaid" or name.startswith("plaid.")]
+
+
+def test_worker_boot_does_not_import_numpy():
+    modules = run_importtime(BOOT_SCRIPT)
+    assert "finance.views" in modules
+    assert not [name for name in modules if name == "numpy" or name.startswith("numpy.")]
+
+
+def test_wsgi_import_within_budget():
+    modules = run_importtime("import config.wsgi")
+    total_ms = modules["config.wsgi"] / 1000
+    slowest = sorted(
+        ((us, name) for name, us in modules.items() if "." not in name),
+        reverse=True,
+    )[:10]
+    assert total_ms <= settings.WSGI_IMPORT_BUDGET_MS, (
+        f"config.wsgi took {total_ms:.0f}ms (budget {settings.WSGI_IMPORT_BUDGET_MS}ms); "
+        "slowest top-level imports: "
+        + ", ".join(f"{name}={us / 1000:.0f}ms" for us, name in slowest)
+    )
@@ -0,0 +1,76 @@
+"""
+Tests for merchant name normalization
+tests/test_merchants.py
+"""
+
+import time
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from backend.merchants import MerchantNormalizer, canonicalize
+from finance.models import MerchantAlias
+
+
+@pytest.mark.parametrize("descriptor,expected", [
+    ("SQ *COFFEE 1234 SEATTLE", "Coffee"),
+    ("AMZN Mktp US*2K4AB1", "Amazon"),
+    ("NETFLIX.COM 866-579-7172 CA", "Netflix"),
+    ("POS DEBIT STARBUCKS STORE #12345", "Starbucks"),
+    ("TST* JOES DINER 00123 PORTLAND OR", "Joes Diner"),
+    ("CHECKCARD 0102 SHELL OIL 57444", "Shell Oil"),
+    ("", "Unknown"),
+])
+def test_canonicalize(descriptor, expected):
+    assert canonicalize(descriptor) == expected
+
+
+@pytest.mark.django_db
+def test_normalize_batch_persists_and_memoizes():
+    normalizer = MerchantNormalizer()
+    descriptors = ["SQ *COFFEE 1234 SEATTLE", "SQ *COFFEE 1234 SEATTLE", "AMZN Mktp US*XYZ"]
+
+    result = normalizer.normalize_batch(descriptors)
+
+    assert result == {"SQ *COFFEE 1234 SEATTLE": "Coffee", "AMZN Mktp US*XYZ": "Amazon"}
+    assert MerchantAlias.objects.count() == 2
+
+    # Second pass is served entirely from the memo
+    with CaptureQueriesContext(connection) as ctx:
+        normalizer.normalize_batch(descriptors)
+    assert len(ctx.captured_queries) == 0
+
+
+@pytest.mark.django_db
+def test_stored_alias_overrides_pipeline():
+    MerchantAlias.objects.create(descriptor="SQ *BLUE BOTTLE 99", merchant_name="Blue Bottle Coffee")
+    normalizer = MerchantNormalizer()
+
+    txns = [{"name": "SQ *BLUE BOTTLE 99"}, {"name": "SQ *COFFEE 1234 SEATTLE"}]
+    normalizer.normalize_transactions(txns)
+
+    assert [t["merchant_name"] for t in txns] == ["Blue Bottle Coffee", "Coffee"]
+
+
+@pytest.mark.django_db
+def test_invalidate_picks_up_corrections():
+    normalizer = MerchantNormalizer()
+    assert normalizer.normalize("PAYPAL *STEAMGAMES") == "Steamgames"
+
+    MerchantAlias.objects.filter(descriptor="PAYPAL *STEAMGAMES").update(merchant_name="Steam")
+    assert normalizer.normalize("PAYPAL *STEAMGAMES") == "Steamgames"
+
+    normalizer.invalidate(["PAYPAL *STEAMGAMES"])
+    assert normalizer.normalize("PAYPAL *STEAMGAMES") == "Steam"
+
+
+@pytest.mark.django_db
+def test_memo_entries_expire_so_other_workers_pick_up_corrections():
+    normalizer = MerchantNormalizer(memo_ttl=0.05)
+    assert normalizer.normalize("PAYPAL *STEAMGAMES") == "Steamgames"
+
+    MerchantAlias.objects.filter(descriptor="PAYPAL *STEAMGAMES").update(merchant_name="Steam")
+    time.sleep(0.1)
+
+    assert normalizer.normalize("PAYPAL *STEAMGAMES") == "Steam"
@@ -0,0 +1,159 @@
+"""
+Tests for batched notification dispatch
+tests/test_notifications.py
+"""
+
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from django.core import mail
+from django.core.mail import get_connection
+
+from backend import notifications
+from backend.notifications import NotificationDispatcher, enqueue_report_ready
+from finance.models import Notification, Report
+
+# 15:00 UTC is inside the default 8-20 window for UTC and New York, not Tokyo
+NOW = datetime(2025, 6, 9, 15, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def queued(user_factory):
+    def make(index, **user_fields):
+        user = user_factory(email=f"user{index}@example.com", username=f"user{index}", **user_fields)
+        report = Report.objects.create(
+            user=user, period="weekly", period_start=date(2025, 6, 2),
+            period_end=date(2025, 6, 8), content_hash="x" * 64,
+        )
+        enqueue_report_ready([report])
+        return user
+    return make
+
+
+class CountingConnections:
+    """Wraps get_connection to count how many connections were opened."""
+
+    def __init__(self):
+        self.opened = 0
+
+    def __call__(self, **kwargs):
+        self.opened += 1
+        return get_connection(**kwargs)
+
+
+@pytest.mark.django_db
+def test_dispatch_reuses_one_connection_per_batch(queued):
+    for i in range(7):
+        queued(i)
+    factory = CountingConnections()
+
+    result = NotificationDispatcher(batch_size=3, connection_factory=factory).dispatch(now=NOW)
+
+    assert result.sent == 7
+    assert factory.opened == 3
+    assert len(mail.outbox) == 7
+    assert Notification.objects.filter(status=Notification.STATUS_SENT).count() == 7
+
+
+@pytest.mark.django_db
+def test_dispatch_filters_preferences_and_timezone(queued):
+    queued(1, timezone="America/New_York")
+    queued(2, timezone="Asia/Tokyo")
+    queued(3, notification_preferences={"email": False})
+    queued(4, notification_preferences={"report_ready": False})
+    queued(5, notification_preferences={"report_ready": True})
+
+    result = NotificationDispatcher().dispatch(now=NOW)
+
+    assert (result.sent, result.skipped, result.deferred) == (2, 2, 1)
+    assert sorted(m.to[0] for m in mail.outbox) == ["user1@example.com", "user5@example.com"]
+    assert Notification.objects.get(user__email="user2@example.com").status == Notification.STATUS_PENDING
+
+
+@pytest.mark.django_db
+def test_dispatch_retries_failed_messages(queued):
+    queued(1)
+    queued(2)
+    failures = {"user2@example.com": 1}
+
+    class FlakyBackend:
+        def __init__(self, **kwargs):
+            pass
+
+        def open(self):
+            pass
+
+        def close(self):
+            pass
+
+        def send_messages(self, messages):
+            recipient = messages[0].to[0]
+            if failures.get(recipient):
+                failures[recipient] -= 1
+                raise OSError("temporary failure")
+            return len(messages)
+
+    result = NotificationDispatcher(retry_delay=0, connection_factory=FlakyBackend).dispatch(now=NOW)
+    assert (result.sent, result.failed, result.retried) == (2, 0, 1)
+
+    queued(3)
+    result = NotificationDispatcher(
+        retry_delay=0, max_attempts=2,
+        connection_factory=lambda **kw: (_ for _ in ()).throw(OSError("smtp down")),
+    ).dispatch(now=NOW)
+    failed = Notification.objects.get(user__email="user3@example.com")
+    assert result.failed == 1
+    assert (failed.status, failed.attempts, failed.last_error) == (Notification.STATUS_FAILED, 2, "smtp down")
+
+
+@pytest.mark.django_db
+def test_overlapping_runs_do_not_send_twice(queued, monkeypatch):
+    for i in range(4):
+        queued(i)
+    build_message = notifications.build_message
+    overlapping = []
+
+    def build_during_second_run(notification):
+        # The first run has claimed its rows; a second run starts right now
+        if not overlapping:
+            overlapping.append(None)
+            overlapping[0] = NotificationDispatcher().dispatch(now=NOW)
+        return build_message(notification)
+
+    monkeypatch.setattr(notifications, "build_message", build_during_second_run)
+    result = NotificationDispatcher().dispatch(now=NOW)
+
+    assert (result.sent, overlapping[0].sent) == (4, 0)
+    assert sorted(m.to[0] for m in mail.outbox) == [f"user{i}@example.com" for i in range(4)]
+
+
+@pytest.mark.django_db
+def test_stale_claims_are_sent_again(queued, settings):
+    settings.NOTIFICATION_CLAIM_STALE_SECONDS = 600
+    queued(1)
+    Notification.objects.update(
+        status=Notification.STATUS_SENDING, claimed_at=NOW - timedelta(seconds=60),
+    )
+
+    assert NotificationDispatcher().dispatch(now=NOW).sent == 0
+
+    result = NotificationDispatcher().dispatch(now=NOW + timedelta(seconds=600))
+    assert result.sent == 1
+    assert Notification.objects.get().status == Notification.STATUS_SENT
+
+
+@pytest.mark.django_db
+def test_unbuildable_notification_fails_alone(queued):
+    queued(1)
+    broken = queued(2)
+    Notification.objects.filter(user=broken).update(report=None)
+
+    result = NotificationDispatcher().dispatch(now=NOW)
+
+    assert (result.sent, result.failed) == (1, 1)
+    assert [m.to[0] for m in mail.outbox] == ["user1@example.com"]
+    failed = Notification.objects.get(user=broken)
+    assert failed.status == Notification.STATUS_FAILED
+    assert failed.last_error.startswith("Could not build message")
+    # The next run does not pick it up again
+    assert NotificationDispatcher().dispatch(now=NOW).failed == 0
@@ -0,0 +1,84 @@
+"""
+Tests for timezone-aware period bucketing
+tests/test_periods.py
+"""
+
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from backend.periods import bucketed_totals
+from finance.models import Account, Transaction
+
+
+def add_txn(user, txn_id, day, amount, authorized_at=None):
+    account, _ = Account.objects.get_or_create(
+        account_id=f"acc-{user.username}", defaults={"user": user, "name": "Checking", "type": "depository"},
+    )
+    Transaction.objects.create(
+        user=user, account=account, transaction_id=txn_id, date=day,
+        authorized_at=authorized_at, amount=Decimal(amount), name="TEST",
+    )
+
+
+@pytest.mark.django_db
+def test_weekly_buckets_use_local_time(user_factory):
+    la = user_factory(email="la@example.com", username="la", timezone="America/Los_Angeles")
+    utc = user_factory(email="utc@example.com", username="utc")
+
+    # Monday 03:00 UTC is still Sunday evening in Los Angeles
+    moment = datetime(2025, 6, 2, 3, 0, tzinfo=timezone.utc)
+    add_txn(la, "la-1", date(2025, 6, 2), "10.00", authorized_at=moment)
+    add_txn(utc, "utc-1", date(2025, 6, 2), "10.00", authorized_at=moment)
+    add_txn(la, "la-2", date(2025, 6, 4), "-50.00")
+
+    totals = bucketed_totals("weekly", date(2025, 5, 1), date(2025, 6, 30))
+
+    assert [(b["bucket"], b["spent"], b["income"]) for b in totals[la.id]] == [
+        (date(2025, 5, 26), Decimal("10.00"), 0),
+        (date(2025, 6, 2), 0, Decimal("50.00")),
+    ]
+    assert [b["bucket"] for b in totals[utc.id]] == [date(2025, 6, 2)]
+
+
+@pytest.mark.django_db
+def test_monthly_buckets_group_users_by_zone(user_factory):
+    users = [
+        user_factory(email=f"ny{i}@example.com", username=f"ny{i}", timezone="America/New_York")
+        for i in range(3)
+    ]
+    for i, user in enumerate(users):
+        add_txn(user, f"ny-{i}", date(2025, 7, 1), "5.00",
+                authorized_at=datetime(2025, 7, 1, 2, 0, tzinfo=timezone.utc))
+    user_factory(email="tokyo@example.com", username="tokyo", timezone="Asia/Tokyo")
+
+    with CaptureQueriesContext(connection) as ctx:
+        totals = bucketed_totals("monthly", date(2025, 6, 1), date(2025, 7, 31))
+
+    # One query for the distinct zones plus one per zone
+    assert len(ctx.captured_queries) == 3
+    assert {user.id: totals[user.id][0]["bucket"] for user in users} == {
+        user.id: date(2025, 6, 1) for user in users
+    }
+
+
+@pytest.mark.django_db
+def test_range_is_applied_to_local_dates(user_factory):
+    la = user_factory(email="la@example.com", username="la", timezone="America/Los_Angeles")
+    # Still May 31 in Los Angeles: outside June
+    add_txn(la, "may", date(2025, 6, 1), "10.00", authorized_at=datetime(2025, 6, 1, 3, 0, tzinfo=timezone.utc))
+    # Late on June 30 locally; the bank already dated it July 1
+    add_txn(la, "june", date(2025, 7, 1), "20.00", authorized_at=datetime(2025, 7, 1, 5, 0, tzinfo=timezone.utc))
+    add_txn(la, "july", date(2025, 7, 1), "40.00")
+
+    totals = bucketed_totals("monthly", date(2025, 6, 1), date(2025, 6, 30))
+
+    assert [(b["bucket"], b["spent"]) for b in totals[la.id]] == [(date(2025, 6, 1), Decimal("20.00"))]
+
+
+def test_unknown_period_rejected():
+    with pytest.raises(ValueError):
+        bucketed_totals("yearly", date(2025, 1, 1), date(2025, 12, 31))
@@ -20,9 +20,29 @@ def test_plaid_mock_endpoints(user_factory):
     # 2. Exchange public token
     res = client.post("/api/plaid/exchange-token/", {"public_token": "test123"})
     assert res.status_code == 200
-    assert "access_token" in res.data
+    assert "item_id" in res.data
+    assert "access_token" not in res.data
 
     # 3. Get mock accounts
     res = client.get("/api/plaid/accounts/")
     assert res.status_code == 200
     assert "accounts" in res.data
+
+
+@pytest.mark.parametrize("environment,credentials,expected", [
+    ("mock", ("id", "secret"), "MockPlaidClient"),
+    ("sandbox", ("", ""), "MockPlaidClient"),
+    ("sandbox", ("id", "secret"), "PlaidClient"),
+])
+def test_plaid_client_factory(settings, environment, credentials, expected):
+    from backend.plaid_client import get_plaid_client, reset_plaid_client
+
+    settings.PLAID_ENVIRONMENT = environment
+    settings.PLAID_CLIENT_ID, settings.PLAID_SECRET = credentials
+    reset_plaid_client()
+    try:
+        client = get_plaid_client()
+        assert type(client).__name__ == expected
+        assert get_plaid_client() is client
+    finally:
+        reset_plaid_client()
@@ -0,0 +1,106 @@
+"""
+Tests for pending-to-posted reconciliation
+tests/test_reconciliation.py
+"""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from backend.reconciliation import match_pending, reconcile_transactions
+from finance.models import Account, Transaction
+
+
+def txn(transaction_id, amount, day, merchant="Chipotle", account_id="acc-1", pending=False, linked=None):
+    return {
+        "transaction_id": transaction_id,
+        "account_id": account_id,
+        "merchant_name": merchant,
+        "name": merchant.upper(),
+        "amount": amount,
+        "date": day,
+        "pending": pending,
+        "pending_transaction_id": linked,
+    }
+
+
+def test_match_pending_pairs_settled_authorizations():
+    pending = [
+        txn("p-tip", 20.00, date(2025, 6, 1), pending=True),
+        txn("p-other-account", 12.00, date(2025, 6, 1), account_id="acc-2", pending=True),
+        txn("p-too-old", 9.00, date(2025, 5, 1), merchant="Uber", pending=True),
+        txn("p-refund", -15.00, date(2025, 6, 1), merchant="Target", pending=True),
+    ]
+    posted = [
+        txn("s-tip", 24.00, date(2025, 6, 3)),
+        txn("s-wrong-account", 12.00, date(2025, 6, 2)),
+        txn("s-too-old", 9.00, date(2025, 6, 1), merchant="Uber"),
+        txn("s-debit", 15.00, date(2025, 6, 2), merchant="Target"),
+    ]
+
+    assert match_pending(pending, posted) == {"p-tip": "s-tip"}
+
+
+def test_match_pending_prefers_plaid_link_then_closest_amount():
+    pending = [
+        txn("p-small", 10.00, date(2025, 6, 1), pending=True),
+        txn("p-large", 11.00, date(2025, 6, 1), pending=True),
+        txn("p-linked", 10.50, date(2025, 6, 1), pending=True),
+    ]
+    posted = [
+        txn("s-1", 11.00, date(2025, 6, 2)),
+        txn("s-2", 10.00, date(2025, 6, 3), linked="p-linked"),
+        txn("s-3", 10.10, date(2025, 6, 4)),
+    ]
+
+    assert match_pending(pending, posted) == {"p-linked": "s-2", "p-large": "s-1", "p-small": "s-3"}
+
+
+def test_match_pending_at_the_tolerance_boundary():
+    # 11.05 is within 25% of 45.50, and the log1p gap is wider than log(1.25)
+    pending = [txn("p-tip", 34.45, date(2025, 6, 1), pending=True)]
+    posted = [txn("s-tip", 45.50, date(2025, 6, 2))]
+
+    assert match_pending(pending, posted) == {"p-tip": "s-tip"}
+
+
+@pytest.mark.django_db
+def test_reconcile_flags_stored_pending_and_is_idempotent(user_factory):
+    user = user_factory()
+    account = Account.objects.create(user=user, account_id="acc-1", name="Checking", type="depository")
+    stored = Transaction.objects.create(
+        user=user, account=account, transaction_id="p-1", date=date(2025, 6, 1),
+        amount=Decimal("40.00"), name="CHIPOTLE 123", merchant_name="Chipotle", pending=True,
+    )
+
+    batch = [txn("s-1", 46.50, date(2025, 6, 4)), txn("s-unrelated", 8.00, date(2025, 6, 4), merchant="Uber")]
+    assert reconcile_transactions(user, batch) == 1
+
+    stored.refresh_from_db()
+    assert stored.duplicate_of == "s-1"
+    assert batch[0]["pending_transaction_id"] == "p-1"
+    assert batch[1]["pending_transaction_id"] is None
+
+    rerun = [txn("s-1", 46.50, date(2025, 6, 4))]
+    assert reconcile_transactions(user, rerun) == 1
+    assert rerun[0]["pending_transaction_id"] == "p-1"
+    stored.refresh_from_db()
+    assert stored.duplicate_of == "s-1"
+
+
+@pytest.mark.django_db
+def test_reconcile_links_stored_posted_to_late_pending(user_factory):
+    user = user_factory()
+    account = Account.objects.create(user=user, account_id="acc-1", name="Checking", type="depository")
+    posted = Transaction.objects.create(
+        user=user, account=account, transaction_id="s-1", date=date(2025, 6, 4),
+        amount=Decimal("40.00"), name="CHIPOTLE 123", merchant_name="Chipotle",
+    )
+
+    batch = [txn("p-1", 40.00, date(2025, 6, 2), pending=True)]
+    reconcile_transactions(user, batch)
+
+    assert batch[0]["duplicate_of"] == "s-1"
+    posted.refresh_from_db()
+    assert posted.pending_transaction_id == "p-1"
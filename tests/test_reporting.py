@@ -0,0 +1,122 @@
+"""
+Tests for report generation
+tests/test_reporting.py
+"""
+
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pytest
+
+from backend.reporting import generate_reports, period_bounds, render_pdf
+from finance.models import Account, Notification, Report, Transaction
+
+
+@pytest.fixture
+def reports_root(settings, tmp_path):
+    settings.REPORTS_ROOT = tmp_path
+    return tmp_path
+
+
+@pytest.fixture
+def spending_user(user_factory):
+    user = user_factory()
+    account = Account.objects.create(user=user, account_id="acc-1", name="Checking", type="depository")
+    rows = [
+        ("t1", date(2025, 6, 2), "12.50", "Coffee", "Food and Drink"),
+        ("t2", date(2025, 6, 3), "80.00", "Amazon", "Shopping"),
+        ("t3", date(2025, 6, 5), "-1500.00", "Payroll", "Income"),
+        ("t4", date(2025, 6, 9), "99.00", "Amazon", "Shopping"),  # next week
+    ]
+    for txn_id, day, amount, merchant, category in rows:
+        Transaction.objects.create(
+            user=user, account=account, transaction_id=txn_id, date=day,
+            amount=Decimal(amount), name=merchant.upper(), merchant_name=merchant, category=category,
+        )
+    return user
+
+
+def test_period_bounds():
+    assert period_bounds("weekly", date(2025, 6, 11)) == (date(2025, 6, 2), date(2025, 6, 8))
+    assert period_bounds("monthly", date(2025, 3, 15)) == (date(2025, 2, 1), date(2025, 2, 28))
+
+
+def test_render_pdf_is_valid_document():
+    data = {
+        "period": "weekly", "start": "2025-06-02", "end": "2025-06-08",
+        "user": {"email": "a@b.c", "name": "(Test)"},
+        "total_spent": "1.00", "total_income": "0.00", "transaction_count": 1,
+        "categories": [["Food", "1.00", 1]], "top_merchants": [["Cafe", "1.00"]],
+        "daily": [["2025-06-02", "1.00"]],
+    }
+    pdf = render_pdf(data)
+    assert pdf.startswith(b"%PDF-1.4")
+    assert pdf.rstrip().endswith(b"%%EOF")
+    assert b"\\(Test\\)" in pdf
+
+
+@pytest.mark.django_db
+def test_generate_reports_skips_unchanged(spending_user, reports_root):
+    result = generate_reports("weekly", as_of=date(2025, 6, 11), max_workers=1)
+    assert (result.rendered, result.skipped, result.failed) == (1, 0, 0)
+    assert {"aggregate", "hash", "render", "write", "record", "total"} <= set(result.timings)
+
+    report = Report.objects.get(user=spending_user)
+    html = open(report.html_path).read()
+    assert "92.50" in html and "1500.00" in html
+    assert "99.00" not in html
+    assert Notification.objects.filter(report=report, status=Notification.STATUS_PENDING).count() == 1
+
+    result = generate_reports("weekly", as_of=date(2025, 6, 11), max_workers=1)
+    assert (result.rendered, result.skipped) == (0, 1)
+
+    Transaction.objects.filter(transaction_id="t1").update(amount=Decimal("20.00"))
+    result = generate_reports("weekly", as_of=date(2025, 6, 11), max_workers=1)
+    assert result.rendered == 1
+    assert Report.objects.count() == 1
+    assert Report.objects.get().content_hash != report.content_hash
+    # The user was already told about this week's report
+    assert Notification.objects.filter(user=spending_user).count() == 1
+
+
+@pytest.mark.django_db
+def test_generate_reports_in_process_pool(spending_user, user_factory, reports_root):
+    other = user_factory(email="other@example.com", username="other")
+    account = Account.objects.create(user=other, account_id="acc-2", name="Checking", type="depository")
+    Transaction.objects.create(
+        user=other, account=account, transaction_id="o1", date=date(2025, 6, 4),
+        amount=Decimal("7.00"), name="TAXI", merchant_name="Taxi",
+    )
+    # A file where the user's report directory should be makes their write fail in the worker
+    (reports_root / str(other.id)).write_text("")
+
+    result = generate_reports("weekly", as_of=date(2025, 6, 11), max_workers=2)
+
+    assert (result.rendered, result.skipped, result.failed) == (1, 0, 1)
+    report = Report.objects.get()
+    assert report.user == spending_user
+    assert "92.50" in open(report.html_path).read()
+    assert open(report.pdf_path, "rb").read().startswith(b"%PDF-1.4")
+    assert not Notification.objects.filter(user=other).exists()
+
+
+@pytest.mark.django_db
+def test_reports_cover_the_users_local_week(user_factory, reports_root):
+    user = user_factory(timezone="America/Los_Angeles")
+    account = Account.objects.create(user=user, account_id="acc-la", name="Checking", type="depository")
+    for txn_id, day, authorized_at, amount in [
+        # Sunday June 1 in Los Angeles: the previous week
+        ("early", date(2025, 6, 2), datetime(2025, 6, 2, 3, 0, tzinfo=timezone.utc), "11.00"),
+        # Sunday June 8 in Los Angeles, dated Monday by the bank
+        ("late", date(2025, 6, 9), datetime(2025, 6, 9, 5, 0, tzinfo=timezone.utc), "22.00"),
+    ]:
+        Transaction.objects.create(
+            user=user, account=account, transaction_id=txn_id, date=day, authorized_at=authorized_at,
+            amount=Decimal(amount), name="SHOP", merchant_name="Shop", category="Shopping",
+        )
+
+    assert generate_reports("weekly", as_of=date(2025, 6, 11), max_workers=1).rendered == 1
+
+    html = open(Report.objects.get(user=user).html_path).read()
+    assert "Spent: $22.00" in html
+    assert "2025-06-08" in html and "11.00" not in html
@@ -0,0 +1,99 @@
+"""
+Tests for the synthetic dataset generator
+tests/test_synthetic.py
+"""
+
+from datetime import date
+
+import numpy as np
+import pytest
+
+from backend import backfill
+from backend.synthetic import MERCHANTS, STORE_VARIANTS, SyntheticDataset, SyntheticPlaidClient
+from finance.models import Account, BackfillJob, Transaction
+
+
+def test_dataset_is_deterministic_per_seed():
+    first = SyntheticDataset(seed=3, users=5, days=90).transactions
+    again = SyntheticDataset(seed=3, users=5, days=90).transactions
+    other = SyntheticDataset(seed=4, users=5, days=90).transactions
+
+    assert all(np.array_equal(first[key], again[key]) for key in first)
+    assert not np.array_equal(first["cents"], other["cents"][:first["cents"].size])
+
+
+def test_dataset_shape():
+    dataset = SyntheticDataset(seed=1, users=20, days=365, end=date(2024, 12, 31))
+    columns = dataset.transactions
+
+    # Sorted by account, then day
+    order = np.lexsort((columns["day"], columns["account"]))
+    assert np.array_equal(order, np.arange(len(dataset)))
+
+    # Pending twins precede their posted row on the same account, never above it
+    pending = np.flatnonzero(columns["twin"] >= 0)
+    posted = columns["twin"][pending]
+    assert pending.size > 0
+    assert np.array_equal(columns["account"][pending], columns["account"][posted])
+    lag = columns["day"][posted] - columns["day"][pending]
+    assert np.all((lag >= 1) & (lag <= 3))
+    assert np.all(columns["cents"][pending] <= columns["cents"][posted])
+    assert np.array_equal(dataset.settled_pending[posted], pending)
+
+    # Bills recur monthly on a fixed day
+    netflix = columns["descriptor"] == list(dataset.descriptors).index("NETFLIX.COM")
+    netflix_dates = np.datetime64(dataset.start) + columns["day"][netflix]
+    assert {int(str(day)[-2:]) for day in netflix_dates} == {7}
+
+    # Holiday season outspends the rest of the year
+    purchases = columns["descriptor"] < len(MERCHANTS) * STORE_VARIANTS
+    months = (np.datetime64(dataset.start) + columns["day"][purchases]).astype("datetime64[M]").astype(int) % 12
+    per_month = np.bincount(months, minlength=12)
+    assert per_month[11] > per_month[:11].mean() * 1.15
+
+
+@pytest.mark.django_db
+def test_load_dataset_matches_generated_rows(synthetic_data):
+    dataset = synthetic_data
+    columns = dataset.transactions
+
+    assert Account.objects.count() == dataset.accounts
+    assert Transaction.objects.count() == len(dataset)
+    assert Transaction.objects.filter(pending=True).count() == int(columns["pending"].sum())
+    assert Transaction.objects.filter(duplicate_of__isnull=False).count() == int((columns["twin"] >= 0).sum())
+    assert not Transaction.objects.filter(merchant_name="").exists()
+
+
+@pytest.mark.django_db
+def test_backfill_from_synthetic_client_reconciles_pending(linked_synthetic_user, monkeypatch):
+    user, client, dataset = linked_synthetic_user
+    monkeypatch.setattr(backfill, "plaid_client", client)
+    job = backfill.enqueue_backfill(user, user.plaid_item_id, months=2, today=dataset.end)
+
+    backfill.run_pending()
+
+    job.refresh_from_db()
+    streamed = list(dataset.iter_transactions(
+        dataset.item_accounts(client._item(user.plaid_access_token)), job.start_date, job.end_date,
+    ))
+    stored = Transaction.objects.filter(user=user)
+    assert job.status == BackfillJob.STATUS_COMPLETED
+    assert stored.count() == len(streamed)
+    pending_ids = {txn["transaction_id"] for txn in streamed if txn["pending"]}
+    twins = {
+        f"syn{dataset.seed}-txn-{row}" for row in np.flatnonzero(dataset.transactions["twin"] >= 0)
+    } & pending_ids
+    flagged = set(stored.filter(duplicate_of__isnull=False).values_list("transaction_id", flat=True))
+    assert twins and flagged == twins
+
+
+@pytest.fixture
+def linked_synthetic_user(user_factory):
+    dataset = SyntheticDataset(seed=11, users=4, days=120)
+    client = SyntheticPlaidClient(dataset)
+    token = client.exchange_public_token("public-sandbox-123")
+    user = user_factory()
+    user.plaid_access_token = token["access_token"]
+    user.plaid_item_id = token["item_id"]
+    user.save()
+    return user, client, dataset